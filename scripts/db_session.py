@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Shared database session for the plan-maintenance scripts.
+
+Opening a fresh psycopg2 connection per statement costs a TLS handshake (and
+possibly a Neon cold start) every time, and committing each statement on its
+own can leave a plan half-migrated if a later step fails. This module keeps a
+single pooled connection open for the whole run and lets a script opt into
+applying all of its statements in one transaction.
+
+Usage:
+    from db_session import execute_query, transaction
+
+    with transaction():
+        rows = execute_query("UPDATE ... RETURNING id, name", (...))
+"""
+
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+
+from psycopg2 import pool
+from psycopg2.extras import execute_values
+
+
+def _result(cur):
+    """Rows for statements that produce them (SELECT or ... RETURNING), else True."""
+    if cur.description is None:
+        return True
+    return cur.fetchall()
+
+
+class DbSession:
+    """One pooled connection reused for every statement of a script run.
+
+    Each thread gets its own connection and transaction state from the shared
+    pool, so worker threads can run independent transactions concurrently.
+    """
+
+    def __init__(self, dsn=None, maxconn=4):
+        self.dsn = dsn or os.environ.get('NEON_DB_URL')
+        if not self.dsn:
+            raise ValueError("NEON_DB_URL environment variable not set.")
+        self.maxconn = maxconn
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def _conn(self):
+        return getattr(self._local, 'conn', None)
+
+    @_conn.setter
+    def _conn(self, conn):
+        self._local.conn = conn
+
+    @property
+    def _in_transaction(self):
+        return getattr(self._local, 'in_transaction', False)
+
+    @_in_transaction.setter
+    def _in_transaction(self, value):
+        self._local.in_transaction = value
+
+    @property
+    def pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = pool.ThreadedConnectionPool(1, self.maxconn, self.dsn)
+        return self._pool
+
+    def _connection(self):
+        if self._conn is not None and self._conn.closed:
+            # Hand the dead connection back so it does not keep its pool slot
+            self.pool.putconn(self._conn, close=True)
+            self._conn = None
+        if self._conn is None:
+            self._conn = self.pool.getconn()
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        """Run every statement inside the block in a single transaction.
+
+        Errors propagate instead of being printed, and nothing is committed
+        unless the whole block succeeds. Nested calls join the outer block.
+        """
+        if self._in_transaction:
+            yield self
+            return
+
+        conn = self._connection()
+        self._in_transaction = True
+        try:
+            yield self
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
+    def execute_query(self, query, params=None):
+        """Execute a query and return its rows, True, or None on error.
+
+        SELECT and ``... RETURNING`` statements return their rows so callers
+        can verify a write without a second round-trip. Other statements return
+        True. Outside a transaction each statement is committed on its own and
+        errors are reported and returned as None, matching the old per-script
+        helpers; inside ``transaction()`` errors are raised.
+        """
+        if self._in_transaction:
+            with self._connection().cursor() as cur:
+                cur.execute(query, params)
+                return _result(cur)
+
+        conn = None
+        try:
+            conn = self._connection()
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                result = _result(cur)
+            conn.commit()
+            return result
+        except Exception as e:
+            print(f"Database error: {e}")
+            if conn is not None and not conn.closed:
+                conn.rollback()
+            return None
+
+    def execute_batch(self, query, rows, template=None, page_size=1000):
+        """Run a ``VALUES %s`` statement for many rows in as few round-trips as possible.
+
+        Returns the RETURNING rows, if any, otherwise True.
+        """
+        fetch = 'RETURNING' in query.upper()
+        with self.transaction():
+            with self._connection().cursor() as cur:
+                result = execute_values(cur, query, rows, template=template,
+                                        page_size=page_size, fetch=fetch)
+        return result if fetch else True
+
+    def copy_expert(self, query, source, size=65536):
+        """Stream a file-like `source` into ``COPY ... FROM STDIN``; returns the row count.
+
+        Runs inside the current transaction, or its own one if none is open.
+        """
+        with self.transaction():
+            with self._connection().cursor() as cur:
+                cur.copy_expert(query, source, size=size)
+                return cur.rowcount
+
+    @contextmanager
+    def connection(self):
+        """Borrow a separate pooled connection, e.g. for a worker thread."""
+        conn = self.pool.getconn()
+        try:
+            yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    def release(self):
+        """Return this thread's connection to the pool, e.g. when a worker thread is done."""
+        if self._conn is not None and self._pool is not None:
+            self._pool.putconn(self._conn)
+        self._conn = None
+
+    def close(self):
+        self.release()
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+
+_default_session = None
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use."""
+    global _default_session
+    if _default_session is None:
+        _default_session = DbSession()
+        atexit.register(_default_session.close)
+    return _default_session
+
+
+def execute_query(query, params=None):
+    return get_session().execute_query(query, params)
+
+
+def execute_batch(query, rows, template=None, page_size=1000):
+    return get_session().execute_batch(query, rows, template=template, page_size=page_size)
+
+
+def copy_expert(query, source, size=65536):
+    return get_session().copy_expert(query, source, size=size)
+
+
+def transaction():
+    return get_session().transaction()
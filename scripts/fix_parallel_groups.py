@@ -2,43 +2,16 @@
 """
 Script to fix parallel grouping for practice plan 65
 This will ensure that drills happening at the same time have the same parallel_group_id
+
+normalize_parallel_groups.py infers the groups for every plan from the item
+timelines; prefer it over extending this script for other plans.
 """
 
-import psycopg2
-import os
+import argparse
 import uuid
+from contextlib import nullcontext
 
-# Database connection
-DB_URL = os.environ.get('NEON_DB_URL')
-
-def execute_query(query, params=None):
-    """Execute a query and return results"""
-    try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-        if params:
-            cur.execute(query, params)
-        else:
-            cur.execute(query)
-        
-        # If it's a SELECT query, fetch results
-        if query.strip().upper().startswith('SELECT'):
-            results = cur.fetchall()
-            cur.close()
-            conn.close()
-            return results
-        else:
-            # For UPDATE/INSERT/DELETE, commit the transaction
-            conn.commit()
-            cur.close()
-            conn.close()
-            return True
-    except Exception as e:
-        print(f"Database error: {e}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
-        return None
+from db_session import execute_query, transaction
 
 def fix_parallel_groups():
     """Fix parallel grouping for the drills"""
@@ -130,27 +103,23 @@ def fix_parallel_groups():
         AND name = 'Hero Defense Drill'
     """)
     
-    # Also create a second entry for beaters
-    hero_drill = execute_query("""
-        SELECT drill_id, duration, order_in_plan 
+    # Also create a second entry for beaters, copying the chasers entry in the same statement
+    hero_beaters = execute_query("""
+        INSERT INTO practice_plan_drills (
+            practice_plan_id, drill_id, section_id, name, duration, 
+            type, parallel_timeline, parallel_group_id, group_timelines, order_in_plan
+        )
+        SELECT 65, drill_id, 133, 'Hero Defense Drill', duration, 
+            'drill', 'BEATERS', %s, ARRAY['CHASERS', 'BEATERS', 'SEEKERS'], order_in_plan
         FROM practice_plan_drills 
         WHERE practice_plan_id = 65 
         AND section_id = 133 
         AND name = 'Hero Defense Drill'
         LIMIT 1
-    """)
+        RETURNING id
+    """, (group2_id,))
     
-    if hero_drill:
-        drill_id, duration, order = hero_drill[0]
-        execute_query("""
-            INSERT INTO practice_plan_drills (
-                practice_plan_id, drill_id, section_id, name, duration, 
-                type, parallel_timeline, parallel_group_id, group_timelines, order_in_plan
-            ) VALUES (
-                65, %s, 133, 'Hero Defense Drill', %s, 
-                'drill', 'BEATERS', %s, ARRAY['CHASERS', 'BEATERS', 'SEEKERS'], %s
-            )
-        """, (drill_id, duration, group2_id, order))
+    if hero_beaters:
         print("  ✓ Created BEATERS entry for Hero Defense Drill")
     
     print("\n\n=== VERIFICATION ===")
@@ -171,5 +140,14 @@ def fix_parallel_groups():
     print("- Seekers doing 2v1 while others do Hero Defense")
     print("- Position filter will correctly show/hide activities based on selection")
 
+def main():
+    parser = argparse.ArgumentParser(description='Fix parallel grouping for practice plan 65.')
+    parser.add_argument('--atomic', action='store_true',
+                        help='Apply every statement in a single transaction (all or nothing).')
+    args = parser.parse_args()
+
+    with transaction() if args.atomic else nullcontext():
+        fix_parallel_groups()
+
 if __name__ == "__main__":
-    fix_parallel_groups()
\ No newline at end of file
+    main()
\ No newline at end of file
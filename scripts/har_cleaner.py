@@ -1,41 +1,179 @@
 import json
 import argparse
+import glob
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+STREAM_CHUNK_SIZE = 1 << 20  # 1 MiB reads; the buffer only grows to fit a single value
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CONTINUATION = '.eE'
 
 def remove_content_key(obj):
-    """Recursively removes the 'content' key from dictionaries within a JSON object."""
-    if isinstance(obj, dict):
-        # Use list() to create a copy of keys to avoid modification during iteration
-        for key in list(obj.keys()):
-            if key == 'content':
-                del obj[key]
-            else:
-                remove_content_key(obj[key])
-    elif isinstance(obj, list):
-        for item in obj:
-            remove_content_key(item)
+    """Removes the 'content' key from dictionaries anywhere within a JSON object.
 
-def main():
-    parser = argparse.ArgumentParser(description='Remove "content" keys from a HAR file.')
-    parser.add_argument('input_file', help='Path to the input HAR file.')
-    parser.add_argument('-o', '--output_file', help='Path to the output HAR file. If not provided, appends "_cleaned" to the input filename.')
-    parser.add_argument('--overwrite', action='store_true', help='Overwrite the input file instead of creating a new one.')
+    Walks the structure with an explicit stack instead of recursion, so deeply
+    nested payloads cannot hit the interpreter's recursion limit.
+    """
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            current.pop('content', None)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
 
-    args = parser.parse_args()
+class JsonStream:
+    """Incremental reader that decodes one JSON value at a time from a text file.
 
-    input_path = args.input_file
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
+    Only the value currently being decoded is held in memory, so reading a HAR
+    entry by entry needs memory proportional to the largest entry rather than
+    to the whole file.
+    """
+
+    def __init__(self, f, chunk_size=STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, min_size=0):
+        """Reads more text into the buffer, dropping what has been consumed."""
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(max(self.chunk_size, min_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}'")
+        self.pos += 1
+
+    def next_separator(self, closing):
+        """Consumes a ',' or the closing bracket; returns True if more items follow."""
+        found = self.peek()
+        self.pos += 1
+        if found == ',':
+            return True
+        if found == closing:
+            return False
+        raise ValueError(f"Expected ',' or '{closing}' but found '{found}'")
+
+    def value(self):
+        """Decodes and returns the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number ending at the buffer edge, or just before a '.' or
+                # exponent the next chunk completes, may be truncated
+                if self.eof or (end < len(self.buf) and not (
+                        isinstance(obj, (int, float)) and self.buf[end] in _NUMBER_CONTINUATION)):
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise ValueError("Truncated or invalid JSON value")
+            # Grow geometrically so a large value costs O(size) rather than O(size^2)
+            self._fill(len(self.buf) - self.pos)
+
+    def items(self):
+        """Yields the values of the JSON array at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        more = True
+        while more:
+            yield self.value()
+            more = self.next_separator(']')
+
+def _iter_values_at(stream, path):
+    """Yields the items of the array found at `path` (a tuple of object keys)."""
+    stream.expect('{')
+    if stream.peek() == '}':
+        stream.pos += 1
         return
+    more = True
+    while more:
+        key = stream.value()
+        stream.expect(':')
+        if key == path[0]:
+            if len(path) == 1 and stream.peek() == '[':
+                yield from stream.items()
+                return
+            if len(path) > 1 and stream.peek() == '{':
+                yield from _iter_values_at(stream, path[1:])
+                return
+        stream.value()
+        more = stream.next_separator('}')
+
+def iter_har_entries(path):
+    """Yields the entries of a HAR file's log.entries one at a time without loading the file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from _iter_values_at(JsonStream(f), ('log', 'entries'))
 
-    if args.overwrite:
-        output_path = input_path
-    elif args.output_file:
-        output_path = args.output_file
+def _stream_entries(stream, f_out):
+    """Copies the log.entries array, cleaning one entry at a time."""
+    f_out.write('[')
+    count = 0
+    for entry in stream.items():
+        remove_content_key(entry)
+        f_out.write(('\n' if count == 0 else ',\n') + json.dumps(entry))
+        count += 1
+    f_out.write('\n]' if count else ']')
+    return count
+
+def _stream_object(stream, f_out, path=()):
+    """Copies a JSON object, descending into log -> entries to stream them.
+
+    Returns the number of entries cleaned, or None if log.entries was not found.
+    """
+    stream.expect('{')
+    f_out.write('{')
+    entries = None
+    if stream.peek() == '}':
+        stream.pos += 1
     else:
-        base, ext = os.path.splitext(input_path)
-        output_path = f"{base}_cleaned{ext}"
+        first = True
+        more = True
+        while more:
+            key = stream.value()
+            stream.expect(':')
+            f_out.write(('' if first else ',') + json.dumps(key) + ':')
+            first = False
+            child_path = path + (key,)
+            if child_path == ('log',) and stream.peek() == '{':
+                entries = _stream_object(stream, f_out, child_path)
+            elif child_path == ('log', 'entries') and stream.peek() == '[':
+                entries = _stream_entries(stream, f_out)
+            else:
+                json.dump(stream.value(), f_out)
+            more = stream.next_separator('}')
+    f_out.write('}')
+    return entries
 
+def clean_har_file(input_path, output_path):
+    """Loads the whole HAR, removes 'content' keys and writes it back. Returns True on success."""
     try:
         with open(input_path, 'r', encoding='utf-8') as f_in:
             har_data = json.load(f_in)
@@ -49,10 +187,10 @@ def main():
                 print(f"Context around error (approx. position {e.pos}):\n...\n{context}\n...")
         except Exception:
             pass # Ignore errors during context retrieval
-        return
+        return False
     except Exception as e:
         print(f"Error reading input file {input_path}: {e}")
-        return
+        return False
 
     print(f"Processing {input_path}...")
     # Assuming the main data is under log -> entries
@@ -68,6 +206,178 @@ def main():
         print(f"Successfully processed. Cleaned file saved to: {output_path}")
     except Exception as e:
         print(f"Error writing output file {output_path}: {e}")
+        return False
+    return True
+
+def clean_har_file_streaming(input_path, output_path):
+    """Cleans a HAR entry by entry with memory bounded by the largest entry. Returns True on success.
+
+    Output goes to a temporary file next to the destination and is moved into
+    place at the end, so overwriting the input is safe. Entries are written
+    compactly, one per line.
+    """
+    print(f"Streaming {input_path}...")
+    tmp_path = f"{output_path}.tmp{os.getpid()}"
+    try:
+        with open(input_path, 'r', encoding='utf-8') as f_in, \
+                open(tmp_path, 'w', encoding='utf-8') as f_out:
+            stream = JsonStream(f_in)
+            if stream.peek() != '{':
+                raise ValueError("HAR file must contain a JSON object")
+            entries = _stream_object(stream, f_out)
+            f_out.write('\n')
+    except (ValueError, OSError) as e:
+        print(f"Error streaming {input_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    if entries is None:
+        os.remove(tmp_path)
+        print("Warning: Could not find 'log' -> 'entries' structure. Falling back to in-memory cleaning.")
+        return clean_har_file(input_path, output_path)
+
+    os.replace(tmp_path, output_path)
+    print(f"Successfully processed {entries} entries. Cleaned file saved to: {output_path}")
+    return True
+
+def is_pattern(arg):
+    return os.path.isdir(arg) or any(char in arg for char in '*?[')
+
+def is_cleaned_output(path):
+    return os.path.splitext(path)[0].endswith('_cleaned')
+
+def expand_inputs(inputs):
+    """Expands directories and glob patterns into a de-duplicated list of HAR paths.
+
+    Plain file arguments are returned as given; directories contribute their
+    *.har files and patterns their matches, skipping previously cleaned outputs.
+    """
+    paths = []
+    for arg in inputs:
+        if os.path.isdir(arg):
+            matches = sorted(glob.glob(os.path.join(arg, '*.har')))
+        elif is_pattern(arg):
+            matches = sorted(glob.glob(arg, recursive=True))
+        else:
+            paths.append(arg)
+            continue
+        paths.extend(path for path in matches if not is_cleaned_output(path))
+    return list(dict.fromkeys(paths))
+
+def resolve_output_path(input_path, output_file=None, output_dir=None, overwrite=False):
+    if overwrite:
+        return input_path
+    if output_file:
+        return output_file
+    base, ext = os.path.splitext(os.path.basename(input_path) if output_dir else input_path)
+    output_path = f"{base}_cleaned{ext}"
+    return os.path.join(output_dir, output_path) if output_dir else output_path
+
+def find_output_collisions(jobs):
+    """Groups inputs that would be written to the same output path (e.g. same basename with --output-dir)."""
+    by_output = {}
+    for input_path, output_path, _, _ in jobs:
+        by_output.setdefault(os.path.abspath(output_path), []).append(input_path)
+    return {output: inputs for output, inputs in by_output.items() if len(inputs) > 1}
+
+def clean_one(job):
+    """Cleans a single file for batch mode; returns a result dict (runs in a worker process)."""
+    input_path, output_path, stream, skip_fresh = job
+    result = {'input': input_path, 'output': output_path, 'status': 'failed',
+              'input_bytes': 0, 'output_bytes': 0}
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found: {input_path}")
+        return result
+
+    result['input_bytes'] = os.path.getsize(input_path)
+    if (skip_fresh and output_path != input_path and os.path.exists(output_path)
+            and os.path.getmtime(output_path) >= os.path.getmtime(input_path)):
+        result['status'] = 'skipped'
+        result['output_bytes'] = os.path.getsize(output_path)
+        return result
+
+    clean = clean_har_file_streaming if stream else clean_har_file
+    if clean(input_path, output_path):
+        result['status'] = 'cleaned'
+        result['output_bytes'] = os.path.getsize(output_path)
+    return result
+
+def format_bytes(num):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(num) < 1024 or unit == 'GB':
+            return f"{num:.1f} {unit}" if unit != 'B' else f"{num} B"
+        num /= 1024
+
+def print_batch_summary(results):
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    saved_total = 0
+    for result in results:
+        sizes = f"{format_bytes(result['input_bytes'])} -> {format_bytes(result['output_bytes'])}"
+        if result['status'] == 'cleaned':
+            saved = result['input_bytes'] - result['output_bytes']
+            saved_total += saved
+            print(f"  ✓ {result['input']}: {sizes} (saved {format_bytes(saved)})")
+        elif result['status'] == 'skipped':
+            print(f"  - {result['input']}: {sizes} (up to date, skipped)")
+        else:
+            print(f"  ✗ {result['input']}: failed")
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in ('cleaned', 'skipped', 'failed')}
+    print(f"\nCleaned {counts['cleaned']}, skipped {counts['skipped']}, failed {counts['failed']}. "
+          f"Total saved: {format_bytes(saved_total)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove "content" keys from HAR files.')
+    parser.add_argument('inputs', nargs='+', metavar='input_file',
+                        help='HAR file(s), directories of .har files, or glob patterns (e.g. "captures/**/*.har").')
+    parser.add_argument('-o', '--output_file', help='Path to the output HAR file (single input only). If not provided, appends "_cleaned" to the input filename.')
+    parser.add_argument('--output-dir', help='Directory for cleaned files when processing several inputs.')
+    parser.add_argument('--overwrite', action='store_true', help='Overwrite the input file instead of creating a new one.')
+    parser.add_argument('--stream', action='store_true', help='Clean log.entries incrementally with memory bounded by the largest entry (for very large captures).')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of files to clean in parallel (default: CPU count).')
+    parser.add_argument('--force', action='store_true', help='In batch runs, clean files even if their cleaned output is already newer than the input.')
+
+    args = parser.parse_args()
+
+    input_paths = expand_inputs(args.inputs)
+    if not input_paths:
+        print("Error: No HAR files matched the given inputs.")
+        return
+    if args.output_file and len(input_paths) > 1:
+        parser.error("--output_file can only be used with a single input file; use --output-dir instead.")
+
+    # Up-to-date outputs are only skipped in batch runs; naming one file always cleans it.
+    batch = len(args.inputs) > 1 or any(is_pattern(arg) for arg in args.inputs)
+    jobs = [
+        (path, resolve_output_path(path, args.output_file, args.output_dir, args.overwrite),
+         args.stream, batch and not args.force)
+        for path in input_paths
+    ]
+    collisions = find_output_collisions(jobs)
+    if collisions:
+        for output_path, inputs in sorted(collisions.items()):
+            print(f"Error: {', '.join(inputs)} would all be written to {output_path}")
+        parser.error("several inputs share a basename; clean them without --output-dir or in separate runs.")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    if len(jobs) == 1:
+        results = [clean_one(jobs[0])]
+        if results[0]['status'] == 'skipped':
+            print(f"Skipping {input_paths[0]}: cleaned output is already up to date (use --force to re-clean).")
+        return
+
+    workers = max(1, min(args.jobs, len(jobs)))
+    print(f"Cleaning {len(jobs)} files with {workers} worker(s)...")
+    if workers == 1:
+        results = [clean_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(clean_one, jobs))
+    print_batch_summary(results)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Compare two HAR captures route by route and flag regressions.
+
+Both captures are summarized with har_latency_report.py (same route
+normalization and percentiles), then for each route the latency and payload
+size deltas are reported. A route regresses when its p95 total time or its
+median response size grows past the configured thresholds; in that case the
+script exits with status 1 so it can gate a release on recorded user flows
+(drills list, formation detail, practice-plan editor, ...). Routes with fewer
+than --min-count requests in either capture are not judged; they are listed as
+"insufficient samples" and warned about. A capture that cannot be read exits
+with status 2.
+
+Usage:
+    python har_diff.py before.har after.har [--latency-threshold 20] [--bytes-threshold 10]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+from har_latency_report import DEFAULT_ROUTES_DIR, build_report
+
+
+def pct_change(before, after):
+    """Percent change from before to after; growth from 0 is infinite, so it still crosses any threshold."""
+    if before is None or after is None:
+        return None
+    if before == 0:
+        return math.inf if after > 0 else 0.0
+    return (after - before) / before * 100
+
+
+def diff_reports(before, after, latency_threshold=20.0, bytes_threshold=10.0,
+                 min_latency_delta=10.0, min_count=5):
+    """Compares two route summaries and returns per-route deltas with regression flags.
+
+    A route is flagged when both captures have at least `min_count` requests and
+    either its p95 total time grew by more than `latency_threshold` percent (and
+    by at least `min_latency_delta` ms, to ignore noise on fast routes) or its
+    median response size grew by more than `bytes_threshold` percent.
+    """
+    rows = []
+    for route in sorted(set(before) | set(after)):
+        old, new = before.get(route), after.get(route)
+        row = {'route': route, 'before_count': old['count'] if old else 0,
+               'after_count': new['count'] if new else 0, 'regressions': []}
+        if old is None or new is None:
+            row['status'] = 'added' if old is None else 'removed'
+            rows.append(row)
+            continue
+
+        for field, metric in (('total', 'p50'), ('total', 'p95'), ('wait', 'p95')):
+            key = f"{field}_{metric}"
+            row[key] = {'before': old[field][metric], 'after': new[field][metric],
+                        'change_pct': pct_change(old[field][metric], new[field][metric])}
+        row['bytes_p50'] = {'before': old['bytes']['p50'], 'after': new['bytes']['p50'],
+                            'change_pct': pct_change(old['bytes']['p50'], new['bytes']['p50'])}
+
+        enough_samples = old['count'] >= min_count and new['count'] >= min_count
+        p95 = row['total_p95']
+        if (enough_samples and p95['change_pct'] is not None
+                and p95['change_pct'] > latency_threshold
+                and p95['after'] - p95['before'] >= min_latency_delta):
+            row['regressions'].append('p95')
+        size = row['bytes_p50']
+        if enough_samples and size['change_pct'] is not None and size['change_pct'] > bytes_threshold:
+            row['regressions'].append('bytes')
+
+        if row['regressions']:
+            row['status'] = 'regressed'
+        else:
+            row['status'] = 'ok' if enough_samples else 'insufficient samples'
+        rows.append(row)
+    return rows
+
+
+def _fmt(value, suffix=''):
+    return '-' if value is None else f"{value:.0f}{suffix}"
+
+
+def _fmt_pct(value):
+    if value is None:
+        return ''
+    return '(from 0)' if math.isinf(value) else f"({value:+.0f}%)"
+
+
+def _json_safe(rows):
+    """Copies the rows with infinite changes as null, which strict JSON parsers accept.
+
+    The row's regressions list still records the verdict.
+    """
+    safe = []
+    for row in rows:
+        row = dict(row)
+        for key, value in row.items():
+            if isinstance(value, dict) and isinstance(value.get('change_pct'), float) and math.isinf(value['change_pct']):
+                row[key] = {**value, 'change_pct': None}
+        safe.append(row)
+    return safe
+
+
+def format_diff(rows):
+    header = (f"{'Route':<48} {'Count':>9} {'p95 total ms':>22} {'p50 total ms':>22} "
+              f"{'p50 bytes':>24}  Status")
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        count = f"{row['before_count']}->{row['after_count']}"
+        if row['status'] in ('added', 'removed'):
+            lines.append(f"{row['route'][:48]:<48} {count:>9} {'':>22} {'':>22} {'':>24}  {row['status']}")
+            continue
+        cells = []
+        for key in ('total_p95', 'total_p50', 'bytes_p50'):
+            delta = row[key]
+            cells.append(f"{_fmt(delta['before'])}->{_fmt(delta['after'])} {_fmt_pct(delta['change_pct'])}")
+        status = 'REGRESSED (' + ', '.join(row['regressions']) + ')' if row['regressions'] else row['status']
+        lines.append(f"{row['route'][:48]:<48} {count:>9} {cells[0]:>22} {cells[1]:>22} {cells[2]:>24}  {status}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff per-route latency and payload size between two HAR captures.')
+    parser.add_argument('before', help='Baseline HAR (e.g. captured before a deploy).')
+    parser.add_argument('after', help='Candidate HAR (e.g. captured after a deploy).')
+    parser.add_argument('--latency-threshold', type=float, default=20.0,
+                        help='Flag routes whose p95 total time grows by more than this percent (default: 20).')
+    parser.add_argument('--min-latency-delta', type=float, default=10.0,
+                        help='Ignore p95 growth smaller than this many ms (default: 10).')
+    parser.add_argument('--bytes-threshold', type=float, default=10.0,
+                        help='Flag routes whose median response size grows by more than this percent (default: 10).')
+    parser.add_argument('--min-count', type=int, default=5,
+                        help='Only flag routes with at least this many requests in both captures (default: 5).')
+    parser.add_argument('--json', dest='json_path', help='Also write the diff as JSON to this path.')
+    parser.add_argument('--all', action='store_true', help='Include non-API requests (pages, assets).')
+    parser.add_argument('--routes-dir', default=DEFAULT_ROUTES_DIR,
+                        help='SvelteKit routes directory used to normalize paths.')
+    args = parser.parse_args()
+
+    for path in (args.before, args.after):
+        if not os.path.exists(path):
+            print(f"Error: Input file not found: {path}")
+            sys.exit(2)
+
+    reports = []
+    for path in (args.before, args.after):
+        try:
+            reports.append(build_report([path], args.routes_dir, api_only=not args.all))
+        except Exception as e:
+            print(f"Error: Could not read {path} as a HAR capture: {e}")
+            sys.exit(2)
+    before, after = reports
+    rows = diff_reports(before, after, args.latency_threshold, args.bytes_threshold,
+                        args.min_latency_delta, args.min_count)
+
+    print(format_diff(rows))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(_json_safe(rows), f, indent=2)
+        print(f"\nJSON diff saved to: {args.json_path}")
+
+    unchecked = [row['route'] for row in rows if row['status'] == 'insufficient samples']
+    if unchecked:
+        print(f"\n! {len(unchecked)} route(s) had fewer than {args.min_count} requests in a capture "
+              f"and were not checked (lower --min-count to include them):")
+        for route in unchecked:
+            print(f"  - {route}")
+
+    regressed = [row['route'] for row in rows if row['regressions']]
+    if regressed:
+        print(f"\n✗ {len(regressed)} route(s) regressed past the thresholds:")
+        for route in regressed:
+            print(f"  - {route}")
+        sys.exit(1)
+    print(f"\n✓ No regressions past the thresholds{' among the checked routes' if unchecked else ''}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Per-route API latency report from HAR captures.
+
+Reads the `timings` block of every entry (cleaned HARs from har_cleaner.py work
+fine, since only response bodies are stripped), groups requests by normalized
+QDrill route such as `GET /api/drills/[id]`, and reports request counts,
+p50/p95/p99 of `wait`, `receive` and total time, and response sizes.
+
+Routes are matched against the SvelteKit route tree in src/routes/api, so
+`/api/practice-plans/65` is reported as `/api/practice-plans/[id]` while
+`/api/drills/names` stays a route of its own.
+
+Usage:
+    python har_latency_report.py capture.har [more.har ...] [--json report.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from har_cleaner import iter_har_entries
+
+DEFAULT_ROUTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'routes')
+PERCENTILES = (50, 95, 99)
+TIMING_FIELDS = ('wait', 'receive', 'total')
+SORT_KEYS = ('time', 'p95', 'count', 'route')
+
+_ID_SEGMENT = re.compile(
+    r'^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{24,})$',
+    re.IGNORECASE
+)
+
+
+def load_route_templates(routes_dir=DEFAULT_ROUTES_DIR):
+    """Returns route templates (tuples of segments) for every +server.* endpoint under routes_dir."""
+    templates = []
+    for root, _, files in os.walk(routes_dir):
+        if not any(name.startswith('+server.') for name in files):
+            continue
+        rel = os.path.relpath(root, routes_dir)
+        # Route groups like (app) do not appear in URLs
+        segments = tuple(seg for seg in rel.split(os.sep) if seg != '.' and not seg.startswith('('))
+        templates.append(segments)
+    return templates
+
+
+class RouteNormalizer:
+    """Maps concrete request paths onto route templates like /api/drills/[id]."""
+
+    def __init__(self, templates=None):
+        self.templates = load_route_templates() if templates is None else templates
+        self.normalize = lru_cache(maxsize=None)(self._normalize)
+
+    def _match(self, segments):
+        best = None
+        for template in self.templates:
+            rest = template and template[-1].startswith('[...')
+            fixed = template[:-1] if rest else template
+            if len(segments) != len(fixed) and not (rest and len(segments) >= len(fixed)):
+                continue
+            score = []
+            for actual, expected in zip(segments, fixed):
+                if expected.startswith('['):
+                    score.append(1)
+                elif actual == expected:
+                    score.append(0)
+                else:
+                    break
+            else:
+                # Static segments win over parameters, and parameters over rest params
+                score.append(2 if rest else 0)
+                if best is None or score < best[0]:
+                    best = (score, template)
+        return best[1] if best else None
+
+    def _normalize(self, path):
+        segments = tuple(seg for seg in path.split('/') if seg)
+        template = self._match(segments)
+        if template is None:
+            # Unknown route: collapse id-like segments so requests still group sensibly
+            template = tuple('[id]' if _ID_SEGMENT.match(seg) else seg for seg in segments)
+        return '/' + '/'.join(template)
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def response_bytes(entry):
+    """Bytes received for an entry, preferring the transfer size browsers record."""
+    response = entry.get('response', {})
+    for key in ('_transferSize', 'bodySize'):
+        size = response.get(key)
+        if isinstance(size, (int, float)) and size >= 0:
+            return size
+    return None
+
+
+def entry_metrics(entry):
+    """Extracts wait/receive/total timings (ms) and response size from one HAR entry."""
+    timings = entry.get('timings', {})
+
+    def timing(name):
+        value = timings.get(name)
+        return value if isinstance(value, (int, float)) and value >= 0 else None
+
+    total = entry.get('time')
+    return {
+        'wait': timing('wait'),
+        'receive': timing('receive'),
+        'total': total if isinstance(total, (int, float)) and total >= 0 else None,
+        'bytes': response_bytes(entry),
+        'status': entry.get('response', {}).get('status', 0),
+    }
+
+
+def route_key(entry, normalizer, api_only=True):
+    """Returns 'METHOD /normalized/route' for an entry, or None if it should be ignored."""
+    request = entry.get('request', {})
+    path = urlsplit(request.get('url', '')).path
+    if api_only and not path.startswith('/api/'):
+        return None
+    return f"{request.get('method', 'GET')} {normalizer.normalize(path)}"
+
+
+def collect_samples(har_paths, normalizer=None, api_only=True):
+    """Streams entries from HAR files and groups their metrics by route."""
+    normalizer = normalizer or RouteNormalizer()
+    samples = {}
+    for path in har_paths:
+        for entry in iter_har_entries(path):
+            key = route_key(entry, normalizer, api_only)
+            if key is None:
+                continue
+            metrics = entry_metrics(entry)
+            route = samples.setdefault(key, {'wait': [], 'receive': [], 'total': [], 'bytes': [],
+                                             'count': 0, 'errors': 0})
+            route['count'] += 1
+            if metrics['status'] >= 400 or metrics['status'] == 0:
+                route['errors'] += 1
+            for field in ('wait', 'receive', 'total', 'bytes'):
+                if metrics[field] is not None:
+                    route[field].append(metrics[field])
+    return samples
+
+
+def summarize_samples(samples):
+    """Turns raw per-route samples into count/percentile/size statistics."""
+    summary = {}
+    for key, route in samples.items():
+        stats = {'count': route['count'], 'errors': route['errors']}
+        for field in TIMING_FIELDS:
+            values = sorted(route[field])
+            stats[field] = {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+            stats[field]['mean'] = sum(values) / len(values) if values else None
+            stats[field]['sum'] = sum(values)
+        sizes = sorted(route['bytes'])
+        stats['bytes'] = {
+            'p50': percentile(sizes, 50),
+            'p95': percentile(sizes, 95),
+            'total': sum(sizes),
+        }
+        summary[key] = stats
+    return summary
+
+
+def build_report(har_paths, routes_dir=DEFAULT_ROUTES_DIR, api_only=True):
+    normalizer = RouteNormalizer(load_route_templates(routes_dir))
+    return summarize_samples(collect_samples(har_paths, normalizer, api_only))
+
+
+def sorted_routes(summary, sort='time'):
+    if sort == 'route':
+        return sorted(summary.items())
+    if sort == 'count':
+        return sorted(summary.items(), key=lambda kv: -kv[1]['count'])
+    if sort == 'p95':
+        return sorted(summary.items(), key=lambda kv: -(kv[1]['total']['p95'] or 0))
+    # Default: total time spent on the route, i.e. where optimization pays off most
+    return sorted(summary.items(), key=lambda kv: -kv[1]['total']['sum'])
+
+
+def _fmt_ms(value):
+    return '-' if value is None else f"{value:.0f}"
+
+
+def _fmt_bytes(value):
+    if value is None:
+        return '-'
+    for unit in ('B', 'K', 'M'):
+        if value < 1024 or unit == 'M':
+            return f"{value:.0f}{unit}" if unit == 'B' else f"{value:.1f}{unit}"
+        value /= 1024
+
+
+def format_table(summary, sort='time'):
+    header = (f"{'Route':<48} {'Count':>6} {'Err':>4} "
+              f"{'wait p50/p95/p99':>18} {'recv p50/p95/p99':>18} {'total p50/p95/p99':>19} "
+              f"{'size p50':>9} {'size sum':>9}")
+    lines = [header, '-' * len(header)]
+    for key, stats in sorted_routes(summary, sort):
+        cols = []
+        for field in TIMING_FIELDS:
+            cols.append('/'.join(_fmt_ms(stats[field][f"p{pct}"]) for pct in PERCENTILES))
+        lines.append(
+            f"{key[:48]:<48} {stats['count']:>6} {stats['errors']:>4} "
+            f"{cols[0]:>18} {cols[1]:>18} {cols[2]:>19} "
+            f"{_fmt_bytes(stats['bytes']['p50']):>9} {_fmt_bytes(stats['bytes']['total']):>9}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report per-route API latency from HAR captures.')
+    parser.add_argument('har_files', nargs='+', help='HAR file(s) to analyze (cleaned or raw).')
+    parser.add_argument('--json', dest='json_path', help='Also write the report as JSON to this path ("-" for stdout).')
+    parser.add_argument('--sort', choices=SORT_KEYS, default='time',
+                        help='Order of the table: total time spent (default), p95, count or route.')
+    parser.add_argument('--all', action='store_true', help='Include non-API requests (pages, assets).')
+    parser.add_argument('--routes-dir', default=DEFAULT_ROUTES_DIR,
+                        help='SvelteKit routes directory used to normalize paths.')
+    args = parser.parse_args()
+
+    missing = [path for path in args.har_files if not os.path.exists(path)]
+    if missing:
+        print(f"Error: Input file not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    summary = build_report(args.har_files, args.routes_dir, api_only=not args.all)
+    if not summary:
+        print("No matching requests found.")
+        return
+
+    if args.json_path == '-':
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return
+
+    total_requests = sum(stats['count'] for stats in summary.values())
+    print(f"{total_requests} requests across {len(summary)} routes (times in ms)\n")
+    print(format_table(summary, args.sort))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nJSON report saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
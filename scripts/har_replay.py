@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Replay the API requests recorded in a HAR against a local QDrill server.
+
+Requests are read from log.entries (streamed, like har_cleaner.py), their host
+is rewritten to --target, and they are replayed with asyncio over a fixed pool
+of keep-alive connections. Three pacing modes are supported:
+
+- timed: keep the recorded inter-arrival times, optionally sped up (--speed)
+- rate:  issue requests at a fixed --rate per second
+- max:   closed loop, as fast as the --concurrency connections allow
+
+At the end, throughput, latency percentiles and error rates are reported per
+normalized route (see har_latency_report.py). Only GET requests are replayed
+unless --methods says otherwise, so a replay does not create data by accident.
+
+Only the standard library is used; the HTTP/1.1 client below is deliberately
+minimal and intended for a local plain-HTTP dev server.
+
+Usage:
+    python har_replay.py capture.har --target http://localhost:3000 -c 16 --mode max
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from har_cleaner import iter_har_entries
+from har_latency_report import RouteNormalizer, percentile
+
+# Headers that describe the original connection rather than the request itself
+SKIPPED_HEADERS = {
+    'host', 'connection', 'content-length', 'keep-alive', 'transfer-encoding',
+    'upgrade', 'proxy-connection', 'te', 'accept-encoding',
+}
+
+
+class HttpConnection:
+    """A single keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, target, headers, body):
+        """Sends one request and returns (status, response_bytes)."""
+        # A reused connection may have been closed by the server; retry once on a fresh one
+        for attempt in range(2):
+            reused = self.writer is not None
+            if not reused:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await asyncio.wait_for(self._exchange(method, target, headers, body), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt:
+                    raise
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _exchange(self, method, target, headers, body):
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed before response")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            pass
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                chunk_size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(chunk_size + 2)
+                size += chunk_size
+                if chunk_size == 0:
+                    # Skip any trailers
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+        elif 'content-length' in response_headers:
+            size = int(response_headers['content-length'])
+            await self.reader.readexactly(size)
+        else:
+            size = len(await self.reader.read())
+            await self.close()
+            return status, size
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, size
+
+
+def _parse_started(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def load_requests(har_path, methods, route_pattern=None, keep_cookies=False, extra_headers=()):
+    """Extracts replayable requests from a HAR, sorted by their recorded start time."""
+    requests = []
+    for entry in iter_har_entries(har_path):
+        request = entry.get('request', {})
+        method = request.get('method', 'GET').upper()
+        url = urlsplit(request.get('url', ''))
+        if method not in methods or not url.path.startswith('/api/'):
+            continue
+        if route_pattern and not route_pattern.search(url.path):
+            continue
+
+        headers = [
+            (h['name'], h['value']) for h in request.get('headers', [])
+            if not h['name'].startswith(':')
+            and h['name'].lower() not in SKIPPED_HEADERS
+            and (keep_cookies or h['name'].lower() != 'cookie')
+        ]
+        headers += list(extra_headers)
+        text = request.get('postData', {}).get('text')
+        requests.append({
+            'method': method,
+            'path': url.path,
+            'target': url.path + (f"?{url.query}" if url.query else ''),
+            'headers': headers,
+            'body': text.encode('utf-8') if text is not None else None,
+            'started': _parse_started(entry.get('startedDateTime')),
+        })
+
+    requests.sort(key=lambda r: r['started'] or 0)
+    return requests
+
+
+def schedule_offsets(requests, mode, speed=1.0, rate=None):
+    """Seconds after replay start at which each request should be sent (None = immediately)."""
+    if mode == 'max':
+        return [None] * len(requests)
+    if mode == 'rate':
+        return [i / rate for i in range(len(requests))]
+    first = next((r['started'] for r in requests if r['started'] is not None), None)
+    offsets = []
+    for r in requests:
+        if first is None or r['started'] is None:
+            offsets.append(offsets[-1] if offsets else 0.0)
+        else:
+            offsets.append((r['started'] - first) / speed)
+    return offsets
+
+
+def round_span(offsets, mode, rate=None):
+    """Seconds between the starts of two --repeat rounds: the last offset plus one gap.
+
+    The gap is 1/rate in rate mode and the mean recorded gap in timed mode, so a
+    round does not start while the previous one sends its last request.
+    """
+    last = offsets[-1] or 0
+    if mode == 'rate':
+        return last + 1 / rate
+    return last + (last / (len(offsets) - 1) if len(offsets) > 1 else 0)
+
+
+async def replay(requests, offsets, host, port, concurrency, timeout, normalizer):
+    queue = asyncio.Queue(maxsize=concurrency * 4)
+    results = []
+    start = time.perf_counter()
+
+    async def worker():
+        conn = HttpConnection(host, port, timeout)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                request, scheduled = item
+                sent = time.perf_counter()
+                try:
+                    status, size = await conn.request(request['method'], request['target'],
+                                                      request['headers'], request['body'])
+                    error = None
+                except Exception as e:
+                    status, size, error = 0, 0, f"{type(e).__name__}: {e}"
+                elapsed = time.perf_counter() - sent
+                results.append({
+                    'route': f"{request['method']} {normalizer.normalize(request['path'])}",
+                    'status': status,
+                    'bytes': size,
+                    'latency_ms': elapsed * 1000,
+                    'lag_ms': (sent - start - scheduled) * 1000 if scheduled is not None else 0.0,
+                    'error': error,
+                })
+        finally:
+            await conn.close()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    for request, offset in zip(requests, offsets):
+        if offset is not None:
+            delay = offset - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await queue.put((request, offset))
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    return results, time.perf_counter() - start
+
+
+def summarize(results, duration):
+    routes = {}
+    for result in results:
+        route = routes.setdefault(result['route'], {'latencies': [], 'errors': 0, 'bytes': 0})
+        route['latencies'].append(result['latency_ms'])
+        route['bytes'] += result['bytes']
+        if result['error'] or result['status'] >= 400:
+            route['errors'] += 1
+
+    summary = {}
+    for key, route in routes.items():
+        latencies = sorted(route['latencies'])
+        summary[key] = {
+            'count': len(latencies),
+            'throughput_rps': len(latencies) / duration if duration else None,
+            'error_rate': route['errors'] / len(latencies),
+            'latency_ms': {f"p{pct}": percentile(latencies, pct) for pct in (50, 95, 99)},
+            'bytes': route['bytes'],
+        }
+    lags = sorted(r['lag_ms'] for r in results)
+    totals = {
+        'requests': len(results),
+        'duration_s': duration,
+        'throughput_rps': len(results) / duration if duration else None,
+        'error_rate': sum(1 for r in results if r['error'] or r['status'] >= 400) / len(results) if results else 0,
+        'latency_ms': {f"p{pct}": percentile(sorted(r['latency_ms'] for r in results), pct) for pct in (50, 95, 99)},
+        'schedule_lag_p95_ms': percentile(lags, 95),
+    }
+    return totals, summary
+
+
+def format_summary(totals, summary):
+    lines = [
+        f"Replayed {totals['requests']} requests in {totals['duration_s']:.2f}s "
+        f"({totals['throughput_rps']:.1f} req/s), error rate {totals['error_rate']:.1%}",
+        f"Latency p50/p95/p99: " + '/'.join(f"{totals['latency_ms'][k]:.0f}" for k in ('p50', 'p95', 'p99'))
+        + f" ms; p95 schedule lag {totals['schedule_lag_p95_ms']:.0f} ms",
+        '',
+        f"{'Route':<48} {'Count':>6} {'req/s':>7} {'Errors':>7} {'p50/p95/p99 ms':>18}",
+    ]
+    lines.append('-' * len(lines[-1]))
+    for key, stats in sorted(summary.items(), key=lambda kv: -kv[1]['count']):
+        lat = '/'.join(f"{stats['latency_ms'][k]:.0f}" for k in ('p50', 'p95', 'p99'))
+        lines.append(f"{key[:48]:<48} {stats['count']:>6} {stats['throughput_rps']:>7.1f} "
+                     f"{stats['error_rate']:>7.1%} {lat:>18}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay API requests from a HAR against a local QDrill server.')
+    parser.add_argument('har_file', help='HAR capture to replay (cleaned or raw).')
+    parser.add_argument('--target', default='http://localhost:3000', help='Server to replay against (default: http://localhost:3000).')
+    parser.add_argument('--mode', choices=('timed', 'rate', 'max'), default='timed',
+                        help='Pacing: recorded timing, fixed rate, or as fast as possible (default: timed).')
+    parser.add_argument('--speed', type=float, default=1.0, help='Time compression factor for --mode timed (e.g. 10 = 10x faster).')
+    parser.add_argument('--rate', type=float, help='Requests per second for --mode rate.')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Number of keep-alive connections (default: 8).')
+    parser.add_argument('--repeat', type=int, default=1, help='Replay the request list this many times.')
+    parser.add_argument('--methods', default='GET', help='Comma-separated HTTP methods to replay (default: GET).')
+    parser.add_argument('--route', help='Only replay requests whose path matches this regex (e.g. "^/api/drills").')
+    parser.add_argument('--keep-cookies', action='store_true', help='Send the recorded Cookie headers.')
+    parser.add_argument('-H', '--header', action='append', default=[], help='Extra header "Name: value" (repeatable).')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds.')
+    parser.add_argument('--json', dest='json_path', help='Also write the summary as JSON to this path.')
+    args = parser.parse_args()
+
+    target = urlsplit(args.target)
+    if target.scheme != 'http':
+        parser.error("Only plain http:// targets are supported (replay against a local server).")
+    if args.mode == 'rate' and not args.rate:
+        parser.error("--mode rate requires --rate.")
+
+    extra_headers = []
+    for header in args.header:
+        name, sep, value = header.partition(':')
+        if not sep:
+            parser.error(f"Invalid header (expected 'Name: value'): {header}")
+        extra_headers.append((name.strip(), value.strip()))
+
+    methods = {m.strip().upper() for m in args.methods.split(',') if m.strip()}
+    route_pattern = re.compile(args.route) if args.route else None
+    requests = load_requests(args.har_file, methods, route_pattern, args.keep_cookies, extra_headers)
+    if not requests:
+        print("No matching API requests found in the HAR.")
+        sys.exit(1)
+
+    offsets = schedule_offsets(requests, args.mode, args.speed, args.rate)
+    if args.repeat > 1:
+        span = round_span(offsets, args.mode, args.rate)
+        requests = requests * args.repeat
+        offsets = [None if o is None else o + span * (i // len(offsets))
+                   for i, o in enumerate(offsets * args.repeat)]
+
+    print(f"Replaying {len(requests)} requests against {args.target} "
+          f"(mode={args.mode}, concurrency={args.concurrency})...")
+    results, duration = asyncio.run(replay(requests, offsets, target.hostname, target.port or 80,
+                                           args.concurrency, args.timeout, RouteNormalizer()))
+    totals, summary = summarize(results, duration)
+    print(format_summary(totals, summary))
+
+    errors = [r['error'] for r in results if r['error']]
+    if errors:
+        print(f"\nFirst transport error: {errors[0]}")
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'totals': totals, 'routes': summary}, f, indent=2)
+        print(f"\nJSON summary saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,58 +9,25 @@ This script will:
 3. Update existing drills to have SEEKERS parallel_timeline where appropriate
 """
 
-import psycopg2
-import os
-import sys
+import argparse
+from contextlib import nullcontext
 
-# Database connection
-DB_URL = os.environ.get('NEON_DB_URL')
-
-def execute_query(query, params=None):
-    """Execute a query and return results"""
-    try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-        if params:
-            cur.execute(query, params)
-        else:
-            cur.execute(query)
-        
-        # If it's a SELECT query, fetch results
-        if query.strip().upper().startswith('SELECT'):
-            results = cur.fetchall()
-            cur.close()
-            conn.close()
-            return results
-        else:
-            # For UPDATE/INSERT/DELETE, commit the transaction
-            conn.commit()
-            cur.close()
-            conn.close()
-            return True
-    except Exception as e:
-        print(f"Database error: {e}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
-        return None
+from db_session import execute_query, transaction
+from plan_ordering import PlanOrder
 
 def integrate_seekers():
     """Main function to integrate seekers throughout the practice"""
     
     print("Starting seeker integration for practice plan 65...")
     
-    # Step 1: Get current seeker drills from the Seeker Track section
-    seeker_drills = execute_query("""
-        SELECT id, drill_id, name, duration, order_in_plan 
-        FROM practice_plan_drills 
-        WHERE practice_plan_id = 65 AND section_id = 136
-        ORDER BY order_in_plan
-    """)
+    # Step 1: Load the plan once; moves and removals below are laid out in memory
+    # and written together, instead of shifting order values statement by statement
+    plan = PlanOrder.load(65)
+    seeker_drills = plan.items(136)
     
     print(f"\nFound {len(seeker_drills)} items in Seeker Track section:")
     for drill in seeker_drills:
-        print(f"  - {drill[2]} (duration: {drill[3]} min)")
+        print(f"  - {drill['name']} (duration: {drill['duration']} min)")
     
     # Step 2: Update warm-up chasers drills to include seekers
     print("\n\nUpdating warm-up drills to include seekers...")
@@ -75,90 +42,40 @@ def integrate_seekers():
         RETURNING id, name
     """)
     
-    # Step 3: Move catching progression drills to Drills section (131)
-    print("\n\nMoving seeker catching drills to main Drills section...")
-    
-    # Update Claw drill, Leg load and dive, Full dive to be in parallel with beater/chaser drills
+    # Steps 3-5: Seeker drills become SEEKERS parallel activities in the main sections
     catching_drills = ['Claw drill', 'Leg load and dive', 'Full dive']
+    moves = [(name, 131, 3 + i) for i, name in enumerate(catching_drills)]
+    moves.append(('1v1 with snitch', 131, 6))
+    moves.append(('2v1 with snitch', 133, 4))
     
-    for i, drill_name in enumerate(catching_drills):
-        result = execute_query("""
-            UPDATE practice_plan_drills 
-            SET section_id = 131, 
-                parallel_timeline = 'SEEKERS',
-                order_in_plan = %s
-            WHERE practice_plan_id = 65 
-            AND name = %s
-            RETURNING id, name
-        """, (3 + i, drill_name))
-        
-        if result:
-            print(f"  ✓ Moved {drill_name} to Drills section as SEEKERS parallel activity")
-    
-    # Step 4: Move 1v1 with snitch to Drills section as well
-    print("\n\nMoving 1v1 with snitch to main Drills section...")
-    
-    result = execute_query("""
+    execute_query("""
         UPDATE practice_plan_drills 
-        SET section_id = 131, 
-            parallel_timeline = 'SEEKERS',
-            order_in_plan = 6
+        SET parallel_timeline = 'SEEKERS'
         WHERE practice_plan_id = 65 
-        AND name = '1v1 with snitch'
-        RETURNING id, name
-    """)
-    
-    if result:
-        print(f"  ✓ Moved 1v1 with snitch to Drills section")
+        AND name = ANY(%s)
+    """, ([name for name, _, _ in moves],))
     
-    # Step 5: Move 2v1 with snitch to Aggressive Defence section (133)
-    print("\n\nMoving 2v1 with snitch to Aggressive Defence section...")
-    
-    result = execute_query("""
-        UPDATE practice_plan_drills 
-        SET section_id = 133, 
-            parallel_timeline = 'SEEKERS',
-            order_in_plan = 4
-        WHERE practice_plan_id = 65 
-        AND name = '2v1 with snitch'
-        RETURNING id, name
-    """)
-    
-    if result:
-        print(f"  ✓ Moved 2v1 with snitch to Aggressive Defence section")
+    print("\n\nMoving seeker drills into the Drills and Aggressive Defence sections...")
+    for name, section_id, position in moves:
+        for item in plan.find(name):
+            plan.move_item(item['id'], section_id, position)
+            print(f"  ✓ Moving {name} to section {section_id} as SEEKERS parallel activity")
     
     # Step 6: Delete "Join scrimmage" as seekers will naturally join scrimmages
     print("\n\nRemoving redundant 'Join scrimmage' item...")
     
-    execute_query("""
-        DELETE FROM practice_plan_drills 
-        WHERE practice_plan_id = 65 
-        AND name = 'Join scrimmage'
-    """)
-    
-    print("  ✓ Removed 'Join scrimmage' item")
+    for item in plan.find('Join scrimmage'):
+        plan.remove_item(item['id'])
     
-    # Step 7: Check if Seeker Track section is now empty and can be removed
-    remaining_items = execute_query("""
-        SELECT COUNT(*) 
-        FROM practice_plan_drills 
-        WHERE practice_plan_id = 65 AND section_id = 136
-    """)
-    
-    if remaining_items and remaining_items[0][0] == 0:
+    # Step 7: Remove the Seeker Track section if it is now empty; the sections
+    # after it close the gap when the new order is written
+    if not plan.items(136):
         print("\n\nSeeker Track section is now empty. Removing it...")
-        execute_query("""
-            DELETE FROM practice_plan_sections 
-            WHERE practice_plan_id = 65 AND id = 136
-        """)
-        print("  ✓ Removed empty Seeker Track section")
-        
-        # Update order of remaining sections
-        execute_query("""
-            UPDATE practice_plan_sections 
-            SET "order" = "order" - 1 
-            WHERE practice_plan_id = 65 AND "order" > 7
-        """)
+        plan.remove_section(136)
+    
+    counts = plan.apply()
+    print(f"  ✓ Renumbered {counts['moved']} items, removed {counts['deleted']} items, "
+          f"updated {counts['sections']} sections")
     
     # Step 8: Verify the changes
     print("\n\n=== VERIFICATION ===")
@@ -192,5 +109,14 @@ def integrate_seekers():
     print("- 2v1 competitive seeking during defensive drills")
     print("- Join all scrimmages for snitch periods")
 
+def main():
+    parser = argparse.ArgumentParser(description='Integrate seeker activities throughout practice plan 65.')
+    parser.add_argument('--atomic', action='store_true',
+                        help='Apply every statement in a single transaction (all or nothing).')
+    args = parser.parse_args()
+
+    with transaction() if args.atomic else nullcontext():
+        integrate_seekers()
+
 if __name__ == "__main__":
-    integrate_seekers()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Bulk-load drill-bank CSVs straight into the drills table with COPY.
+
+Meant for seeding a fresh database or a staging copy, where going through the
+HTTP API would cost one request (and one transaction) per drill. The load runs
+in a single transaction:
+
+1. rows are decoded and validated by practice-plan-conversion/drill_bank.py,
+   normalized like drillService.normalizeDrillData (trimmed, lower-cased array
+   fields) and streamed into a temporary staging table with COPY FROM STDIN;
+2. one INSERT ... SELECT merges the staging table into drills, skipping
+   names that already exist (case-insensitive) unless --allow-duplicates is
+   given, and computing search_vector with the same expression as the
+   add_search_vector_to_drills migration;
+3. skills.drills_used_in / usage_count are bumped with one set-based upsert
+   for the loaded drills, or fully rebuilt with --recompute-skills.
+
+With --disable-trigger (needs table ownership), drills_search_vector_trigger
+is switched off for the transaction so search_vector is computed once per row
+by the INSERT, not a second time by the row trigger.
+
+Usage:
+    python load_drills_copy.py ../drill-banks/canada3.csv [more.csv ...] --dry-run
+    python load_drills_copy.py ../drill-banks/*.csv --visibility public --disable-trigger
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from db_session import copy_expert, execute_query, transaction
+from recompute_skill_counts import apply_changes as recompute_skill_counts
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'practice-plan-conversion'))
+from drill_bank import iter_drill_bank  # noqa: E402
+
+STAGING_COLUMNS = (
+    'name', 'brief_description', 'detailed_description', 'skill_level', 'complexity',
+    'suggested_length_min', 'suggested_length_max', 'number_of_people_min', 'number_of_people_max',
+    'skills_focused_on', 'positions_focused_on', 'drill_type', 'video_link',
+)
+ARRAY_COLUMNS = {'skill_level', 'skills_focused_on', 'positions_focused_on', 'drill_type'}
+
+CREATE_STAGING = """
+    CREATE TEMP TABLE drill_staging (
+        name text NOT NULL,
+        brief_description text NOT NULL,
+        detailed_description text,
+        skill_level text[],
+        complexity text,
+        suggested_length_min integer,
+        suggested_length_max integer,
+        number_of_people_min integer,
+        number_of_people_max integer,
+        skills_focused_on text[],
+        positions_focused_on text[],
+        drill_type text[],
+        video_link text
+    ) ON COMMIT DROP
+"""
+
+SEARCH_VECTOR_EXPR = """
+    setweight(to_tsvector('english', coalesce(s.name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(s.brief_description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(s.detailed_description, '')), 'C')
+"""
+
+MERGE_STAGING = f"""
+    WITH deduped AS (
+        SELECT DISTINCT ON (lower(name)) *
+        FROM drill_staging
+        ORDER BY lower(name)
+    ),
+    inserted AS (
+        INSERT INTO drills (
+            {', '.join(STAGING_COLUMNS)},
+            images, diagrams, upload_source, created_by, visibility,
+            is_editable_by_others, date_created, search_vector
+        )
+        SELECT {', '.join('s.' + column for column in STAGING_COLUMNS)},
+               '{{}}', '{{}}', %(upload_source)s, %(created_by)s, %(visibility)s,
+               false, now(), {SEARCH_VECTOR_EXPR}
+        FROM deduped s
+        WHERE %(allow_duplicates)s
+           OR NOT EXISTS (SELECT 1 FROM drills d WHERE lower(d.name) = lower(s.name))
+        RETURNING id
+    )
+    SELECT coalesce(array_agg(id), '{{}}') FROM inserted
+"""
+
+BUMP_SKILL_COUNTS = """
+    INSERT INTO skills (skill, drills_used_in, usage_count)
+    SELECT skill, count(*), count(*)
+    FROM (
+        SELECT DISTINCT d.id, u.skill
+        FROM drills d
+        CROSS JOIN LATERAL unnest(d.skills_focused_on) AS u(skill)
+        WHERE d.id = ANY(%s)
+    ) loaded
+    GROUP BY skill
+    ON CONFLICT (skill) DO UPDATE SET
+        drills_used_in = skills.drills_used_in + excluded.drills_used_in,
+        usage_count = skills.usage_count + excluded.usage_count
+    RETURNING skill
+"""
+
+
+def copy_escape(value):
+    """Formats one value for COPY's text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, list):
+        value = '{' + ','.join(
+            '"' + item.replace('\\', '\\\\').replace('"', '\\"') + '"' for item in value
+        ) + '}'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def staging_row(drill):
+    """Flattens a decoded drill into staging columns, normalized like normalizeDrillData."""
+    values = {
+        'name': drill['name'],
+        'brief_description': drill['brief_description'],
+        'detailed_description': drill['detailed_description'] or None,
+        'complexity': drill['complexity'],
+        'suggested_length_min': drill['suggested_length']['min'],
+        'suggested_length_max': drill['suggested_length']['max'],
+        'number_of_people_min': drill['number_of_people']['min'],
+        'number_of_people_max': drill['number_of_people']['max'],
+        'video_link': drill['video_link'],
+    }
+    for column in ARRAY_COLUMNS:
+        values[column] = [item.strip().lower() for item in drill[column] if item.strip()]
+    return '\t'.join(copy_escape(values[column]) for column in STAGING_COLUMNS) + '\n'
+
+
+class CopySource:
+    """File-like object that renders rows for COPY lazily, as psycopg2 reads them."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+def iter_valid_rows(paths, stats, max_errors_shown=20):
+    """Yields COPY lines for every valid row of the given drill banks."""
+    for path in paths:
+        for row_number, drill, errors in iter_drill_bank(path):
+            stats['rows'] += 1
+            if errors:
+                stats['invalid'] += 1
+                if stats['invalid'] <= max_errors_shown:
+                    print(f"  ✗ {os.path.basename(path)} row {row_number} "
+                          f"({drill['name'] or 'unnamed'}): {'; '.join(errors)}")
+                continue
+            stats['valid'] += 1
+            yield staging_row(drill)
+
+
+def load(paths, upload_source, visibility='public', created_by=None, allow_duplicates=False,
+         disable_trigger=False, recompute_skills=False):
+    """Runs the whole load in one transaction and returns a stats dict."""
+    stats = {'rows': 0, 'invalid': 0, 'valid': 0}
+    with transaction():
+        if disable_trigger:
+            execute_query("ALTER TABLE drills DISABLE TRIGGER drills_search_vector_trigger")
+        execute_query(CREATE_STAGING)
+
+        start = time.perf_counter()
+        stats['staged'] = copy_expert(
+            f"COPY drill_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN",
+            CopySource(iter_valid_rows(paths, stats))
+        )
+        stats['copy_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        inserted_ids = execute_query(MERGE_STAGING, {
+            'upload_source': upload_source,
+            'created_by': created_by,
+            'visibility': visibility,
+            'allow_duplicates': allow_duplicates,
+        })[0][0]
+        stats['inserted'] = len(inserted_ids)
+        stats['merge_seconds'] = time.perf_counter() - start
+
+        if disable_trigger:
+            execute_query("ALTER TABLE drills ENABLE TRIGGER drills_search_vector_trigger")
+
+        start = time.perf_counter()
+        if recompute_skills:
+            updated, inserted = recompute_skill_counts(insert_missing=True)
+            stats['skills'] = len(updated) + len(inserted)
+        elif inserted_ids:
+            # Only the rows this run inserted; earlier loads under the same
+            # upload_source are already counted
+            stats['skills'] = len(execute_query(BUMP_SKILL_COUNTS, (inserted_ids,)))
+        else:
+            stats['skills'] = 0
+        stats['skills_seconds'] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load drill-bank CSVs into the drills table with COPY.')
+    parser.add_argument('csv_paths', nargs='+', help='Drill-bank CSV file(s).')
+    parser.add_argument('--visibility', choices=['public', 'unlisted', 'private'], default='public')
+    parser.add_argument('--created-by', help='User ID to record as creator (default: none).')
+    parser.add_argument('--upload-source', help='upload_source tag for the loaded drills '
+                                                '(default: <first file>_copy_<timestamp>).')
+    parser.add_argument('--allow-duplicates', action='store_true',
+                        help='Also insert drills whose name already exists in the table.')
+    parser.add_argument('--disable-trigger', action='store_true',
+                        help='Disable drills_search_vector_trigger during the load (requires table owner).')
+    parser.add_argument('--recompute-skills', action='store_true',
+                        help='Rebuild all skill counters afterwards instead of bumping them for the new drills.')
+    parser.add_argument('--dry-run', action='store_true', help='Decode and validate only; do not touch the database.')
+    args = parser.parse_args()
+
+    missing = [path for path in args.csv_paths if not os.path.exists(path)]
+    if missing:
+        print(f"Error: Input file not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    if args.dry_run:
+        stats = {'rows': 0, 'invalid': 0, 'valid': 0}
+        staged_bytes = sum(len(line) for line in iter_valid_rows(args.csv_paths, stats))
+        print(f"\n{stats['rows']} rows read, {stats['valid']} valid, {stats['invalid']} invalid "
+              f"({staged_bytes / 1024:.0f} KiB of COPY data)")
+        return
+
+    upload_source = args.upload_source or (
+        f"{os.path.splitext(os.path.basename(args.csv_paths[0]))[0]}_copy_{int(time.time())}"
+    )
+    print(f"Loading {len(args.csv_paths)} drill bank(s) as upload_source '{upload_source}'")
+    print("="*60)
+    try:
+        stats = load(args.csv_paths, upload_source, args.visibility, args.created_by,
+                     args.allow_duplicates, args.disable_trigger, args.recompute_skills)
+    except Exception as e:
+        print(f"\n✗ Load failed, nothing was written: {e}")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"Rows read: {stats['rows']} ({stats['invalid']} invalid, skipped)")
+    print(f"Staged with COPY: {stats['staged']} rows in {stats['copy_seconds']:.2f} s")
+    print(f"Inserted into drills: {stats['inserted']} in {stats['merge_seconds']:.2f} s "
+          f"({stats['staged'] - stats['inserted']} skipped as duplicates)")
+    print(f"Skill counters updated: {stats['skills']} in {stats['skills_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Consolidate near-duplicate drills (e.g. "5 point star" vs "Five star").
+
+Like merge_duplicate_skills.py does for case-variant skills, this job finds
+clusters of drills that are really the same drill and folds each cluster
+into one surviving drill, so votes and plan usage are no longer split.
+
+Finding clusters: every drill is fingerprinted by drill_dedup.py
+(practice-plan-conversion/) and indexed with MinHash/LSH. Each drill is only
+compared with the few drills sharing a bucket, never with the whole table.
+Drills are visited most-used first, and each unassigned drill absorbs the
+unassigned drills whose combined name/description similarity reaches
+--threshold. A public drill in a cluster always survives, so a private or
+unlisted copy never takes a public drill out of public view. Otherwise the
+most-used drill survives, and ties go to the oldest. Private drills are only
+merged with drills of the same creator.
+
+Merging: clusters are applied in batches, one transaction per batch. The
+loser -> survivor mapping is loaded into a temp table. Then one set-based
+statement each:
+- repoints practice_plan_drills and season_section_drills;
+- drops votes that would become duplicates;
+- repoints the remaining votes (and their item_name) and the comments;
+- repoints drill variations (parent_drill_id);
+- deletes the losers.
+Skill counters are rebuilt once at the end with recompute_skill_counts.
+
+Usage:
+    python merge_duplicate_drills.py --dry-run
+    python merge_duplicate_drills.py --threshold 0.9 --batch-size 100
+"""
+
+import argparse
+import os
+import sys
+
+from db_session import execute_batch, execute_query, transaction
+from recompute_skill_counts import apply_changes as recompute_skill_counts
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'practice-plan-conversion'))
+from drill_dedup import NearDuplicateIndex  # noqa: E402
+
+FETCH_DRILLS = """
+    SELECT d.id, d.name, d.brief_description, d.detailed_description, d.created_by, d.visibility,
+           coalesce(p.uses, 0) + coalesce(v.votes, 0) AS usage
+    FROM drills d
+    LEFT JOIN (
+        SELECT drill_id, count(*) AS uses FROM practice_plan_drills
+        WHERE drill_id IS NOT NULL GROUP BY drill_id
+    ) p ON p.drill_id = d.id
+    LEFT JOIN (
+        SELECT drill_id, count(*) AS votes FROM votes
+        WHERE drill_id IS NOT NULL GROUP BY drill_id
+    ) v ON v.drill_id = d.id
+    ORDER BY d.id
+"""
+
+MERGE_STATEMENTS = [
+    ("Plan items repointed", """
+        UPDATE practice_plan_drills p
+        SET drill_id = m.survivor
+        FROM drill_merge_map m
+        WHERE p.drill_id = m.loser
+        RETURNING 1
+    """),
+    ("Season template drills repointed", """
+        UPDATE season_section_drills ssd
+        SET drill_id = m.survivor
+        FROM drill_merge_map m
+        WHERE ssd.drill_id = m.loser
+        RETURNING 1
+    """),
+    # A user who voted for the survivor (or for an earlier loser of the same
+    # cluster) would end up with two votes on one drill
+    ("Duplicate votes dropped", """
+        DELETE FROM votes v
+        USING drill_merge_map m
+        WHERE v.drill_id = m.loser
+          AND (
+              EXISTS (SELECT 1 FROM votes w WHERE w.user_id = v.user_id AND w.drill_id = m.survivor)
+              OR EXISTS (
+                  SELECT 1 FROM votes w
+                  JOIN drill_merge_map m2 ON m2.loser = w.drill_id
+                  WHERE m2.survivor = m.survivor AND w.user_id = v.user_id AND w.id < v.id
+              )
+          )
+        RETURNING 1
+    """),
+    ("Votes repointed", """
+        UPDATE votes v
+        SET drill_id = m.survivor, item_name = s.name
+        FROM drill_merge_map m
+        JOIN drills s ON s.id = m.survivor
+        WHERE v.drill_id = m.loser
+        RETURNING 1
+    """),
+    ("Comments repointed", """
+        UPDATE comments c
+        SET drill_id = m.survivor
+        FROM drill_merge_map m
+        WHERE c.drill_id = m.loser
+        RETURNING 1
+    """),
+    ("Variations repointed", """
+        UPDATE drills d
+        SET parent_drill_id = CASE WHEN d.id = m.survivor THEN NULL ELSE m.survivor END
+        FROM drill_merge_map m
+        WHERE d.parent_drill_id = m.loser
+        RETURNING 1
+    """),
+    ("Drills deleted", """
+        DELETE FROM drills d
+        USING drill_merge_map m
+        WHERE d.id = m.loser
+        RETURNING 1
+    """),
+]
+
+
+def fetch_drills():
+    rows = execute_query(FETCH_DRILLS) or []
+    return [
+        {'id': row[0], 'name': row[1], 'brief_description': row[2], 'detailed_description': row[3],
+         'created_by': row[4], 'visibility': row[5], 'usage': row[6]}
+        for row in rows
+    ]
+
+
+def can_merge(survivor, loser):
+    """Public drills merge freely; anything else only within one creator's drills."""
+    if survivor['visibility'] == 'public' and loser['visibility'] == 'public':
+        return True
+    return survivor['created_by'] is not None and survivor['created_by'] == loser['created_by']
+
+
+def pick_survivor(drill, losers):
+    """Prefers a public survivor over a more-used private/unlisted one; returns (survivor, losers)."""
+    survivor, score = min(losers, key=lambda entry: (entry[0]['visibility'] != 'public',
+                                                     -entry[0]['usage'], entry[0]['id']))
+    if drill['visibility'] == 'public' or survivor['visibility'] != 'public':
+        return drill, losers
+    # Similarity is symmetric: the old survivor scores what the new one did
+    return survivor, [(drill, score)] + [entry for entry in losers if entry[0] is not survivor]
+
+
+def find_clusters(drills, threshold):
+    """Groups near-duplicate drills; returns [(survivor, [(loser, score), ...]), ...]."""
+    index = NearDuplicateIndex(similar_threshold=threshold)
+    by_id = {}
+    for drill in drills:
+        index.add(drill['id'], drill)
+        by_id[drill['id']] = drill
+
+    assigned = set()
+    clusters = []
+    for drill in sorted(drills, key=lambda d: (-d['usage'], d['id'])):
+        if drill['id'] in assigned:
+            continue
+        losers = []
+        for match in index.query(drill, index.entries[drill['id']]):
+            other = by_id[match['key']]
+            if (other['id'] == drill['id'] or other['id'] in assigned
+                    or match['score'] < threshold or not can_merge(drill, other)):
+                continue
+            losers.append((other, match['score']))
+            assigned.add(other['id'])
+        if losers:
+            assigned.add(drill['id'])
+            clusters.append(pick_survivor(drill, losers))
+    return clusters
+
+
+def merge_batch(clusters):
+    """Applies one batch of clusters in a single transaction; returns per-statement row counts."""
+    mapping = [(loser['id'], survivor['id']) for survivor, losers in clusters for loser, _ in losers]
+    counts = {}
+    with transaction():
+        execute_query("""
+            CREATE TEMP TABLE drill_merge_map (
+                loser integer PRIMARY KEY,
+                survivor integer NOT NULL
+            ) ON COMMIT DROP
+        """)
+        execute_batch("INSERT INTO drill_merge_map (loser, survivor) VALUES %s", mapping)
+        execute_query("ANALYZE drill_merge_map")
+        for label, statement in MERGE_STATEMENTS:
+            counts[label] = len(execute_query(statement))
+    return counts
+
+
+def print_clusters(clusters):
+    for survivor, losers in clusters:
+        print(f"  Keep {survivor['id']}: {survivor['name']} (used {survivor['usage']}x)")
+        for loser, score in losers:
+            print(f"    <- {loser['id']}: {loser['name']} (used {loser['usage']}x, similarity {score:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge near-duplicate drills into one surviving drill.')
+    parser.add_argument('--threshold', type=float, default=0.85,
+                        help='Minimum combined name/description similarity to merge (default: 0.85).')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Clusters merged per transaction (default: 100).')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the clusters that would be merged.')
+    args = parser.parse_args()
+
+    drills = fetch_drills()
+    print(f"Fingerprinting {len(drills)} drills...")
+    clusters = find_clusters(drills, args.threshold)
+    if not clusters:
+        print("No near-duplicate drills found to merge.")
+        return
+
+    total_losers = sum(len(losers) for _, losers in clusters)
+    print(f"Found {len(clusters)} clusters ({total_losers} drills to fold into survivors).\n")
+    print_clusters(clusters)
+    if args.dry_run:
+        return
+
+    totals = {}
+    batch_size = max(1, args.batch_size)
+    for start in range(0, len(clusters), batch_size):
+        batch = clusters[start:start + batch_size]
+        try:
+            counts = merge_batch(batch)
+        except Exception as e:
+            print(f"\n  Error merging clusters {start + 1}-{start + len(batch)}, batch rolled back: {e}")
+            sys.exit(1)
+        for label, count in counts.items():
+            totals[label] = totals.get(label, 0) + count
+        print(f"  ✓ Merged clusters {start + 1}-{start + len(batch)}")
+
+    updated, inserted = recompute_skill_counts(insert_missing=True)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    for label, count in totals.items():
+        print(f"{label}: {count}")
+    print(f"Skill counters recomputed: {len(updated) + len(inserted)} skills changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+import argparse
 import os
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 
 def get_db_connection():
     db_url = os.environ.get("NEON_DB_URL")
@@ -106,7 +108,94 @@ def merge_skill_group(conn, lcase_skill, actual_skills, total_usage, total_drill
             # Optionally, re-raise or log more detailed error information
             raise 
 
+def merge_all_groups_set_based(conn, duplicate_groups):
+    """Merges every duplicate group at once with set-based statements.
+
+    Instead of rewriting the drills table once per group, the whole
+    variant -> canonical mapping is loaded into a temp table and each affected
+    drill's skills_focused_on is rewritten exactly once. The canonical skills
+    are upserted and the variants deleted with one statement each, and the
+    whole merge is committed (or rolled back) as a single transaction.
+    """
+    mapping = [
+        (skill, lcase_skill)
+        for lcase_skill, actual_skills, _, _ in duplicate_groups
+        for skill in set(actual_skills)
+    ]
+    print(f"Merging {len(duplicate_groups)} groups ({len(mapping)} skill variants) in one pass...")
+
+    with conn.cursor() as cur:
+        try:
+            cur.execute("""
+                CREATE TEMP TABLE skill_merge_map (
+                    variant text PRIMARY KEY,
+                    canonical text NOT NULL
+                ) ON COMMIT DROP;
+            """)
+            execute_values(cur, "INSERT INTO skill_merge_map (variant, canonical) VALUES %s", mapping)
+            cur.execute("ANALYZE skill_merge_map;")
+
+            # Step 1: Rewrite each affected drill once. Skills are mapped to their
+            # canonical form, de-duplicated, and kept in first-occurrence order.
+            cur.execute("""
+                UPDATE drills d
+                SET skills_focused_on = rewritten.skills
+                FROM (
+                    SELECT affected.id,
+                           array_agg(merged.skill ORDER BY merged.first_ord) AS skills
+                    FROM drills affected
+                    CROSS JOIN LATERAL (
+                        SELECT coalesce(m.canonical, u.skill) AS skill, min(u.ord) AS first_ord
+                        FROM unnest(affected.skills_focused_on) WITH ORDINALITY AS u(skill, ord)
+                        LEFT JOIN skill_merge_map m ON m.variant = u.skill
+                        GROUP BY 1
+                    ) merged
+                    WHERE affected.skills_focused_on && ARRAY(
+                        SELECT variant FROM skill_merge_map WHERE variant <> canonical
+                    )
+                    GROUP BY affected.id
+                ) rewritten
+                WHERE d.id = rewritten.id;
+            """)
+            print(f"    Drills updated: {cur.rowcount} rows")
+
+            # Step 2: Upsert every canonical skill with the summed counters of its group
+            cur.execute("""
+                INSERT INTO skills (skill, usage_count, drills_used_in)
+                SELECT m.canonical,
+                       coalesce(sum(s.usage_count), 0),
+                       coalesce(sum(s.drills_used_in), 0)
+                FROM skill_merge_map m
+                JOIN skills s ON s.skill = m.variant
+                GROUP BY m.canonical
+                ON CONFLICT (skill) DO UPDATE SET
+                    usage_count = EXCLUDED.usage_count,
+                    drills_used_in = EXCLUDED.drills_used_in;
+            """)
+            print(f"    Canonical skills upserted: {cur.rowcount} rows")
+
+            # Step 3: Delete all non-canonical variants
+            cur.execute("""
+                DELETE FROM skills s
+                USING skill_merge_map m
+                WHERE s.skill = m.variant AND m.variant <> m.canonical;
+            """)
+            print(f"    Original variant skills deleted: {cur.rowcount} rows")
+
+            conn.commit()
+            print("  Successfully merged all groups in a single transaction.\n")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"  Error during set-based merge, no changes were applied: {e}")
+            raise
+
 def main():
+    parser = argparse.ArgumentParser(description='Merge skills that differ only by case.')
+    parser.add_argument('--set-based', action='store_true',
+                        help='Merge all groups in one transaction, rewriting each drill once.')
+    args = parser.parse_args()
+
     conn = None
     try:
         conn = get_db_connection()
@@ -117,6 +206,11 @@ def main():
             return
 
         print(f"Found {len(duplicate_groups)} skill groups to merge.\n")
+        if args.set_based:
+            merge_all_groups_set_based(conn, duplicate_groups)
+            print("Successfully merged all identified duplicate skills.")
+            return
+
         for group_data in duplicate_groups:
             lcase_skill, actual_skills, total_usage, total_drills_used = group_data
             
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Recompute parallel_group_id / group_timelines for every practice plan.
+
+fix_parallel_groups.py repairs one hand-picked plan by drill name. This job
+works out the groups from the data itself, so it can repair the whole table:
+
+1. every practice_plan_drills row is read once, ordered by plan, section and
+   order_in_plan;
+2. within a section, items tagged with a parallel_timeline are laid out on
+   their own timeline, one after another, starting when the last untagged
+   (all-hands) item before them ends. Each item becomes an interval
+   [start, start + duration);
+3. an interval sweep merges overlapping intervals into groups. Intervals that
+   overlap, directly or through a chain, share a group. A group spanning two
+   or more timelines gets one parallel_group_id, and every member gets the
+   group's positions as group_timelines ("CHASERS/KEEPERS" counts as both).
+   Items that overlap nothing, or only their own timeline, are ungrouped.
+
+Existing group IDs are kept where the grouping already matches, and only rows
+whose values change are written: one UPDATE ... FROM (VALUES ...) per plan.
+Formations and zero-length items take no time and are left untouched.
+
+Usage:
+    python normalize_parallel_groups.py --dry-run
+    python normalize_parallel_groups.py --plan-id 65 --atomic
+"""
+
+import argparse
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from itertools import groupby
+
+from db_session import execute_batch, execute_query, transaction
+
+ALL_TIMELINE = 'ALL'
+
+FETCH_ITEMS = """
+    SELECT id, practice_plan_id, section_id, name, type, duration,
+           parallel_timeline, parallel_group_id, group_timelines::text[]
+    FROM practice_plan_drills
+    {where}
+    ORDER BY practice_plan_id, section_id, order_in_plan, id
+"""
+
+UPDATE_GROUPS = """
+    UPDATE practice_plan_drills p
+    SET parallel_group_id = v.parallel_group_id,
+        group_timelines = v.group_timelines
+    FROM (VALUES %s) AS v(id, parallel_group_id, group_timelines)
+    WHERE p.id = v.id
+"""
+
+
+def fetch_items(plan_ids=None):
+    where, params = '', None
+    if plan_ids:
+        where, params = 'WHERE practice_plan_id = ANY(%s)', (list(plan_ids),)
+    rows = execute_query(FETCH_ITEMS.format(where=where), params) or []
+    return [
+        {'id': row[0], 'practice_plan_id': row[1], 'section_id': row[2], 'name': row[3], 'type': row[4],
+         'duration': row[5] or 0, 'parallel_timeline': row[6], 'parallel_group_id': row[7],
+         'group_timelines': row[8]}
+        for row in rows
+    ]
+
+
+def timeline_positions(timeline):
+    """'CHASERS/KEEPERS' -> ['CHASERS', 'KEEPERS']."""
+    return [part.strip() for part in timeline.split('/') if part.strip()]
+
+
+def is_timed(item):
+    return item['type'] != 'formation' and item['duration'] > 0
+
+
+def is_parallel(item):
+    timeline = item['parallel_timeline']
+    return bool(timeline) and timeline.upper() != ALL_TIMELINE
+
+
+def layout_section(items):
+    """Yields (start, end, item) for the timed parallel items of one section.
+
+    Untagged items run for everyone and act as barriers: every timeline
+    resumes from the end of the latest barrier.
+    """
+    clock = 0
+    cursors = {}
+    for item in items:
+        if not is_timed(item):
+            continue
+        if not is_parallel(item):
+            clock = max([clock, *cursors.values()]) + item['duration']
+            cursors = {}
+            continue
+        start = cursors.get(item['parallel_timeline'], clock)
+        end = start + item['duration']
+        cursors[item['parallel_timeline']] = end
+        yield start, end, item
+
+
+def sweep_groups(intervals):
+    """Merges overlapping (start, end, item) intervals into lists of items."""
+    groups = []
+    current, current_end = [], None
+    for start, end, item in sorted(intervals, key=lambda interval: (interval[0], interval[1])):
+        if current and start < current_end:
+            current.append(item)
+            current_end = max(current_end, end)
+        else:
+            if current:
+                groups.append(current)
+            current, current_end = [item], end
+    if current:
+        groups.append(current)
+    return groups
+
+
+def infer_plan_groups(items):
+    """Returns {item id: (parallel_group_id, group_timelines)} for every timed item of one plan."""
+    assignments = {}
+    claimed = set()
+    pending = []
+    for _, section_items in groupby(items, key=lambda item: item['section_id']):
+        section_items = list(section_items)
+        for item in section_items:
+            if is_timed(item) and not is_parallel(item):
+                assignments[item['id']] = (None, None)
+        for group in sweep_groups(layout_section(section_items)):
+            positions = []
+            for item in group:
+                for position in timeline_positions(item['parallel_timeline']):
+                    if position not in positions:
+                        positions.append(position)
+            if len({item['parallel_timeline'] for item in group}) < 2:
+                for item in group:
+                    assignments[item['id']] = (None, None)
+                continue
+            pending.append((group, positions))
+
+    # Keep the ID most of a group's members already share, unless an earlier group took it
+    for group, positions in pending:
+        existing = Counter(item['parallel_group_id'] for item in group if item['parallel_group_id'])
+        group_id = next((gid for gid, _ in existing.most_common() if gid not in claimed), None)
+        group_id = group_id or str(uuid.uuid4())
+        claimed.add(group_id)
+        for item in group:
+            assignments[item['id']] = (group_id, positions)
+    return assignments
+
+
+def changed_rows(items, assignments):
+    """(id, parallel_group_id, group_timelines) for items whose stored values differ."""
+    rows = []
+    for item in items:
+        if item['id'] not in assignments:
+            continue
+        group_id, positions = assignments[item['id']]
+        same_timelines = set(item['group_timelines'] or []) == set(positions or [])
+        if item['parallel_group_id'] == group_id and same_timelines:
+            continue
+        rows.append((item['id'], group_id, positions))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Infer and repair parallel groups for every practice plan.')
+    parser.add_argument('--plan-id', type=int, action='append', dest='plan_ids',
+                        help='Only normalize this plan (repeatable).')
+    parser.add_argument('--dry-run', action='store_true', help='Only report the rows that would change.')
+    parser.add_argument('--atomic', action='store_true',
+                        help='Apply every plan in a single transaction (all or nothing).')
+    args = parser.parse_args()
+
+    items = fetch_items(args.plan_ids)
+    print(f"Read {len(items)} practice plan items.")
+
+    changes = {}
+    for plan_id, plan_items in groupby(items, key=lambda item: item['practice_plan_id']):
+        plan_items = list(plan_items)
+        rows = changed_rows(plan_items, infer_plan_groups(plan_items))
+        if rows:
+            changes[plan_id] = (plan_items, rows)
+
+    if not changes:
+        print("All parallel groups are already consistent.")
+        return
+
+    updated = 0
+    with transaction() if args.atomic else nullcontext():
+        for plan_id, (plan_items, rows) in changes.items():
+            names = {item['id']: item['name'] for item in plan_items}
+            print(f"\nPlan {plan_id}: {len(rows)} items to update")
+            for item_id, group_id, positions in rows:
+                label = f"group {group_id[:8]}... {positions}" if group_id else "no group"
+                print(f"  {names[item_id]} -> {label}")
+            if args.dry_run:
+                continue
+            result = execute_batch(UPDATE_GROUPS, rows, template='(%s, %s::text, %s::text[])')
+            if result:
+                updated += len(rows)
+                print(f"  ✓ Updated plan {plan_id}")
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"Plans with inconsistent groups: {len(changes)}")
+    if args.dry_run:
+        print(f"Items that would change: {sum(len(rows) for _, rows in changes.values())}")
+    else:
+        print(f"Items updated: {updated}")
+
+
+if __name__ == "__main__":
+    main()
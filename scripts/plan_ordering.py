@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Reorder, insert and compact practice plan items without shifting rows one by one.
+
+The plan fix-up scripts used to make room for an item with
+``UPDATE ... SET order_in_plan = order_in_plan + 1`` before every insert. That
+is one write per item per insert, and it leaves gaps and collisions whenever a
+step is skipped. PlanOrder loads a plan's sections and items in one query, lets
+a script move, insert and remove items in memory, and then writes the final
+ordering at once, in one transaction:
+
+- one DELETE for removed items and one for removed sections;
+- one UPDATE ... FROM (VALUES ...) for items whose section or position changed;
+- one multi-row INSERT for new items, already at their final positions;
+- one UPDATE ... FROM (VALUES ...) for sections whose "order" changed.
+
+order_in_plan is the position within a section (as in
+practicePlanService._resequenceItems), and order_in_section is kept equal to it.
+
+compact() renumbers every plan densely with row_number(), for
+order_in_plan/order_in_section and section "order", writing only rows whose
+number changes.
+
+Usage:
+    from plan_ordering import PlanOrder
+
+    plan = PlanOrder.load(65)
+    plan.insert_item(section_id, 0, {'name': 'Kite Offense', 'type': 'formation', 'formation_id': 20})
+    plan.move_item(item_id, other_section_id, 3)
+    plan.apply()
+
+    python plan_ordering.py --compact [--plan-id 65] [--dry-run]
+"""
+
+import argparse
+
+from db_session import execute_batch, execute_query, transaction
+
+FETCH_PLAN = """
+    SELECT s.id, s.name, s."order",
+           d.id, d.name, d.type, d.drill_id, d.formation_id, d.parallel_timeline, d.duration,
+           d.order_in_plan, d.order_in_section
+    FROM practice_plan_sections s
+    LEFT JOIN practice_plan_drills d
+           ON d.section_id = s.id AND d.practice_plan_id = s.practice_plan_id
+    WHERE s.practice_plan_id = %s
+    ORDER BY s."order", s.id, d.order_in_plan, d.id
+"""
+
+INSERT_COLUMNS = (
+    'practice_plan_id', 'section_id', 'order_in_plan', 'order_in_section', 'name', 'type', 'drill_id',
+    'formation_id', 'duration', 'parallel_timeline', 'parallel_group_id', 'group_timelines',
+)
+
+UPDATE_ITEM_ORDER = """
+    UPDATE practice_plan_drills p
+    SET section_id = v.section_id,
+        order_in_plan = v.position,
+        order_in_section = v.position
+    FROM (VALUES %s) AS v(id, section_id, position)
+    WHERE p.id = v.id
+"""
+
+UPDATE_SECTION_ORDER = """
+    UPDATE practice_plan_sections s
+    SET "order" = v.position
+    FROM (VALUES %s) AS v(id, position)
+    WHERE s.id = v.id
+"""
+
+COMPACT_ITEMS = """
+    WITH ranked AS (
+        SELECT id, row_number() OVER (
+                   PARTITION BY practice_plan_id, section_id
+                   ORDER BY order_in_plan NULLS LAST, id
+               ) - 1 AS position
+        FROM practice_plan_drills
+        {where}
+    )
+    UPDATE practice_plan_drills p
+    SET order_in_plan = r.position,
+        order_in_section = r.position
+    FROM ranked r
+    WHERE p.id = r.id
+      AND (p.order_in_plan IS DISTINCT FROM r.position OR p.order_in_section IS DISTINCT FROM r.position)
+    RETURNING p.practice_plan_id
+"""
+
+COMPACT_SECTIONS = """
+    WITH ranked AS (
+        SELECT id, row_number() OVER (
+                   PARTITION BY practice_plan_id
+                   ORDER BY "order" NULLS LAST, id
+               ) - 1 AS position
+        FROM practice_plan_sections
+        {where}
+    )
+    UPDATE practice_plan_sections s
+    SET "order" = r.position
+    FROM ranked r
+    WHERE s.id = r.id AND s."order" IS DISTINCT FROM r.position
+    RETURNING s.practice_plan_id
+"""
+
+COUNT_UNCOMPACTED = """
+    SELECT
+        (SELECT count(*) FROM (
+            SELECT order_in_plan, order_in_section, row_number() OVER (
+                       PARTITION BY practice_plan_id, section_id
+                       ORDER BY order_in_plan NULLS LAST, id
+                   ) - 1 AS position
+            FROM practice_plan_drills
+            {where}
+        ) r WHERE order_in_plan IS DISTINCT FROM position OR order_in_section IS DISTINCT FROM position),
+        (SELECT count(*) FROM (
+            SELECT "order", row_number() OVER (
+                       PARTITION BY practice_plan_id
+                       ORDER BY "order" NULLS LAST, id
+                   ) - 1 AS position
+            FROM practice_plan_sections
+            {where}
+        ) r WHERE "order" IS DISTINCT FROM position)
+"""
+
+
+class PlanOrder:
+    """In-memory layout of one practice plan: sections in order, each with its items in order."""
+
+    def __init__(self, plan_id, sections, stored_sections, stored_items):
+        self.plan_id = plan_id
+        self.sections = sections
+        # What the database currently holds: {section id: order} and
+        # {item id: (section id, order_in_plan, order_in_section)}
+        self._stored_sections = stored_sections
+        self._stored_items = stored_items
+        self._removed_items = []
+        self._removed_sections = []
+
+    @classmethod
+    def load(cls, plan_id):
+        sections, stored_sections, stored_items = {}, {}, {}
+        for row in execute_query(FETCH_PLAN, (plan_id,)) or []:
+            section = sections.setdefault(row[0], {'id': row[0], 'name': row[1], 'items': []})
+            stored_sections[row[0]] = row[2]
+            if row[3] is not None:
+                section['items'].append({'id': row[3], 'name': row[4], 'type': row[5], 'drill_id': row[6],
+                                         'formation_id': row[7], 'parallel_timeline': row[8], 'duration': row[9]})
+                stored_items[row[3]] = (row[0], row[10], row[11])
+        return cls(plan_id, list(sections.values()), stored_sections, stored_items)
+
+    def section(self, section_id):
+        for section in self.sections:
+            if section['id'] == section_id:
+                return section
+        raise KeyError(f"Section {section_id} is not part of practice plan {self.plan_id}")
+
+    def section_by_name(self, name):
+        return next((section for section in self.sections if section['name'] == name), None)
+
+    def items(self, section_id):
+        return self.section(section_id)['items']
+
+    def find(self, name, section_id=None):
+        """Items with this name, optionally limited to one section."""
+        sections = [self.section(section_id)] if section_id is not None else self.sections
+        return [item for section in sections for item in section['items'] if item['name'] == name]
+
+    def _take(self, item_ref):
+        """Pops an item given its id or the item dict itself (needed for not yet inserted items)."""
+        for section in self.sections:
+            for position, item in enumerate(section['items']):
+                if item is item_ref or (item['id'] is not None and item['id'] == item_ref):
+                    return section['items'].pop(position)
+        raise KeyError(f"Item {item_ref} is not part of practice plan {self.plan_id}")
+
+    def move_item(self, item_id, section_id, index=None):
+        """Moves an item (id or item dict) to `index` of a section (appends if index is None)."""
+        item = self._take(item_id)
+        items = self.items(section_id)
+        items.insert(len(items) if index is None else min(index, len(items)), item)
+        return item
+
+    def insert_item(self, section_id, index, values):
+        """Queues a new practice_plan_drills row at `index` of a section.
+
+        `values` holds the row's columns (name, type, drill_id, formation_id,
+        duration, ...); the plan, section and order columns are filled in by
+        apply(). Returns the queued item, whose 'id' is set once applied.
+        """
+        item = {**values, 'id': None, 'new': True}
+        items = self.items(section_id)
+        items.insert(len(items) if index is None else min(index, len(items)), item)
+        return item
+
+    def remove_item(self, item_id):
+        item = self._take(item_id)
+        if not item.get('new'):
+            self._removed_items.append(item['id'])
+        return item
+
+    def remove_section(self, section_id):
+        """Removes an empty section; the remaining sections close the gap."""
+        section = self.section(section_id)
+        if section['items']:
+            raise ValueError(f"Section {section_id} still has {len(section['items'])} items")
+        self.sections.remove(section)
+        self._removed_sections.append(section_id)
+
+    def move_section(self, section_id, index):
+        section = self.section(section_id)
+        self.sections.remove(section)
+        self.sections.insert(min(index, len(self.sections)), section)
+
+    def pending_changes(self):
+        """Returns (item_updates, inserts, section_updates) needed to reach the in-memory layout."""
+        item_updates, inserts = [], []
+        for section in self.sections:
+            for position, item in enumerate(section['items']):
+                if item.get('new'):
+                    inserts.append((section['id'], position, item))
+                elif self._stored_items.get(item['id']) != (section['id'], position, position):
+                    item_updates.append((item['id'], section['id'], position))
+        section_updates = [
+            (section['id'], position) for position, section in enumerate(self.sections)
+            if self._stored_sections.get(section['id']) != position
+        ]
+        return item_updates, inserts, section_updates
+
+    def counts(self):
+        """Row counts apply() would write: deleted, moved, inserted and sections."""
+        item_updates, inserts, section_updates = self.pending_changes()
+        return {'deleted': len(self._removed_items), 'moved': len(item_updates),
+                'inserted': len(inserts), 'sections': len(section_updates) + len(self._removed_sections)}
+
+    def apply(self):
+        """Writes the layout in one transaction; returns a dict of row counts."""
+        counts = self.counts()
+        item_updates, inserts, section_updates = self.pending_changes()
+        with transaction():
+            if self._removed_items:
+                execute_query("DELETE FROM practice_plan_drills WHERE id = ANY(%s)", (self._removed_items,))
+            if self._removed_sections:
+                execute_query("DELETE FROM practice_plan_sections WHERE practice_plan_id = %s AND id = ANY(%s)",
+                              (self.plan_id, self._removed_sections))
+            if item_updates:
+                execute_batch(UPDATE_ITEM_ORDER, item_updates)
+            if inserts:
+                rows = [
+                    (self.plan_id, section_id, position, position, item.get('name'), item.get('type', 'drill'),
+                     item.get('drill_id'), item.get('formation_id'), item.get('duration'),
+                     item.get('parallel_timeline'), item.get('parallel_group_id'), item.get('group_timelines'))
+                    for section_id, position, item in inserts
+                ]
+                returned = execute_batch(
+                    f"INSERT INTO practice_plan_drills ({', '.join(INSERT_COLUMNS)}) VALUES %s RETURNING id",
+                    rows, template=f"({', '.join(['%s'] * (len(INSERT_COLUMNS) - 1))}, %s::text[])"
+                )
+                for (_, _, item), (item_id,) in zip(inserts, returned):
+                    item['id'] = item_id
+                    item.pop('new')
+            if section_updates:
+                execute_batch(UPDATE_SECTION_ORDER, section_updates)
+
+        self._stored_sections = {section['id']: position for position, section in enumerate(self.sections)}
+        self._stored_items = {
+            item['id']: (section['id'], position, position)
+            for section in self.sections for position, item in enumerate(section['items'])
+        }
+        self._removed_items, self._removed_sections = [], []
+        return counts
+
+
+def _plan_filter(plan_ids):
+    if plan_ids:
+        return 'WHERE practice_plan_id = ANY(%(plan_ids)s)', {'plan_ids': list(plan_ids)}
+    return '', None
+
+
+def compact(plan_ids=None):
+    """Densely renumbers items and sections of the given plans (all plans if None).
+
+    Returns (items_renumbered, sections_renumbered).
+    """
+    where, params = _plan_filter(plan_ids)
+    with transaction():
+        items = execute_query(COMPACT_ITEMS.format(where=where), params)
+        sections = execute_query(COMPACT_SECTIONS.format(where=where), params)
+    return len(items), len(sections)
+
+
+def count_uncompacted(plan_ids=None):
+    where, params = _plan_filter(plan_ids)
+    rows = execute_query(COUNT_UNCOMPACTED.format(where=where), params)
+    return tuple(rows[0]) if rows else (0, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Densely renumber practice plan items and sections.')
+    parser.add_argument('--compact', action='store_true', required=True,
+                        help='Renumber order_in_plan/order_in_section and section order with row_number().')
+    parser.add_argument('--plan-id', type=int, action='append', dest='plan_ids',
+                        help='Only compact this plan (repeatable).')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would change.')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        items, sections = count_uncompacted(args.plan_ids)
+        print(f"{items} items and {sections} sections would be renumbered.")
+        return
+
+    items, sections = compact(args.plan_ids)
+    print(f"Renumbered {items} items and {sections} sections.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Apply a declarative patch file to one or more practice plans.
+
+Plan fix-ups used to be bespoke scripts (fix_parallel_groups.py,
+integrate_seekers_practice_plan.py, update_practice_plan_65_final.py), each
+hard-wired to plan 65 and issuing one statement per step. A patch file
+describes the same edits as data, with sections and items referenced by name,
+so one patch can be applied to any plan:
+
+    {
+      "plan_ids": [65],
+      "operations": [
+        {"op": "move", "item": "Claw drill", "section": "Drills", "position": 3},
+        {"op": "insert", "section": "Half Courts: Offensive & Defensive Principles", "position": 0,
+         "if_missing": true,
+         "item": {"name": "Kite Offense", "type": "formation", "formation_id": 20, "duration": 5}},
+        {"op": "remove", "item": "Join scrimmage"},
+        {"op": "remove_section", "section": "Seeker Track"},
+        {"op": "timelines", "section": "Drills", "group": true,
+         "assign": {"Arkansas": "BEATERS", "4 on 4 no beaters": "CHASERS", "Claw drill": "SEEKERS"}},
+        {"op": "update", "item": "Hero Defense Drill", "set": {"duration": 10}},
+        {"op": "plan", "set": {"start_time": "13:00:00", "description": "..."}}
+      ]
+    }
+
+Operations:
+- move / insert / remove / remove_section / move_section change the layout.
+- timelines sets parallel_timeline per item. With "group", the items share
+  one parallel_group_id (true: a new one, a string: that one), and
+  group_timelines becomes the union of their positions.
+- update sets item columns.
+- plan sets practice_plans columns.
+
+Items are referenced by name, or by id if an integer. A name has to match
+exactly one item unless "all": true. "section" narrows the lookup to one
+section (for move, "from_section" does; "section" is the destination). YAML
+patch files work too when PyYAML is installed.
+
+The operations run against an in-memory copy of the plan (plan_ordering.PlanOrder)
+and then compile to a fixed set of batched statements:
+- the layout writes of PlanOrder.apply();
+- one UPDATE ... FROM (VALUES ...) per distinct set of item columns;
+- one UPDATE of practice_plans.
+Each plan is patched in a single transaction, and a failure leaves that plan
+untouched. With several plans, --workers patches them concurrently, each on
+its own pooled connection.
+
+Usage:
+    python plan_patch.py patches/seekers.json --dry-run
+    python plan_patch.py patches/seekers.yaml --plan-id 65 --plan-id 66 --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from db_session import execute_batch, execute_query, get_session, transaction
+from normalize_parallel_groups import timeline_positions
+from plan_ordering import PlanOrder
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+ITEM_COLUMNS = {
+    'name': None,
+    'type': None,
+    'drill_id': 'integer',
+    'formation_id': 'integer',
+    'duration': 'integer',
+    'parallel_timeline': None,
+    'parallel_group_id': None,
+    'group_timelines': 'text[]',
+}
+
+PLAN_COLUMNS = {
+    'name', 'description', 'practice_goals', 'phase_of_season', 'estimated_number_of_participants',
+    'visibility', 'is_editable_by_others', 'start_time',
+}
+
+
+class PatchError(ValueError):
+    """A patch that does not fit the plan it is applied to."""
+
+
+def load_patch(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise PatchError("PyYAML is required for YAML patches (pip install pyyaml)")
+            patch = yaml.safe_load(f)
+        else:
+            patch = json.load(f)
+    if not isinstance(patch, dict) or not isinstance(patch.get('operations'), list):
+        raise PatchError("A patch must be an object with an 'operations' list")
+    return patch
+
+
+def _check_columns(columns, allowed, what):
+    unknown = sorted(set(columns) - set(allowed))
+    if unknown:
+        raise PatchError(f"Cannot set {what} column(s): {', '.join(unknown)}")
+
+
+class CompiledPatch:
+    """The result of running a patch's operations against one plan in memory."""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.item_updates = {}
+        self.plan_updates = {}
+
+    def section_id(self, ref):
+        if isinstance(ref, int):
+            return self.plan.section(ref)['id']
+        section = self.plan.section_by_name(ref)
+        if section is None:
+            raise PatchError(f"Plan {self.plan.plan_id} has no section '{ref}'")
+        return section['id']
+
+    def find_items(self, ref, section=None, match_all=False):
+        section_id = self.section_id(section) if section is not None else None
+        if isinstance(ref, int):
+            sections = [self.plan.section(section_id)] if section_id is not None else self.plan.sections
+            items = [item for s in sections for item in s['items'] if item['id'] == ref]
+        else:
+            items = self.plan.find(ref, section_id)
+        if not items or (len(items) > 1 and not match_all):
+            where = f" in section '{section}'" if section is not None else ''
+            found = 'no item' if not items else f"{len(items)} items"
+            raise PatchError(f"Plan {self.plan.plan_id} has {found} named '{ref}'{where}")
+        return items
+
+    def set_item(self, item, values):
+        """Queues column updates; new items take them directly into their INSERT."""
+        if item.get('new'):
+            item.update(values)
+        else:
+            self.item_updates.setdefault(item['id'], {}).update(values)
+
+    def run(self, operation):
+        op = operation.get('op')
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise PatchError(f"Unknown operation '{op}'")
+        handler(operation)
+
+    def op_move(self, operation):
+        target = self.section_id(operation['section'])
+        items = self.find_items(operation['item'], operation.get('from_section'), operation.get('all', False))
+        position = operation.get('position')
+        for offset, item in enumerate(items):
+            self.plan.move_item(item, target, None if position is None else position + offset)
+
+    def op_insert(self, operation):
+        values = dict(operation['item'])
+        _check_columns(values, ITEM_COLUMNS, 'item')
+        section_id = self.section_id(operation['section'])
+        if operation.get('if_missing'):
+            key = 'formation_id' if values.get('formation_id') else 'drill_id' if values.get('drill_id') else 'name'
+            if any(item.get(key) == values.get(key) for item in self.plan.items(section_id)):
+                return
+        self.plan.insert_item(section_id, operation.get('position'), values)
+
+    def op_remove(self, operation):
+        for item in self.find_items(operation['item'], operation.get('section'), operation.get('all', False)):
+            self.plan.remove_item(item)
+
+    def op_remove_section(self, operation):
+        self.plan.remove_section(self.section_id(operation['section']))
+
+    def op_move_section(self, operation):
+        self.plan.move_section(self.section_id(operation['section']), operation['position'])
+
+    def op_update(self, operation):
+        _check_columns(operation['set'], ITEM_COLUMNS, 'item')
+        for item in self.find_items(operation['item'], operation.get('section'), operation.get('all', False)):
+            self.set_item(item, operation['set'])
+
+    def op_timelines(self, operation):
+        assigned = []
+        for ref, timeline in operation['assign'].items():
+            for item in self.find_items(ref, operation.get('section'), True):
+                assigned.append((item, timeline))
+        group = operation.get('group')
+        positions = []
+        for _, timeline in assigned:
+            for position in timeline_positions(timeline or ''):
+                if position not in positions:
+                    positions.append(position)
+        group_id = (group if isinstance(group, str) else str(uuid.uuid4())) if group else None
+        for item, timeline in assigned:
+            values = {'parallel_timeline': timeline}
+            if group or not timeline:
+                values['parallel_group_id'] = group_id if timeline else None
+                values['group_timelines'] = positions if timeline else None
+            self.set_item(item, values)
+
+    def op_plan(self, operation):
+        _check_columns(operation['set'], PLAN_COLUMNS, 'plan')
+        self.plan_updates.update(operation['set'])
+
+    def batched_updates(self):
+        """Groups item updates by column set: [(columns, rows), ...]."""
+        remaining = {item['id'] for section in self.plan.sections for item in section['items']}
+        groups = {}
+        for item_id, values in self.item_updates.items():
+            if item_id not in remaining:
+                continue
+            columns = tuple(sorted(values))
+            groups.setdefault(columns, []).append((item_id, *(values[column] for column in columns)))
+        return list(groups.items())
+
+    def summary(self):
+        return {
+            **self.plan.counts(),
+            'updated': sum(len(rows) for _, rows in self.batched_updates()),
+            'plan': bool(self.plan_updates),
+        }
+
+    def apply(self):
+        """Writes everything in one transaction."""
+        summary = self.summary()
+        updates = self.batched_updates()
+        with transaction():
+            self.plan.apply()
+            for columns, rows in updates:
+                assignments = ', '.join(f"{column} = v.{column}" for column in columns)
+                casts = ', '.join(f"%s::{ITEM_COLUMNS[column]}" if ITEM_COLUMNS[column] else '%s'
+                                  for column in columns)
+                execute_batch(f"""
+                    UPDATE practice_plan_drills p
+                    SET {assignments}
+                    FROM (VALUES %s) AS v(id, {', '.join(columns)})
+                    WHERE p.id = v.id
+                """, rows, template=f"(%s, {casts})")
+            if self.plan_updates:
+                columns = sorted(self.plan_updates)
+                execute_query(
+                    f"UPDATE practice_plans SET {', '.join(f'{column} = %s' for column in columns)} WHERE id = %s",
+                    [self.plan_updates[column] for column in columns] + [self.plan.plan_id]
+                )
+        return summary
+
+
+def compile_patch(patch, plan_id):
+    plan = PlanOrder.load(plan_id)
+    if not plan.sections:
+        raise PatchError(f"Practice plan {plan_id} not found or has no sections")
+    compiled = CompiledPatch(plan)
+    for number, operation in enumerate(patch['operations'], start=1):
+        try:
+            compiled.run(operation)
+        except (KeyError, ValueError) as e:
+            raise PatchError(f"operation {number} ({operation.get('op')}): {e}") from e
+    return compiled
+
+
+def patch_plan(patch, plan_id, dry_run=False):
+    """Compiles and (unless dry_run) applies a patch to one plan; returns its summary."""
+    try:
+        compiled = compile_patch(patch, plan_id)
+        return compiled.summary() if dry_run else compiled.apply()
+    finally:
+        get_session().release()
+
+
+def format_summary(summary):
+    parts = [f"{summary['inserted']} inserted", f"{summary['deleted']} removed",
+             f"{summary['moved']} renumbered", f"{summary['updated']} updated",
+             f"{summary['sections']} sections"]
+    if summary['plan']:
+        parts.append('plan metadata')
+    return ', '.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a declarative patch file to practice plans.')
+    parser.add_argument('patch_path', help='Patch file (.json, or .yaml with PyYAML installed).')
+    parser.add_argument('--plan-id', type=int, action='append', dest='plan_ids',
+                        help="Plan to patch (repeatable; default: the patch's plan_ids).")
+    parser.add_argument('--workers', type=int, default=4, help='Plans patched concurrently (default: 4).')
+    parser.add_argument('--dry-run', action='store_true', help='Compile and report the changes without writing.')
+    args = parser.parse_args()
+
+    try:
+        patch = load_patch(args.patch_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not load patch: {e}")
+        sys.exit(1)
+
+    plan_ids = args.plan_ids or patch.get('plan_ids') or ([patch['plan_id']] if 'plan_id' in patch else [])
+    if not plan_ids:
+        print("Error: No plans to patch; pass --plan-id or set plan_ids in the patch.")
+        sys.exit(1)
+
+    workers = max(1, min(args.workers, len(plan_ids)))
+    session = get_session()
+    session.maxconn = max(session.maxconn, workers + 1)
+
+    print(f"{'Compiling' if args.dry_run else 'Applying'} {args.patch_path} for {len(plan_ids)} plan(s)")
+    print("="*60)
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(patch_plan, patch, plan_id, args.dry_run): plan_id for plan_id in plan_ids}
+        for future in as_completed(futures):
+            plan_id = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                failed.append(plan_id)
+                print(f"  ✗ Plan {plan_id}: {e}")
+                continue
+            print(f"  ✓ Plan {plan_id}: {format_summary(summary)}")
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"Plans {'compiled' if args.dry_run else 'patched'}: {len(plan_ids) - len(failed)}")
+    if failed:
+        print(f"Failed (left unchanged): {', '.join(str(plan_id) for plan_id in sorted(failed))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
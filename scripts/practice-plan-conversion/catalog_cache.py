@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Persistent local cache of the QDrill drill and formation catalog.
+
+Drill and formation IDs and names are kept in a small SQLite database indexed
+by id and by normalized name, so name lookups and ID checks are local queries
+instead of API calls. Each refresh is applied in a single SQLite transaction,
+so an interrupted run never leaves a half-written catalog behind.
+
+Refresh policy, per kind:
+- checked within `max_age` seconds: use the cache as-is, no network;
+- older than that: incremental refresh, reading newest-first pages of
+  /api/drills or /api/formations until a page with already-known IDs;
+- last full reload older than `full_refresh_age`, or never done: full reload.
+  For drills this is one GET /api/drills/names. The request carries the stored
+  ETag, if any, and honours a 304. The app's route currently sends no ETag,
+  so in practice every full reload downloads the whole list.
+
+Only a kind that has had a full reload is trusted. Entities recorded with
+record_created() alone (e.g. drills a script just made) never make a cache
+look complete: is_complete() stays False and the next ensure_fresh() does a
+full reload.
+
+Configuration (environment variables):
+    QDRILL_CATALOG_CACHE   Cache file (default: .qdrill_catalog.sqlite3 next to this script)
+
+Usage:
+    python catalog_cache.py                 # refresh if stale, print stats
+    python catalog_cache.py --full          # force a full reload
+    python catalog_cache.py --lookup "5 point star"
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from drill_resolver import normalize_name
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'QDRILL_CATALOG_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.qdrill_catalog.sqlite3')
+)
+KINDS = {'drill': 'drills', 'formation': 'formations'}
+PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    norm_name TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS entities_norm_name ON entities (kind, norm_name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class CatalogCache:
+    """SQLite-backed drill/formation catalog with TTL-based incremental refresh."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, client=None, max_age=300, full_refresh_age=86400):
+        self.path = path
+        self.client = client
+        self.max_age = max_age
+        self.full_refresh_age = full_refresh_age
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- metadata -------------------------------------------------------
+
+    def _meta(self, kind, key, default=None):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (f"{kind}.{key}",)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, kind, **values):
+        self.conn.executemany(
+            'INSERT INTO meta (key, value) VALUES (?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+            [(f"{kind}.{key}", None if value is None else str(value)) for key, value in values.items()]
+        )
+
+    # --- refresh --------------------------------------------------------
+
+    def ensure_fresh(self, kind, force_full=False):
+        """Refreshes `kind` from the API if its cached copy is stale.
+
+        Returns 'cached', 'incremental', 'full' or 'not-modified'.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        now = time.time()
+        checked_at = float(self._meta(kind, 'checked_at', 0))
+        full_at = float(self._meta(kind, 'full_refresh_at', 0))
+
+        if not force_full and full_at and now - checked_at < self.max_age:
+            return 'cached'
+        if self.client is None:
+            raise RuntimeError("CatalogCache needs an API client to refresh")
+        if force_full or not full_at or now - full_at >= self.full_refresh_age:
+            return self._full_refresh(kind, now)
+        return self._incremental_refresh(kind, now)
+
+    def _fetch_all_pages(self, kind):
+        items, page = [], 1
+        while True:
+            data = self.client.get_json(KINDS[kind], params={'page': page, 'limit': PAGE_SIZE})
+            items.extend(data.get('items', []))
+            pagination = data.get('pagination') or {}
+            if page >= pagination.get('totalPages', page):
+                return items
+            page += 1
+
+    def _full_refresh(self, kind, now):
+        etag = None
+        if kind == 'drill':
+            headers = {}
+            stored_etag = self._meta(kind, 'etag')
+            if stored_etag and self.is_complete(kind):
+                headers['If-None-Match'] = stored_etag
+            response = self.client.request('GET', 'drills/names', headers=headers)
+            if response.status_code == 304:
+                with self.conn:
+                    self._set_meta(kind, checked_at=now, full_refresh_at=now)
+                return 'not-modified'
+            items = response.json()
+            etag = response.headers.get('ETag')
+        else:
+            items = self._fetch_all_pages(kind)
+
+        with self.conn:
+            self.conn.execute('DELETE FROM entities WHERE kind = ?', (kind,))
+            self._upsert(kind, items)
+            self._set_meta(kind, checked_at=now, full_refresh_at=now, etag=etag)
+        return 'full'
+
+    def _incremental_refresh(self, kind, now):
+        """Reads newest-first pages until one contains an already-cached ID."""
+        known = self.ids(kind)
+        new_items, page = [], 1
+        while True:
+            data = self.client.get_json(KINDS[kind], params={'page': page, 'limit': PAGE_SIZE})
+            items = data.get('items', [])
+            new_items.extend(items)
+            pagination = data.get('pagination') or {}
+            if (not items or any(item['id'] in known for item in items)
+                    or page >= pagination.get('totalPages', page)):
+                break
+            page += 1
+
+        with self.conn:
+            self._upsert(kind, new_items)
+            self._set_meta(kind, checked_at=now)
+        return 'incremental'
+
+    def _upsert(self, kind, items):
+        self.conn.executemany(
+            'INSERT INTO entities (kind, id, name, norm_name) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (kind, id) DO UPDATE SET name = excluded.name, norm_name = excluded.norm_name',
+            [(kind, item['id'], item['name'], normalize_name(item['name'])) for item in items]
+        )
+
+    def add(self, kind, entities):
+        """Records entities a script just created, keeping the cache current without a refresh."""
+        with self.conn:
+            self._upsert(kind, entities)
+
+    # --- lookups --------------------------------------------------------
+
+    def is_complete(self, kind):
+        """True once `kind` has had a full reload; before that the cache may hold only recorded entities."""
+        return bool(float(self._meta(kind, 'full_refresh_at', 0)))
+
+    def count(self, kind):
+        return self.conn.execute('SELECT COUNT(*) FROM entities WHERE kind = ?', (kind,)).fetchone()[0]
+
+    def exists(self, kind, entity_id):
+        return self.conn.execute(
+            'SELECT 1 FROM entities WHERE kind = ? AND id = ?', (kind, entity_id)
+        ).fetchone() is not None
+
+    def get(self, kind, entity_id):
+        row = self.conn.execute(
+            'SELECT id, name FROM entities WHERE kind = ? AND id = ?', (kind, entity_id)
+        ).fetchone()
+        return {'id': row[0], 'name': row[1]} if row else None
+
+    def find_by_name(self, kind, name):
+        """Exact (case- and whitespace-insensitive) name lookup; returns all matches."""
+        rows = self.conn.execute(
+            'SELECT id, name FROM entities WHERE kind = ? AND norm_name = ? ORDER BY id',
+            (kind, normalize_name(name))
+        ).fetchall()
+        return [{'id': row[0], 'name': row[1]} for row in rows]
+
+    def ids(self, kind):
+        return {row[0] for row in self.conn.execute('SELECT id FROM entities WHERE kind = ?', (kind,))}
+
+    def all(self, kind):
+        """All cached entities of a kind as [{id, name}], e.g. to build a DrillResolver."""
+        rows = self.conn.execute('SELECT id, name FROM entities WHERE kind = ? ORDER BY name', (kind,))
+        return [{'id': row[0], 'name': row[1]} for row in rows]
+
+
+def open_catalog(client, kinds=('drill', 'formation'), **kwargs):
+    """Opens the default cache and refreshes the given kinds if stale."""
+    cache = CatalogCache(client=client, **kwargs)
+    for kind in kinds:
+        cache.ensure_fresh(kind)
+    return cache
+
+
+def record_created(kind, entities, path=DEFAULT_CACHE_PATH):
+    """Adds entities created by a script to the cache so later runs see them without a refresh."""
+    with CatalogCache(path) as cache:
+        cache.add(kind, entities)
+
+
+def main():
+    from qdrill_client import QDrillClient
+
+    parser = argparse.ArgumentParser(description='Refresh and query the local drill/formation catalog cache.')
+    parser.add_argument('--path', default=DEFAULT_CACHE_PATH, help='Cache file location.')
+    parser.add_argument('--full', action='store_true', help='Force a full reload from the API.')
+    parser.add_argument('--max-age', type=int, default=300,
+                        help='Seconds before the cache is checked against the API again (default: 300).')
+    parser.add_argument('--offline', action='store_true', help='Do not contact the API, only read the cache.')
+    parser.add_argument('--lookup', metavar='NAME', help='Look up a drill or formation by name.')
+    args = parser.parse_args()
+
+    client = None if args.offline else QDrillClient()
+    with CatalogCache(args.path, client=client, max_age=args.max_age) as cache:
+        if not args.offline:
+            for kind in KINDS:
+                start = time.perf_counter()
+                try:
+                    status = cache.ensure_fresh(kind, force_full=args.full)
+                except Exception as e:
+                    print(f"✗ Could not refresh {kind}s: {e}")
+                    sys.exit(1)
+                print(f"✓ {kind}s: {status} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+        for kind in KINDS:
+            print(f"  {cache.count(kind)} {kind}s cached")
+
+        if args.lookup:
+            print(f"\nMatches for '{args.lookup}':")
+            for kind in KINDS:
+                for entity in cache.find_by_name(kind, args.lookup):
+                    print(f"  {kind} {entity['id']}: {entity['name']}")
+
+
+if __name__ == "__main__":
+    main()
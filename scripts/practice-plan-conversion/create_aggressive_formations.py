@@ -3,40 +3,12 @@
 Script to create aggressive defense formations for the 2025 May 31 GTA Practice Plan
 """
 
-import requests
+import argparse
 import json
-import time
 import sys
 
-API_URL = "http://localhost:3000/api/formations"
-
-def create_formation(formation_data):
-    """Create a formation via the API"""
-    print(f"\nCreating formation: {formation_data['name']}")
-    print("="*50)
-    
-    try:
-        response = requests.post(API_URL, json=formation_data, headers={'Content-Type': 'application/json'})
-        response.raise_for_status()
-        
-        created_formation = response.json()
-        
-        if 'error' in created_formation:
-            print(f"ERROR: {created_formation['error']}")
-            return None
-            
-        print(f"✓ Successfully created formation with ID: {created_formation['id']}")
-        return created_formation
-        
-    except requests.exceptions.RequestException as e:
-        print(f"✗ HTTP Request failed: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"  Status Code: {e.response.status_code}")
-            print(f"  Response: {e.response.text}")
-        return None
-    except Exception as e:
-        print(f"✗ Unexpected error: {e}")
-        return None
+from catalog_cache import record_created
+from qdrill_client import QDrillClient
 
 # Define all formations to create
 formations_to_create = [
@@ -71,27 +43,36 @@ formations_to_create = [
 
 def main():
     """Main function to create all formations"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of concurrent create requests (default: 4, 1 = sequential).')
+    parser.add_argument('--rps', type=float, default=5.0,
+                        help='Maximum requests per second sent to the API (default: 5).')
+    args = parser.parse_args()
+
+    client = QDrillClient(rps=args.rps)
     print("Creating aggressive defense formations for 2025 May 31 GTA Practice Plan")
     print("="*60)
     
     created_formations = []
     failed_formations = []
     
-    for formation_data in formations_to_create:
-        result = create_formation(formation_data)
+    results = client.create_many(formations_to_create, client.create_formation, workers=args.workers)
+    for formation_data, result in zip(formations_to_create, results):
         if result:
             created_formations.append(result)
         else:
             failed_formations.append(formation_data['name'])
-        
-        # Small delay between requests
-        time.sleep(0.5)
     
+    if created_formations:
+        record_created('formation', created_formations)
+
     # Summary
     print("\n" + "="*60)
     print("SUMMARY")
     print("="*60)
-    print(f"✓ Successfully created: {len(created_formations)} formations")
+    client.print_timing_summary()
+    print(f"\n✓ Successfully created: {len(created_formations)} formations")
     if created_formations:
         print("\nCreated formation IDs:")
         for formation in created_formations:
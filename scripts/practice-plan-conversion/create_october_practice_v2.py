@@ -4,13 +4,18 @@ Script to create the East October TC Practice from practice.txt
 This version creates missing drills first, then creates the practice plan
 """
 
-import requests
 import json
 import sys
 import re
 from datetime import datetime, timedelta
 
-API_BASE_URL = "http://localhost:3000/api"
+from catalog_cache import open_catalog, record_created
+from drill_resolver import DrillResolver, print_resolution_report
+from plan_validation import validate_plan
+from qdrill_client import APP_BASE_URL, QDrillClient
+from schedule import check_plan
+
+client = QDrillClient()
 
 # Map drill names from practice.txt to existing drill names in DB
 drill_name_mapping = {
@@ -141,62 +146,33 @@ new_drills = {
     }
 }
 
-def search_existing_drill(name):
-    """Search for an existing drill by name"""
-    try:
-        # Try mapped name first
-        search_name = drill_name_mapping.get(name, name)
-
-        response = requests.get(f"{API_BASE_URL}/drills/names")
-        all_drills = response.json()
-
-        # Try exact match first
-        for drill in all_drills:
-            if drill['name'].lower() == search_name.lower():
-                return drill['id']
-
-        # Try partial match
-        for drill in all_drills:
-            if search_name.lower() in drill['name'].lower() or drill['name'].lower() in search_name.lower():
-                return drill['id']
-
-    except Exception as e:
-        print(f"Error searching for drill '{name}': {e}")
-
-    return None
-
 def create_drill(drill_data):
     """Create a new drill via API"""
-    try:
-        response = requests.post(f"{API_BASE_URL}/drills",
-                                json=drill_data,
-                                headers={'Content-Type': 'application/json'})
-        response.raise_for_status()
-        result = response.json()
-        print(f"✓ Created drill: {drill_data['name']} (ID: {result['id']})")
-        return result['id']
-    except requests.exceptions.RequestException as e:
-        print(f"✗ Failed to create drill '{drill_data['name']}': {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"  Response: {e.response.text}")
+    result = client.create_drill(drill_data, verbose=False)
+    if result is None:
         return None
+    record_created('drill', [result])
+    print(f"✓ Created drill: {drill_data['name']} (ID: {result['id']})")
+    return result['id']
 
-def get_or_create_drill_id(name):
+def get_or_create_drill_id(name, resolution):
     """Get existing drill ID or create new drill"""
     # Check if it exists
-    drill_id = search_existing_drill(name)
-    if drill_id:
-        print(f"  Using existing drill: {name} (ID: {drill_id})")
-        return drill_id
+    # Exact matches (even duplicated ones) resolve to an ID, so an existing drill is never created again
+    if resolution['id']:
+        print(f"  Using existing drill: {name} (ID: {resolution['id']})")
+        return resolution['id']
+
+    if resolution['match'] == 'ambiguous':
+        print(f"  WARNING: '{name}' partially matches {len(resolution['candidates'])} existing drills, not guessing")
 
     # Create if it's in our new drills list
     if name in new_drills:
         print(f"  Creating new drill: {name}")
         return create_drill(new_drills[name])
 
-    # Default to a placeholder if we don't have a definition
-    print(f"  WARNING: No drill definition for '{name}', using placeholder")
-    return 173  # Using existing test drill as placeholder
+    print(f"  ✗ No existing drill and no definition for '{name}'")
+    return None
 
 def parse_practice_plan():
     """Parse the practice.txt file into a structured format"""
@@ -334,7 +310,7 @@ def build_practice_plan_data(parsed_data, drill_ids):
                                 "position_warmup", "BEATERS", ["CHASERS", "BEATERS"]),
                 create_drill_item("Beater Oklahomas", 10, drill_ids["Beater Oklahomas"],
                                 "position_warmup", "BEATERS", ["CHASERS", "BEATERS"]),
-                create_drill_item("1.5 off-ball defense", 15, drill_ids.get("1.5 off-ball defense", 173),
+                create_drill_item("1.5 off-ball defense", 15, drill_ids["1.5 off-ball defense"],
                                 "position_warmup", "BEATERS", ["CHASERS", "BEATERS"])
             ]
 
@@ -383,7 +359,7 @@ def build_practice_plan_data(parsed_data, drill_ids):
 
     return practice_plan_data
 
-def create_practice_plan(plan_data):
+def create_practice_plan(plan_data, catalog=None):
     """Create the practice plan via API"""
     print(f"\nCreating {plan_data['name']}")
     print("="*60)
@@ -396,32 +372,25 @@ def create_practice_plan(plan_data):
         if any('parallel_group_id' in item for item in section['items']):
             print(f"     (Contains parallel drills)")
 
-    try:
-        response = requests.post(f"{API_BASE_URL}/practice-plans",
-                                json=plan_data,
-                                headers={'Content-Type': 'application/json'})
-        response.raise_for_status()
+    print("\nValidation:")
+    if validate_plan(plan_data, catalog)['errors']:
+        print(f"\n✗ Practice plan is invalid, not creating it")
+        return None
 
-        result = response.json()
+    print("\nSchedule:")
+    schedule = check_plan(plan_data)
+    if schedule['problems']:
+        print(f"\n✗ Practice plan has schedule problems, not creating it")
+        return None
 
-        if 'error' in result:
-            print(f"ERROR: {result['error']}")
-            return None
+    result = client.create_practice_plan(plan_data, verbose=False)
+    client.print_timing_summary()
 
+    if result:
         print(f"\n✓ Successfully created practice plan!")
         print(f"ID: {result.get('id')}")
         print(f"Message: {result.get('message')}")
-        return result
-
-    except requests.exceptions.RequestException as e:
-        print(f"\n✗ HTTP Request failed: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"  Status Code: {e.response.status_code}")
-            print(f"  Response: {e.response.text}")
-        return None
-    except Exception as e:
-        print(f"\n✗ Unexpected error: {e}")
-        return None
+    return result
 
 if __name__ == "__main__":
     # Parse the practice plan from text file
@@ -444,6 +413,7 @@ if __name__ == "__main__":
         "Paired warm up throws",
         "Skill Vitamins",
         "Beater Oklahomas",
+        "1.5 off-ball defense",
         "drive to danger, pass to safety",
         "Carleton Pick Drill",
         "Boston Beater Drill",
@@ -454,9 +424,23 @@ if __name__ == "__main__":
         "Volunteers Set Up Pitch"
     ]
 
+    # Resolve against the local catalog cache; it only talks to the API when stale
+    catalog = open_catalog(client, kinds=('drill',))
+    resolver = DrillResolver(catalog.all('drill'))
+    resolutions = resolver.resolve_all(drill_names_needed, aliases=drill_name_mapping)
+    print(f"Resolved against {len(resolver.drills)} existing drills:")
+    print_resolution_report(resolutions)
+    print()
+
     drill_ids = {}
     for drill_name in drill_names_needed:
-        drill_ids[drill_name] = get_or_create_drill_id(drill_name)
+        drill_ids[drill_name] = get_or_create_drill_id(drill_name, resolutions[drill_name])
+
+    missing = [name for name, drill_id in drill_ids.items() if drill_id is None]
+    if missing:
+        print(f"\n✗ No drill ID for: {', '.join(missing)}")
+        print("Add them to new_drills or drill_name_mapping; not creating a plan with placeholder drills")
+        sys.exit(1)
 
     print(f"\nDrill setup complete. Have IDs for {len(drill_ids)} drills")
 
@@ -467,14 +451,14 @@ if __name__ == "__main__":
     practice_plan_data = build_practice_plan_data(parsed_data, drill_ids)
 
     # Create the practice plan
-    result = create_practice_plan(practice_plan_data)
+    result = create_practice_plan(practice_plan_data, catalog)
 
     if result:
         print("\n" + "="*60)
         print("✓ SUCCESS!")
         print("="*60)
         print(f"Practice plan created successfully!")
-        print(f"View it at: http://localhost:3000/practice-plans/{result['id']}")
+        print(f"View it at: {APP_BASE_URL}/practice-plans/{result['id']}")
     else:
         print("\n" + "="*60)
         print("✗ FAILED")
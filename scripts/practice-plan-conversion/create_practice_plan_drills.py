@@ -3,40 +3,12 @@
 Script to create all drills needed for the 2025 May 31 GTA Practice Plan
 """
 
-import requests
+import argparse
 import json
-import time
 import sys
 
-API_URL = "http://localhost:3000/api/drills"
-
-def create_drill(drill_data):
-    """Create a drill via the API"""
-    print(f"\nCreating drill: {drill_data['name']}")
-    print("="*50)
-    
-    try:
-        response = requests.post(API_URL, json=drill_data, headers={'Content-Type': 'application/json'})
-        response.raise_for_status()
-        
-        created_drill = response.json()
-        
-        if 'error' in created_drill:
-            print(f"ERROR: {created_drill['error']}")
-            return None
-            
-        print(f"✓ Successfully created drill with ID: {created_drill['id']}")
-        return created_drill
-        
-    except requests.exceptions.RequestException as e:
-        print(f"✗ HTTP Request failed: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"  Status Code: {e.response.status_code}")
-            print(f"  Response: {e.response.text}")
-        return None
-    except Exception as e:
-        print(f"✗ Unexpected error: {e}")
-        return None
+from catalog_cache import record_created
+from qdrill_client import QDrillClient
 
 # Define all drills to create
 drills_to_create = [
@@ -222,27 +194,43 @@ drills_to_create = [
 
 def main():
     """Main function to create all drills"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of concurrent create requests (default: 4, 1 = sequential).')
+    parser.add_argument('--rps', type=float, default=5.0,
+                        help='Maximum requests per second sent to the API (default: 5).')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Create drills in chunks via /api/drills/import (requires QDRILL_COOKIE).')
+    parser.add_argument('--chunk-size', type=int, default=50,
+                        help='Drills per import request with --bulk (default: 50).')
+    args = parser.parse_args()
+
+    client = QDrillClient(rps=args.rps)
     print("Creating drills for 2025 May 31 GTA Practice Plan")
     print("="*60)
     
     created_drills = []
     failed_drills = []
     
-    for drill_data in drills_to_create:
-        result = create_drill(drill_data)
+    if args.bulk:
+        results = client.bulk_create_drills(drills_to_create, chunk_size=args.chunk_size, workers=args.workers)
+    else:
+        results = client.create_many(drills_to_create, client.create_drill, workers=args.workers)
+    for drill_data, result in zip(drills_to_create, results):
         if result:
             created_drills.append(result)
         else:
             failed_drills.append(drill_data['name'])
-        
-        # Small delay between requests
-        time.sleep(0.5)
     
+    if created_drills:
+        record_created('drill', created_drills)
+
     # Summary
     print("\n" + "="*60)
     print("SUMMARY")
     print("="*60)
-    print(f"✓ Successfully created: {len(created_drills)} drills")
+    client.print_timing_summary()
+    print(f"\n✓ Successfully created: {len(created_drills)} drills")
     if created_drills:
         print("\nCreated drill IDs:")
         for drill in created_drills:
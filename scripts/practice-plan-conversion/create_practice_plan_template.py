@@ -16,13 +16,14 @@ Usage:
 4. Run: python create_practice_plan_template.py
 """
 
-import requests
 import json
 import sys
 from datetime import datetime
 
-# Configuration
-API_URL = "http://localhost:3000/api/practice-plans"
+from catalog_cache import open_catalog
+from plan_validation import validate_plan
+from qdrill_client import APP_BASE_URL, QDrillClient
+from schedule import check_plan
 
 # Example drill and formation IDs - replace with actual IDs from your system
 drill_ids = {
@@ -239,35 +240,36 @@ def main():
     print(f"Creating practice plan: {plan_data['name']}")
     print(f"Total sections: {len(plan_data['sections'])}")
     
-    # Calculate total duration
-    total_duration = sum(
-        item['duration'] 
-        for section in plan_data['sections'] 
-        for item in section['items']
-        if not item.get('parallel_group_id') or 
-           item['parallel_timeline'] == list(sorted(
-               [i['parallel_timeline'] for i in section['items'] 
-                if i.get('parallel_group_id') == item.get('parallel_group_id')]
-           ))[0]
-    )
-    print(f"Total duration: {total_duration} minutes ({total_duration/60:.1f} hours)")
-    
-    # Make the API request
+    # Check the payload against the API schema and the catalog cache (refreshed from the API when stale)
+    client = QDrillClient()
     try:
-        response = requests.post(API_URL, json=plan_data)
-        
-        if response.status_code == 201:
-            result = response.json()
-            print(f"\n✅ Successfully created practice plan!")
-            print(f"ID: {result['id']}")
-            print(f"URL: http://localhost:3000/practice-plans/{result['id']}")
-        else:
-            print(f"\n❌ Failed to create practice plan")
-            print(f"Status: {response.status_code}")
-            print(f"Response: {response.text}")
-            
+        catalog = open_catalog(client, kinds=('drill', 'formation'))
     except Exception as e:
-        print(f"\n❌ Error creating practice plan: {e}")
+        print(f"\n❌ Could not refresh the drill/formation catalog: {e}")
+        sys.exit(1)
+    with catalog:
+        validation = validate_plan(plan_data, catalog)
+    if validation['errors']:
+        print(f"\n❌ Practice plan is invalid, not creating it")
+        print("Update drill_ids/formation_ids with IDs from your system (python catalog_cache.py --lookup NAME)")
+        sys.exit(1)
+    
+    # Lay out the plan on the clock; a plan with schedule problems is not created
+    schedule = check_plan(plan_data)
+    if schedule['problems']:
+        print(f"\n❌ Practice plan has schedule problems, not creating it")
+        sys.exit(1)
+    
+    # Make the API request
+    result = client.create_practice_plan(plan_data, verbose=False)
+    client.print_timing_summary()
+
+    if result:
+        print(f"\n✅ Successfully created practice plan!")
+        print(f"ID: {result['id']}")
+        print(f"URL: {APP_BASE_URL}/practice-plans/{result['id']}")
+    else:
+        print(f"\n❌ Failed to create practice plan")
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Decode drill-bank CSV rows (drill-banks/*.csv) into QDrill drill payloads.
+
+Drill banks use the same columns as the bulk-upload template in the app:
+numeric codes for skill level and complexity ("Skill Level (1:New to Sport;
+2:Beginner; ...)") and comma-separated lists for drill types, skills and
+positions. decode_row() mirrors parseDrill() in
+src/routes/api/drills/bulk-upload/+server.js and the checks of
+bulkUploadDrillInputSchema, so rows rejected here would also be rejected by
+the app's own CSV upload.
+
+Usage:
+    from drill_bank import iter_drill_bank
+
+    for row_number, drill, errors in iter_drill_bank('drill-banks/canada3.csv'):
+        ...
+"""
+
+import csv
+from urllib.parse import urlsplit
+
+SKILL_LEVEL_COLUMN = 'Skill Level (1:New to Sport; 2:Beginner; 3:Intermediate; 4:Advanced; 5:Expert)'
+COMPLEXITY_COLUMN = 'Complexity (1:Low; 2:Medium; 3:High)'
+POSITIONS_COLUMN = 'Positions Focused On (Chaser; Beater; Keeper; Seeker)'
+
+SKILL_LEVELS = {'1': 'New to Sport', '2': 'Beginner', '3': 'Intermediate', '4': 'Advanced', '5': 'Expert'}
+COMPLEXITIES = {'1': 'Low', '2': 'Medium', '3': 'High'}
+POSITIONS = ['Chaser', 'Beater', 'Keeper', 'Seeker']
+DRILL_TYPES = [
+    'Competitive',
+    'Skill-focus',
+    'Tactic-focus',
+    'Warmup',
+    'Conditioning',
+    'Cooldown',
+    'Contact',
+    'Match-like situation'
+]
+
+# Case-insensitive lookups onto the canonical spellings the API expects
+_SKILL_LEVEL_NAMES = {name.casefold(): name for name in SKILL_LEVELS.values()}
+_COMPLEXITY_NAMES = {name.casefold(): name for name in COMPLEXITIES.values()}
+_POSITION_NAMES = {name.casefold(): name for name in POSITIONS}
+_DRILL_TYPE_NAMES = {name.casefold(): name for name in DRILL_TYPES}
+
+
+def parse_list(value):
+    """Splits a comma-separated cell into trimmed, non-empty items."""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def parse_int(value):
+    """Parses an integer cell; blank or malformed cells become None."""
+    value = (value or '').strip()
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _decode_codes(values, codes, names):
+    return [codes.get(value) or names.get(value.casefold(), value) for value in values]
+
+
+def decode_row(record):
+    """Turns one CSV record into a /api/drills payload.
+
+    Returns (drill, errors); errors is a list of "field: message" strings in
+    the same form the bulk-upload endpoint reports.
+    """
+    complexity_cell = (record.get(COMPLEXITY_COLUMN) or '').strip()
+    video_link = (record.get('Video Link') or '').strip()
+    drill = {
+        'name': (record.get('Name') or '').strip(),
+        'brief_description': (record.get('Brief Description') or '').strip(),
+        'detailed_description': (record.get('Detailed Description') or '').strip(),
+        'skill_level': _decode_codes(parse_list(record.get(SKILL_LEVEL_COLUMN)), SKILL_LEVELS, _SKILL_LEVEL_NAMES),
+        'complexity': (COMPLEXITIES.get(complexity_cell) or _COMPLEXITY_NAMES.get(complexity_cell.casefold(), complexity_cell)
+                       if complexity_cell else None),
+        'suggested_length': {
+            'min': parse_int(record.get('Suggested Length Min')),
+            'max': parse_int(record.get('Suggested Length Max')),
+        },
+        'number_of_people': {
+            'min': parse_int(record.get('Number of People Min')),
+            'max': parse_int(record.get('Number of People Max')),
+        },
+        'skills_focused_on': parse_list(record.get('Skills Focused On')),
+        'positions_focused_on': [_POSITION_NAMES.get(p.casefold(), p) for p in parse_list(record.get(POSITIONS_COLUMN))],
+        'video_link': video_link or None,
+        # Like the app's CSV parser, unknown drill types are dropped rather than rejected
+        'drill_type': [_DRILL_TYPE_NAMES[t.casefold()] for t in parse_list(record.get('Drill Type'))
+                       if t.casefold() in _DRILL_TYPE_NAMES],
+        'diagrams': [],
+    }
+    return drill, validate_drill(drill)
+
+
+def validate_drill(drill):
+    """Checks a decoded drill against the rules of bulkUploadDrillInputSchema."""
+    errors = []
+    if not drill['name']:
+        errors.append('name: Name is required')
+    if not drill['brief_description']:
+        errors.append('brief_description: Brief description is required')
+
+    if not drill['skill_level']:
+        errors.append('skill_level: At least one skill level is required')
+    for level in drill['skill_level']:
+        if level not in SKILL_LEVELS.values():
+            errors.append(f"skill_level: Invalid skill level '{level}'")
+    if drill['complexity'] is not None and drill['complexity'] not in COMPLEXITIES.values():
+        errors.append(f"complexity: Invalid complexity '{drill['complexity']}'")
+
+    length = drill['suggested_length']
+    for bound in ('min', 'max'):
+        if length[bound] is None:
+            errors.append(f"suggested_length.{bound}: Suggested length {bound} is required")
+        elif length[bound] < 0:
+            errors.append(f"suggested_length.{bound}: Suggested length {bound} must be a non-negative integer")
+    if length['min'] is not None and length['max'] is not None and length['max'] < length['min']:
+        errors.append('suggested_length.max: Suggested length max must be greater than or equal to min')
+
+    people = drill['number_of_people']
+    for bound in ('min', 'max'):
+        if people[bound] is not None and people[bound] <= 0:
+            errors.append(f"number_of_people.{bound}: Number of people {bound} must be a positive integer")
+    if people['min'] is not None and people['max'] is not None and people['max'] < people['min']:
+        errors.append('number_of_people.max: Number of people max must be greater than or equal to min')
+
+    if not drill['skills_focused_on']:
+        errors.append('skills_focused_on: At least one skill is required')
+    if not drill['positions_focused_on']:
+        errors.append('positions_focused_on: At least one position is required')
+    for position in drill['positions_focused_on']:
+        if position not in POSITIONS:
+            errors.append(f"positions_focused_on: Invalid position '{position}'")
+    if not drill['drill_type']:
+        errors.append('drill_type: At least one drill type is required')
+
+    if drill['video_link']:
+        parts = urlsplit(drill['video_link'])
+        if not parts.scheme or not parts.netloc:
+            errors.append('video_link: Video link must be a valid URL')
+    return errors
+
+
+def iter_drill_bank(path):
+    """Streams (row_number, drill, errors) for every data row of a drill-bank CSV.
+
+    Row numbers match the spreadsheet (the header is row 1). Only one row is
+    held in memory at a time.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        for row_number, record in enumerate(reader, start=2):
+            if not any((value or '').strip() for value in record.values() if isinstance(value, str)):
+                continue  # skip blank lines, like skip_empty_lines in the app
+            drill, errors = decode_row(record)
+            yield row_number, drill, errors
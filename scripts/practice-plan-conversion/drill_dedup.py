@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for drills, used before importing a drill bank.
+
+Each drill is fingerprinted twice: character trigrams of its normalized name
+and word bigrams of its normalized brief + detailed description. Every shingle
+set gets a MinHash signature. The signatures are split into bands for
+locality-sensitive hashing, so only drills sharing at least one band bucket
+are compared. Lookups scale with the number of likely matches, not with the
+catalog size, and there is no all-pairs comparison.
+
+Candidates from the buckets are verified with the exact Jaccard similarity of
+their shingle sets:
+- duplicate: same normalized name, or combined similarity >= duplicate
+  threshold. Skip it.
+- similar: combined similarity >= similar threshold, or a near-identical
+  description under another name. Report it as a merge candidate and do not
+  push it.
+- new: everything else.
+
+Usage:
+    from drill_dedup import NearDuplicateIndex, load_catalog
+
+    index = NearDuplicateIndex()
+    for drill in load_catalog(client):
+        index.add(drill['id'], drill)
+    status, match, _ = index.classify(incoming_drill)
+"""
+
+import csv
+import hashlib
+import re
+from collections import defaultdict
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.7 Jaccard share a bucket with >98% probability
+DUPLICATE_THRESHOLD = 0.85
+SIMILAR_THRESHOLD = 0.6
+
+_MAX_HASH = (1 << 64) - 1
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+_NUMBER_WORDS = {
+    'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+    'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
+}
+_STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by', 'or'}
+
+
+def normalize_words(text):
+    """Lower-cased alphanumeric tokens with number words as digits and stopwords removed."""
+    words = _NON_WORD.sub(' ', (text or '').casefold()).split()
+    return [_NUMBER_WORDS.get(word, word) for word in words if word not in _STOPWORDS]
+
+
+def name_key(name):
+    return ' '.join(normalize_words(name))
+
+
+def name_shingles(name):
+    text = f" {name_key(name)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)} if text.strip() else set()
+
+
+def description_shingles(drill):
+    words = normalize_words(f"{drill.get('brief_description') or ''} {drill.get('detailed_description') or ''}")
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(shingles, num_perm=NUM_PERM):
+    """One-permutation MinHash signature with rotation densification.
+
+    Each shingle is hashed once and assigned to one of `num_perm` bins by its
+    hash; the bin keeps the minimum. Empty bins borrow the value of the next
+    non-empty bin (offset by the distance), so short texts still get a full
+    signature. Costs O(len(shingles)) instead of O(len(shingles) * num_perm).
+    """
+    if not shingles:
+        return None
+    bins = [None] * num_perm
+    for shingle in shingles:
+        value = _hash(shingle)
+        slot = value % num_perm
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    signature = []
+    for i in range(num_perm):
+        distance = 0
+        while bins[(i + distance) % num_perm] is None:
+            distance += 1
+        signature.append((bins[(i + distance) % num_perm] + distance * 0x9E3779B97F4A7C15) & _MAX_HASH)
+    return tuple(signature)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return None
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """LSH index over drill name and description fingerprints."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, duplicate_threshold=DUPLICATE_THRESHOLD,
+                 similar_threshold=SIMILAR_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.duplicate_threshold = duplicate_threshold
+        self.similar_threshold = similar_threshold
+        self.entries = {}
+        self.names = defaultdict(list)
+        self.buckets = defaultdict(list)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fingerprint(self, drill):
+        names = name_shingles(drill.get('name'))
+        descriptions = description_shingles(drill)
+        return {
+            'name': drill.get('name'),
+            'name_key': name_key(drill.get('name')),
+            'name_shingles': names,
+            'description_shingles': descriptions,
+            'name_signature': minhash(names, self.num_perm),
+            'description_signature': minhash(descriptions, self.num_perm),
+        }
+
+    def _band_keys(self, fingerprint):
+        for field in ('name', 'description'):
+            signature = fingerprint[f"{field}_signature"]
+            if signature is None:
+                continue
+            for band in range(self.bands):
+                yield (field, band, signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key, drill, fingerprint=None):
+        fingerprint = fingerprint or self.fingerprint(drill)
+        self.entries[key] = fingerprint
+        if fingerprint['name_key']:
+            self.names[fingerprint['name_key']].append(key)
+        for band_key in self._band_keys(fingerprint):
+            self.buckets[band_key].append(key)
+        return fingerprint
+
+    def similarity(self, a, b):
+        """Combined similarity: the mean of name and description Jaccard where both exist."""
+        name_sim = 1.0 if a['name_key'] and a['name_key'] == b['name_key'] else jaccard(a['name_shingles'], b['name_shingles'])
+        description_sim = jaccard(a['description_shingles'], b['description_shingles'])
+        scores = [score for score in (name_sim, description_sim) if score is not None]
+        return (sum(scores) / len(scores) if scores else 0.0), name_sim, description_sim
+
+    def query(self, drill, fingerprint=None):
+        """Returns verified candidates as dicts sorted by descending score."""
+        fingerprint = fingerprint or self.fingerprint(drill)
+        candidates = set(self.names.get(fingerprint['name_key'], ()))
+        for band_key in self._band_keys(fingerprint):
+            candidates.update(self.buckets.get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            other = self.entries[key]
+            score, name_sim, description_sim = self.similarity(fingerprint, other)
+            exact_name = bool(fingerprint['name_key']) and fingerprint['name_key'] == other['name_key']
+            renamed_copy = description_sim is not None and description_sim >= self.duplicate_threshold
+            if exact_name or renamed_copy or score >= self.similar_threshold:
+                matches.append({'key': key, 'name': other['name'], 'score': score, 'exact_name': exact_name,
+                                'name_similarity': name_sim, 'description_similarity': description_sim})
+        matches.sort(key=lambda match: (not match['exact_name'], -match['score']))
+        return matches
+
+    def classify(self, drill, fingerprint=None):
+        """Returns (status, best_match, fingerprint) with status 'duplicate', 'similar' or 'new'."""
+        fingerprint = fingerprint or self.fingerprint(drill)
+        matches = self.query(drill, fingerprint)
+        if not matches:
+            return 'new', None, fingerprint
+        best = matches[0]
+        if best['exact_name'] or best['score'] >= self.duplicate_threshold:
+            return 'duplicate', best, fingerprint
+        return 'similar', best, fingerprint
+
+
+def load_catalog(client, page_size=500):
+    """Yields every drill visible to the client's session, one page of /api/drills at a time."""
+    page = 1
+    while True:
+        data = client.get_json('drills', params={'page': page, 'limit': page_size})
+        yield from data.get('items', [])
+        pagination = data.get('pagination') or {}
+        if page >= pagination.get('totalPages', page):
+            return
+        page += 1
+
+
+class DedupStage:
+    """Pre-import filter: passes only genuinely new drills and records the rest in a report.
+
+    Incoming drills that pass are added to the index too, so repeats within the
+    same bank are caught as well. The optional CSV report lists every skipped
+    duplicate and every merge candidate with the drill it matched.
+    """
+
+    REPORT_FIELDS = ['row', 'name', 'action', 'matched_id', 'matched_name', 'score',
+                     'name_similarity', 'description_similarity']
+
+    def __init__(self, index, report_path=None):
+        self.index = index
+        self.counts = {'new': 0, 'duplicate': 0, 'similar': 0}
+        self.report_file = open(report_path, 'w', encoding='utf-8', newline='') if report_path else None
+        self.report = csv.DictWriter(self.report_file, self.REPORT_FIELDS) if self.report_file else None
+        if self.report:
+            self.report.writeheader()
+
+    def keep(self, row_number, drill):
+        status, match, fingerprint = self.index.classify(drill)
+        self.counts[status] += 1
+        if status == 'new':
+            self.index.add(f"row {row_number}", drill, fingerprint)
+            return True
+        if self.report:
+            self.report.writerow({
+                'row': row_number,
+                'name': drill.get('name'),
+                'action': 'skip' if status == 'duplicate' else 'merge',
+                'matched_id': match['key'],
+                'matched_name': match['name'],
+                'score': f"{match['score']:.3f}",
+                'name_similarity': '' if match['name_similarity'] is None else f"{match['name_similarity']:.3f}",
+                'description_similarity': ('' if match['description_similarity'] is None
+                                           else f"{match['description_similarity']:.3f}"),
+            })
+        return False
+
+    def close(self):
+        if self.report_file:
+            self.report_file.close()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Resolve drill names from a practice plan to drill IDs in the QDrill catalog.
+
+The catalog (`/api/drills/names`, a list of {id, name}) is fetched once per run
+and indexed two ways:
+
+- a case-folded exact-match dict, and
+- a trigram index used for partial matches, where either name contains the
+  other (e.g. "Half Courts" -> "Half Courts: Review Offensive & Defensive
+  Principles").
+
+Names are resolved as one batch. A name with more than one partial match is
+reported as ambiguous instead of silently resolving to whichever drill
+happens to come first in the list. Several drills with exactly the same name
+are duplicates of one drill: the name resolves to the lowest ID and the
+report warns about the copies.
+
+Usage:
+    from drill_resolver import DrillResolver
+
+    resolver = DrillResolver.from_api(client)
+    results = resolver.resolve_all(names, aliases={"Five star": "5 point star"})
+"""
+
+import re
+from collections import Counter, defaultdict
+
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_name(name):
+    """Case-folds a drill name and collapses whitespace."""
+    return _SPACES.sub(' ', name).strip().casefold()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class DrillResolver:
+    """Exact and partial drill-name lookups over an in-memory catalog index."""
+
+    def __init__(self, catalog):
+        self.drills = [(drill['id'], drill['name'], normalize_name(drill['name'])) for drill in catalog]
+        self.exact = defaultdict(list)
+        self.index = defaultdict(list)
+        self.trigram_counts = []
+        self.short_names = []  # names under 3 characters have no trigrams
+        for position, (_, _, norm) in enumerate(self.drills):
+            self.exact[norm].append(position)
+            grams = trigrams(norm)
+            self.trigram_counts.append(len(grams))
+            if not grams:
+                self.short_names.append(position)
+            for gram in grams:
+                self.index[gram].append(position)
+
+    @classmethod
+    def from_api(cls, client):
+        """Builds a resolver from a single GET /api/drills/names."""
+        return cls(client.get_json('drills/names'))
+
+    def _partial_candidates(self, norm):
+        """Positions of drills whose name contains `norm` or is contained in it."""
+        grams = trigrams(norm)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self.index.get(gram, ()))
+
+        candidates = []
+        for position, count in hits.items():
+            drill_norm = self.drills[position][2]
+            # Every trigram of the contained string must appear in the other one
+            if count == len(grams) and norm in drill_norm:
+                candidates.append(position)
+            elif count == self.trigram_counts[position] and drill_norm in norm:
+                candidates.append(position)
+        if not grams:
+            candidates = [p for p, (_, _, drill_norm) in enumerate(self.drills) if norm in drill_norm]
+        candidates.extend(p for p in self.short_names if self.drills[p][2] and self.drills[p][2] in norm)
+        return sorted(set(candidates))
+
+    def resolve(self, name, alias=None):
+        """Resolves one name.
+
+        Returns a dict with 'name', 'id', 'match' ('exact', 'partial',
+        'ambiguous' or None) and 'candidates' (list of {id, name}, lowest ID
+        first). Exact matches always resolve, to the lowest ID if the name is
+        duplicated; 'id' is None for ambiguous partial matches and misses.
+        """
+        norm = normalize_name(alias or name)
+        positions = self.exact.get(norm)
+        match = 'exact'
+        if not positions:
+            positions = self._partial_candidates(norm) if norm else []
+            match = 'partial'
+        candidates = sorted(({'id': self.drills[p][0], 'name': self.drills[p][1]} for p in positions),
+                            key=lambda candidate: candidate['id'])
+
+        if not candidates:
+            return {'name': name, 'id': None, 'match': None, 'candidates': []}
+        if len(candidates) > 1 and match == 'partial':
+            return {'name': name, 'id': None, 'match': 'ambiguous', 'candidates': candidates}
+        return {'name': name, 'id': candidates[0]['id'], 'match': match, 'candidates': candidates}
+
+    def resolve_all(self, names, aliases=None):
+        """Resolves a batch of names; returns {name: resolution} in input order."""
+        aliases = aliases or {}
+        return {name: self.resolve(name, aliases.get(name)) for name in names}
+
+
+def print_resolution_report(results):
+    """Prints one line per resolved name, listing candidates for ambiguous ones."""
+    for name, result in results.items():
+        if result['match'] in ('exact', 'partial'):
+            matched = result['candidates'][0]['name']
+            via = '' if matched == name else f" -> '{matched}'"
+            print(f"  ✓ {name}{via} (ID: {result['id']}, {result['match']} match)")
+            if len(result['candidates']) > 1:
+                others = ', '.join(str(candidate['id']) for candidate in result['candidates'][1:])
+                print(f"      WARNING: {len(result['candidates'])} drills share this name; "
+                      f"using the lowest ID, duplicates: {others}")
+        elif result['match'] == 'ambiguous':
+            print(f"  ? {name}: {len(result['candidates'])} possible matches")
+            for candidate in result['candidates']:
+                print(f"      - {candidate['name']} (ID: {candidate['id']})")
+        else:
+            print(f"  ✗ {name}: not found")
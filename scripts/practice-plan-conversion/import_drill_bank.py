@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Import a drill-bank CSV (e.g. drill-banks/canada3.csv) into QDrill.
+
+Rows are streamed from the CSV, decoded into the /api/drills schema by
+drill_bank.py and uploaded in chunks through /api/drills/import with a bounded
+number of chunks in flight. Memory use stays constant no matter how large the
+bank is. Invalid rows are reported and skipped. If a chunk is rejected, its rows
+are retried one by one via /api/drills, so one bad row does not drop the rest.
+
+With --dedup, the existing catalog is fingerprinted first (drill_dedup.py) and
+only genuinely new drills are pushed. Exact and near duplicates are skipped, and
+close matches are listed as merge candidates in --dedup-report.
+
+/api/drills/import requires a signed-in session; pass its cookie in
+QDRILL_COOKIE.
+
+Usage:
+    python import_drill_bank.py ../../drill-banks/canada3.csv --dry-run
+    python import_drill_bank.py ../../drill-banks/canada3.csv --dry-run --dedup --dedup-report dedup.csv
+    QDRILL_COOKIE='...' python import_drill_bank.py ../../drill-banks/canada3.csv --chunk-size 200 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from drill_bank import iter_drill_bank
+from drill_dedup import DedupStage, NearDuplicateIndex, load_catalog
+from qdrill_client import AUTH_STATUSES, QDrillClient
+
+
+def iter_valid_chunks(path, chunk_size, stats, dedup=None, max_errors_shown=20):
+    """Yields lists of (row_number, drill) for valid rows, reporting invalid ones.
+
+    If a DedupStage is given, rows it rejects are left out.
+    """
+    chunk = []
+    for row_number, drill, errors in iter_drill_bank(path):
+        stats['rows'] += 1
+        if errors:
+            stats['invalid'] += 1
+            if stats['invalid'] <= max_errors_shown:
+                print(f"  ✗ Row {row_number} ({drill['name'] or 'unnamed'}): {'; '.join(errors)}")
+            elif stats['invalid'] == max_errors_shown + 1:
+                print("  ... further invalid rows not shown")
+            continue
+        if dedup is not None and not dedup.keep(row_number, drill):
+            continue
+        chunk.append((row_number, drill))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def upload_chunk(client, chunk, file_name, visibility):
+    """Imports one chunk, falling back to per-row creation if the chunk is rejected.
+
+    Returns (imported, failed_rows).
+    """
+    try:
+        result = client.import_drills([drill for _, drill in chunk], file_name, visibility)
+        return result.get('importedCount', len(chunk)), []
+    except requests.exceptions.RequestException as e:
+        if getattr(e, 'response', None) is not None and e.response.status_code in AUTH_STATUSES:
+            raise
+        print(f"  ✗ Chunk starting at row {chunk[0][0]} was rejected ({e}), retrying rows individually")
+
+    imported, failed_rows = 0, []
+    for row_number, drill in chunk:
+        if client.create_drill({**drill, 'visibility': visibility}, verbose=False):
+            imported += 1
+        else:
+            failed_rows.append(row_number)
+    return imported, failed_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream a drill-bank CSV into QDrill in chunked batches.')
+    parser.add_argument('csv_path', help='Drill-bank CSV file.')
+    parser.add_argument('--chunk-size', type=int, default=200, help='Drills per import request (default: 200).')
+    parser.add_argument('--workers', type=int, default=4, help='Chunks uploaded concurrently (default: 4).')
+    parser.add_argument('--rps', type=float, default=None, help='Optional cap on API requests per second.')
+    parser.add_argument('--visibility', choices=['public', 'unlisted', 'private'], default='public')
+    parser.add_argument('--file-name', help='Upload source label stored on the drills (default: CSV file name).')
+    parser.add_argument('--dry-run', action='store_true', help='Decode and validate only; do not upload.')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Skip drills that duplicate or closely match existing drills (or earlier rows).')
+    parser.add_argument('--dedup-report', help='Write skipped duplicates and merge candidates to this CSV.')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv_path):
+        print(f"Error: Input file not found: {args.csv_path}")
+        sys.exit(1)
+
+    file_name = args.file_name or os.path.basename(args.csv_path)
+    stats = {'rows': 0, 'invalid': 0, 'imported': 0, 'failed': 0, 'chunks': 0}
+    failed_rows = []
+    client = QDrillClient(rps=args.rps, pool_size=max(10, args.workers))
+
+    dedup = None
+    if args.dedup or args.dedup_report:
+        index = NearDuplicateIndex()
+        dedup_start = time.perf_counter()
+        for drill in load_catalog(client):
+            index.add(drill['id'], drill)
+        print(f"Fingerprinted {len(index)} existing drills in {time.perf_counter() - dedup_start:.1f} s")
+        dedup = DedupStage(index, args.dedup_report)
+
+    chunks = iter_valid_chunks(args.csv_path, max(1, args.chunk_size), stats, dedup)
+    start = time.perf_counter()
+
+    print(f"{'Validating' if args.dry_run else 'Importing'} {args.csv_path}")
+    print("="*60)
+
+    if args.dry_run:
+        for chunk in chunks:
+            stats['chunks'] += 1
+            stats['imported'] += len(chunk)
+    else:
+        workers = max(1, args.workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            try:
+                for chunk in chunks:
+                    # Keep at most 2 chunks per worker queued so memory stays bounded
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            imported, failed = future.result()
+                            stats['imported'] += imported
+                            failed_rows.extend(failed)
+                    stats['chunks'] += 1
+                    pending.add(pool.submit(upload_chunk, client, chunk, file_name, args.visibility))
+                for future in pending:
+                    imported, failed = future.result()
+                    stats['imported'] += imported
+                    failed_rows.extend(failed)
+            except requests.exceptions.RequestException as e:
+                for future in pending:
+                    future.cancel()
+                print(f"\n✗ Import rejected the session ({e}). Set QDRILL_COOKIE to a signed-in session cookie.")
+                sys.exit(1)
+        stats['failed'] = len(failed_rows)
+
+    elapsed = time.perf_counter() - start
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"Rows read: {stats['rows']}")
+    print(f"Invalid rows skipped: {stats['invalid']}")
+    if dedup is not None:
+        dedup.close()
+        print(f"Duplicates skipped: {dedup.counts['duplicate']}, "
+              f"merge candidates held back: {dedup.counts['similar']}")
+        if args.dedup_report:
+            print(f"Dedup report saved to: {args.dedup_report}")
+    if args.dry_run:
+        print(f"Rows to import: {stats['imported']} in {stats['chunks']} chunks")
+    else:
+        client.print_timing_summary()
+        print(f"\n✓ Imported: {stats['imported']} drills in {stats['chunks']} chunks ({elapsed:.1f} s)")
+        if failed_rows:
+            print(f"✗ Failed rows: {', '.join(str(row) for row in sorted(failed_rows))}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Parse markdown practice plans (examples/practice-plans/*.md) into QDrill plan data.
+
+The layout these plans use:
+
+    # 2025 May 31 GTA Practice Plan          -> plan name
+    ## Location, Date, & Time                -> description
+    ## Areas of Focus:                       -> practice_goals (list items)
+    ### 13:30 Drills                         -> section, starting at 13:30
+    ### 14:00 - Half Courts - 60 minutes     -> section with a 60 minute budget
+    Arkansas (like Oklahomas) [15 min]       -> item: a paragraph with a duration
+    4 on 4 no beaters (chasers) - 30 minutes -> item on the CHASERS timeline
+    https://www.qdrill.app/drills/130        -> drill_id of the item above
+    5 Min Break                              -> break item
+    **Beaters**                              -> position sub-list: timed lines
+                                                below it run on BEATERS
+
+Rules that turn free-form notes into plan items:
+- Only paragraph lines with a duration ("[15 min]", "~ 10 min",
+  "- 30 minutes", "20 min Scrim") become items. List items and other text
+  become section notes.
+- A timed item followed by untagged items whose durations add up to exactly
+  its own is a block header ("1.5 offence and defence (beaters) - 30 minutes"
+  over "Arkansas [15 min]" and "Third-Courts [15 min]"). It is replaced by
+  those items, which inherit its timeline.
+- A section with a duration but no timed lines becomes one item named after
+  the section. If the items leave part of the budget unused, the rest goes
+  to a leading item named after the section.
+- Consecutive items on different timelines form a parallel group. Its ID is
+  derived from the section name, so re-parsing an unchanged file gives
+  identical data.
+- Sections without any items (arrival notes, reference lists) are dropped.
+
+compile_plan() turns the parsed plan into a /api/practice-plans payload. The
+command line compiles whole directories of plans on a process pool and can
+POST the results. Plans that fail validation (plan_validation.py) or whose
+schedule has problems (schedule.py) count as failures and are never posted.
+A manifest of content hashes in the output directory lets re-runs skip plans
+whose markdown has not changed.
+
+Usage:
+    from markdown_plan import compile_plan, parse_markdown_plan
+
+    with open('examples/practice-plans/2025 GTA May 31 Practice Plan.md') as f:
+        payload = compile_plan(f.read())
+
+    python markdown_plan.py ../../examples/practice-plans --out-dir compiled-plans
+    python markdown_plan.py ../../examples/practice-plans --out-dir compiled-plans --post --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog_cache import open_catalog
+from plan_validation import check_references, validate_payload
+from schedule import build_schedule
+
+POSITIONS = {'chaser': 'CHASERS', 'beater': 'BEATERS', 'keeper': 'KEEPERS', 'seeker': 'SEEKERS'}
+
+_ESCAPE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!~<>|])')
+_TIME = re.compile(r'\b(\d{1,2}):(\d{2})\b')
+_DURATION = re.compile(r'[\[(~\-–]?\s*\b(\d+)\s*min(?:ute)?s?\b\.?\s*[\])]?', re.IGNORECASE)
+_TRAILING_DURATION = re.compile(r'\s*[-–]?\s*(\d+)\s*min(?:ute)?s?\.?\s*$', re.IGNORECASE)
+_LIST_ITEM = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+_BOLD_LINE = re.compile(r'^\*\*(.+?)\*\*:?$')
+_QDRILL_LINK = re.compile(r'qdrill\.app/(drills|formations)/(\d+)')
+_LINK_LINE = re.compile(r'^\[([^\]]*)\]\(([^)]*)\)$|^(https?://\S+)$')
+_POSITION_NOTE = re.compile(r'\s*\((?:and\s+)?(chasers?|beaters?|keepers?|seekers?)\)', re.IGNORECASE)
+_BREAK = re.compile(r'\bbreak\b', re.IGNORECASE)
+
+
+def unescape(text):
+    """Removes markdown backslash escapes and emphasis markers."""
+    return _ESCAPE.sub(r'\1', text).replace('**', '').strip()
+
+
+def slugify(text):
+    return re.sub(r'[^0-9a-z]+', '_', text.casefold()).strip('_')
+
+
+def positions_in(text):
+    """Timeline labels named in a text: 'Chasers (and seekers)' -> ['CHASERS', 'SEEKERS']."""
+    found = []
+    for word in re.findall(r'[a-z]+', text.casefold()):
+        position = POSITIONS.get(word.rstrip('s'))
+        if position and position not in found:
+            found.append(position)
+    return found
+
+
+def parse_heading(text):
+    """'Notes. 13:00 - Warm up - 30 minutes' -> (start_time, name, duration, preamble)."""
+    text = unescape(text)
+    start_time, preamble = None, ''
+    match = _TIME.search(text)
+    if match:
+        start_time = f"{int(match.group(1)):02d}:{match.group(2)}:00"
+        preamble, text = text[:match.start()].strip(), text[match.end():]
+    duration = None
+    match = _TRAILING_DURATION.search(text)
+    if match:
+        duration = int(match.group(1))
+        text = text[:match.start()]
+    return start_time, text.strip(' -–:'), duration, preamble
+
+
+def parse_item_line(text):
+    """'Arkansas (like Oklahomas) [15 min]' -> item dict, or None if the line has no duration."""
+    match = _DURATION.search(text)
+    if not match:
+        return None
+    name = (text[:match.start()] + ' ' + text[match.end():]).strip(' -–~:')
+    name = re.sub(r'\s{2,}', ' ', name)
+    timeline = None
+    note = _POSITION_NOTE.search(name)
+    if note:
+        timeline = POSITIONS[note.group(1).casefold().rstrip('s')]
+        name = (name[:note.start()] + name[note.end():]).strip(' -–~:')
+    item_type = 'break' if _BREAK.search(name) else 'drill'
+    return {'type': item_type, 'name': 'Break' if item_type == 'break' and len(name.split()) <= 2 else name,
+            'duration': int(match.group(1)), 'parallel_timeline': timeline}
+
+
+def _expand_blocks(items):
+    """Replaces block header items by the untagged items that fill their duration."""
+    expanded = []
+    i = 0
+    while i < len(items):
+        block, j, total = items[i], i + 1, 0
+        while (j < len(items) and items[j]['parallel_timeline'] is None and items[j]['type'] != 'break'
+               and total + items[j]['duration'] <= block['duration']):
+            total += items[j]['duration']
+            j += 1
+        if j > i + 1 and total == block['duration']:
+            for child in items[i + 1:j]:
+                child['parallel_timeline'] = block['parallel_timeline']
+                expanded.append(child)
+            i = j
+        else:
+            expanded.append(block)
+            i += 1
+    return expanded
+
+
+def _assign_groups(section_name, items):
+    """Gives each run of consecutive items spanning several timelines one parallel group."""
+    runs, run = [], []
+    for item in items + [None]:
+        if item is not None and item.get('parallel_timeline'):
+            run.append(item)
+            continue
+        if run:
+            runs.append(run)
+            run = []
+    for number, run in enumerate(runs, start=1):
+        timelines = []
+        for item in run:
+            for position in item['parallel_timeline'].split('/'):
+                if position not in timelines:
+                    timelines.append(position)
+        if len({item['parallel_timeline'] for item in run}) < 2:
+            continue
+        group_id = f"{slugify(section_name)}_{number}"
+        for item in run:
+            item['parallel_group_id'] = group_id
+            item['groupTimelines'] = timelines
+
+
+def _finish_item(item):
+    """Drops empty optional keys so items match create_drill_item/create_break_item."""
+    return {key: value for key, value in item.items() if value is not None or key in ('type', 'name', 'duration')}
+
+
+def _finish_section(section):
+    items = _expand_blocks(section['items'])
+    budget = section['duration']
+    used = sum(item['duration'] for item in items)
+    if budget and used < budget and (not items or section['lead_notes']):
+        items.insert(0, {'type': 'drill', 'name': section['name'], 'duration': budget - used,
+                         'drill_id': section['drill_id'], 'parallel_timeline': None})
+    for item in items:
+        if item['type'] == 'drill' and item.get('drill_id') is None:
+            item['drill_id'] = section['drill_id']
+    _assign_groups(section['name'], items)
+    return {
+        'name': section['name'],
+        'notes': '\n'.join(section['notes']).strip(),
+        'start_time': section['start_time'],
+        'items': [_finish_item(item) for item in items],
+    }
+
+
+def parse_markdown_plan(text):
+    """Returns plan data: name, description, practice_goals, start_time and sections with items."""
+    plan = {'name': None, 'description': '', 'practice_goals': [], 'start_time': None, 'sections': []}
+    block = None  # the current "## " block name, before the first section
+    description = []
+    section = None
+    position = None
+    raw_sections = []
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.startswith('# ') and plan['name'] is None:
+            plan['name'] = unescape(line[2:])
+            continue
+        if line.startswith('## ') and section is None:
+            block = unescape(line[3:]).rstrip(':').casefold()
+            continue
+        if line.startswith('### '):
+            start_time, name, duration, preamble = parse_heading(line[4:])
+            section = {'name': name, 'start_time': start_time, 'duration': duration, 'items': [],
+                       'notes': [preamble] if preamble else [], 'lead_notes': False, 'drill_id': None}
+            raw_sections.append(section)
+            position = None
+            continue
+
+        if section is None:
+            content = unescape(_LIST_ITEM.sub('', line))
+            if block and block.startswith('areas of focus') and _LIST_ITEM.match(line):
+                plan['practice_goals'].append(content)
+            elif block and block.startswith('location'):
+                description.append(content)
+            continue
+
+        link = _LINK_LINE.match(line)
+        qdrill = _QDRILL_LINK.search(line) if link else None
+        if qdrill:
+            kind, entity_id = qdrill.group(1), int(qdrill.group(2))
+            if kind == 'formations':
+                label = unescape(link.group(1) or '')
+                section['items'].append({'type': 'formation', 'name': label if label and 'qdrill.app' not in label
+                                         else f"Formation {entity_id}", 'duration': 0, 'formation_id': entity_id,
+                                         'parallel_timeline': position})
+            elif section['items'] and section['items'][-1].get('drill_id') is None:
+                section['items'][-1]['drill_id'] = entity_id
+            elif not section['items']:
+                section['drill_id'] = entity_id
+            continue
+
+        if _LIST_ITEM.match(line):
+            section['notes'].append(unescape(line))
+            section['lead_notes'] = section['lead_notes'] or not section['items']
+            continue
+
+        bold = _BOLD_LINE.match(line)
+        item = parse_item_line(unescape(line))
+        if bold and item is None:
+            position = '/'.join(positions_in(unescape(bold.group(1)))) or None
+            section['notes'].append(unescape(line))
+            section['lead_notes'] = section['lead_notes'] or not section['items']
+            continue
+        if item is None:
+            section['notes'].append(unescape(line))
+            section['lead_notes'] = section['lead_notes'] or not section['items']
+            continue
+        if item['parallel_timeline'] is None and item['type'] != 'break':
+            item['parallel_timeline'] = position
+        item['drill_id'] = None
+        section['items'].append(item)
+
+    plan['description'] = '\n'.join(description)
+    for raw in raw_sections:
+        finished = _finish_section(raw)
+        if finished['items']:
+            finished['order'] = len(plan['sections'])
+            plan['sections'].append(finished)
+    plan['start_time'] = next((s['start_time'] for s in plan['sections'] if s['start_time']), None)
+    return plan
+
+
+# Bump when parsing rules change, so cached outputs from older rules are rebuilt
+COMPILER_VERSION = '1'
+MANIFEST_NAME = '.markdown_plans.json'
+
+PLAN_DEFAULTS = {
+    'visibility': 'public',
+    'is_editable_by_others': True,
+}
+
+
+def compile_plan(text, fallback_name=None, defaults=None):
+    """Compiles markdown text into a /api/practice-plans payload."""
+    plan = parse_markdown_plan(text)
+    payload = {
+        'name': plan['name'] or fallback_name,
+        'description': plan['description'],
+        'practice_goals': plan['practice_goals'],
+        **PLAN_DEFAULTS,
+        **(defaults or {}),
+        'sections': [
+            {'name': section['name'], 'order': section['order'], 'notes': section['notes'],
+             'items': section['items']}
+            for section in plan['sections']
+        ],
+    }
+    if plan['start_time']:
+        payload['start_time'] = plan['start_time']
+    return payload
+
+
+def content_hash(text):
+    return hashlib.sha256(f"{COMPILER_VERSION}\n{text}".encode('utf-8')).hexdigest()
+
+
+def _compile_job(job):
+    """Process-pool worker: (relative path, text) -> (relative path, payload, error)."""
+    relative_path, text = job
+    try:
+        fallback = os.path.splitext(os.path.basename(relative_path))[0]
+        payload = compile_plan(text, fallback)
+        problems = validate_payload(payload)[0] + build_schedule(payload)['problems']
+        if problems:
+            return relative_path, None, '; '.join(problems)
+        return relative_path, payload, None
+    except Exception as e:
+        return relative_path, None, str(e)
+
+
+def find_markdown_files(paths):
+    """Yields (path, path relative to its input root) for every .md file under the given paths."""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path, os.path.basename(path)
+            continue
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith('.md'):
+                    full_path = os.path.join(root, name)
+                    yield full_path, os.path.relpath(full_path, path)
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile markdown practice plans into QDrill plan payloads.')
+    parser.add_argument('paths', nargs='+', help='Markdown files or directories of them.')
+    parser.add_argument('--out-dir', default='compiled-plans', help='Where payload JSON files and the manifest go.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used to compile (default: CPU count).')
+    parser.add_argument('--force', action='store_true', help='Recompile (and re-post) even unchanged plans.')
+    parser.add_argument('--post', action='store_true', help='Also create each compiled plan via /api/practice-plans.')
+    parser.add_argument('--rps', type=float, default=None, help='Optional cap on API requests per second.')
+    args = parser.parse_args()
+
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing:
+        print(f"Error: Input file not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    manifest = load_manifest(args.out_dir)
+    jobs, hashes, skipped = [], {}, 0
+    for path, relative_path in find_markdown_files(args.paths):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        digest = content_hash(text)
+        entry = manifest.get(relative_path, {})
+        output = os.path.join(args.out_dir, os.path.splitext(relative_path)[0] + '.json')
+        up_to_date = entry.get('hash') == digest and os.path.exists(output)
+        if up_to_date and not args.force and (entry.get('plan_id') or not args.post):
+            skipped += 1
+            continue
+        hashes[relative_path] = (digest, output)
+        jobs.append((relative_path, text))
+
+    print(f"Compiling {len(jobs)} plan(s), {skipped} unchanged")
+    print("="*60)
+    compiled, failed = [], []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as pool:
+            for relative_path, payload, error in pool.map(_compile_job, jobs, chunksize=4):
+                if error:
+                    failed.append(relative_path)
+                    print(f"  ✗ {relative_path}: {error}")
+                    continue
+                digest, output = hashes[relative_path]
+                os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+                with open(output, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, indent=2, ensure_ascii=False)
+                # A changed plan is a new plan to post; keep the old ID only while the content is the same
+                plan_id = manifest.get(relative_path, {}).get('plan_id')
+                manifest[relative_path] = {
+                    'hash': digest, 'output': output,
+                    'plan_id': plan_id if manifest.get(relative_path, {}).get('hash') == digest else None,
+                }
+                compiled.append((relative_path, payload))
+                items = sum(len(section['items']) for section in payload['sections'])
+                total = build_schedule(payload)['total']
+                print(f"  ✓ {relative_path}: {len(payload['sections'])} sections, {items} items, {total} min")
+        save_manifest(args.out_dir, manifest)
+
+    posted = 0
+    to_post = [(path, payload) for path, payload in compiled if args.force or not manifest[path]['plan_id']]
+    if args.post and to_post:
+        from qdrill_client import QDrillClient
+
+        client = QDrillClient(rps=args.rps)
+        # Drill and formation links must exist; checked against the catalog cache, refreshed only when stale
+        try:
+            with open_catalog(client) as catalog:
+                unresolved = {path: check_references(payload, catalog) for path, payload in to_post}
+        except Exception as e:
+            print(f"\n✗ Could not refresh the drill/formation catalog: {e}")
+            unresolved = {path: ["catalog refresh failed"] for path, _ in to_post}
+        for relative_path, errors in unresolved.items():
+            for error in errors:
+                print(f"  ✗ {relative_path}: {error}")
+        failed.extend(path for path, errors in unresolved.items() if errors)
+        to_post = [(path, payload) for path, payload in to_post if not unresolved[path]]
+
+    if args.post and to_post:
+        print(f"\nCreating {len(to_post)} practice plan(s)...")
+        results = client.create_many([payload for _, payload in to_post], client.create_practice_plan,
+                                     workers=args.workers)
+        for (relative_path, _), result in zip(to_post, results):
+            if result:
+                manifest[relative_path]['plan_id'] = result['id']
+                posted += 1
+            else:
+                failed.append(relative_path)
+        save_manifest(args.out_dir, manifest)
+        client.print_timing_summary()
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"Compiled: {len(compiled)}")
+    print(f"Skipped (unchanged): {skipped}")
+    if args.post:
+        print(f"Created: {posted}")
+    if failed:
+        print(f"Failed: {', '.join(sorted(set(failed)))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
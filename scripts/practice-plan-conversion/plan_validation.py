@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Validate practice plan payloads locally before they are POSTed.
+
+Two checks, both offline:
+- schema: the payload is checked against createPracticePlanSchema
+  (src/lib/validation/practicePlanSchema.ts), the schema /api/practice-plans
+  validates with. That covers required names, item types, integer durations
+  (at least 1 minute except for formations), HH:MM:SS start times, non-empty
+  sections and timelines on parallel items;
+- references: every drill_id and formation_id must exist in the local catalog
+  cache (catalog_cache.py). That is one indexed SQLite read per kind, with no
+  API call.
+
+Errors block the POST. Warnings cover keys outside the schema and drill items
+without a drill_id, which the API accepts but shows as one-off activities.
+
+Usage:
+    from plan_validation import validate_plan
+
+    validation = validate_plan(plan_data, catalog)
+    if validation['errors']:
+        sys.exit(1)
+
+    python plan_validation.py compiled-plans/plan.json
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from catalog_cache import DEFAULT_CACHE_PATH, CatalogCache
+
+ITEM_TYPES = ('drill', 'break', 'activity', 'formation')
+VISIBILITIES = ('public', 'private', 'unlisted')
+START_TIME = re.compile(r'^([01]\d|2[0-3]):([0-5]\d):([0-5]\d)$')
+
+PLAN_KEYS = {
+    'name', 'description', 'phase_of_season', 'estimated_number_of_participants', 'practice_goals',
+    'visibility', 'is_editable_by_others', 'start_time', 'sections',
+}
+SECTION_KEYS = {'name', 'order', 'goals', 'notes', 'items'}
+ITEM_KEYS = {
+    'type', 'name', 'duration', 'drill_id', 'formation_id', 'diagram_data', 'parallel_group_id',
+    'parallel_timeline', 'groupTimelines', 'group_timelines', 'order',
+}
+REFERENCES = {'drill_id': 'drill', 'formation_id': 'formation'}
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(entry, str) for entry in value)
+
+
+def _check_item(item, path, errors, warnings):
+    if not isinstance(item, dict):
+        errors.append(f"{path}: must be an object")
+        return
+    if item.get('type') not in ITEM_TYPES:
+        errors.append(f"{path}.type: must be one of {', '.join(ITEM_TYPES)} (got {item.get('type')!r})")
+    if not isinstance(item.get('name'), str) or not item['name']:
+        errors.append(f"{path}.name: item name is required")
+
+    duration = item.get('duration')
+    if not _is_int(duration) or duration < 0:
+        errors.append(f"{path}.duration: must be a non-negative integer (got {duration!r})")
+    elif item.get('type') != 'formation' and duration < 1:
+        errors.append(f"{path}.duration: must be at least 1 minute")
+
+    for key in ('drill_id', 'formation_id'):
+        if item.get(key) is not None and not _is_int(item[key]):
+            errors.append(f"{path}.{key}: must be an integer or null (got {item[key]!r})")
+    for key in ('diagram_data', 'parallel_group_id', 'parallel_timeline'):
+        if item.get(key) is not None and not isinstance(item[key], str):
+            errors.append(f"{path}.{key}: must be a string or null")
+    for key in ('groupTimelines', 'group_timelines'):
+        if item.get(key) is not None and not _is_string_list(item[key]):
+            errors.append(f"{path}.{key}: must be a list of strings or null")
+    if 'order' in item and not _is_int(item['order']):
+        errors.append(f"{path}.order: must be an integer")
+    if 'id' in item:
+        errors.append(f"{path}.id: new items must not have an id")
+
+    if item.get('type') == 'drill' and item.get('drill_id') is None:
+        warnings.append(f"{path}: drill {item.get('name')!r} has no drill_id and will not link to a drill")
+    if item.get('type') == 'formation' and item.get('formation_id') is None:
+        warnings.append(f"{path}: formation {item.get('name')!r} has no formation_id")
+    for key in sorted(set(item) - ITEM_KEYS - {'id'}):
+        warnings.append(f"{path}.{key}: not part of the API schema")
+
+
+def _check_section(section, path, errors, warnings):
+    if not isinstance(section, dict):
+        errors.append(f"{path}: must be an object")
+        return
+    if not isinstance(section.get('name'), str) or not section['name']:
+        errors.append(f"{path}.name: section name is required")
+    if 'order' in section and not _is_int(section['order']):
+        errors.append(f"{path}.order: must be an integer")
+    if 'goals' in section and not _is_string_list(section['goals']):
+        errors.append(f"{path}.goals: must be a list of strings")
+    if 'notes' in section and not isinstance(section['notes'], str):
+        errors.append(f"{path}.notes: must be a string")
+    for key in sorted(set(section) - SECTION_KEYS):
+        warnings.append(f"{path}.{key}: not part of the API schema")
+
+    items = section.get('items')
+    if not isinstance(items, list) or not items:
+        errors.append(f"{path}.items: each section must have at least one item")
+        return
+    for index, item in enumerate(items):
+        _check_item(item, f"{path}.items[{index}]", errors, warnings)
+        if isinstance(item, dict) and item.get('parallel_group_id') and not item.get('parallel_timeline'):
+            errors.append(f"{path}.items[{index}]: parallel items must have both a group ID and a timeline")
+
+
+def validate_payload(plan_data):
+    """Checks a plan payload against the create schema; returns (errors, warnings)."""
+    errors, warnings = [], []
+    if not isinstance(plan_data, dict):
+        return ["plan: must be an object"], warnings
+
+    name = plan_data.get('name')
+    if not isinstance(name, str) or not name:
+        errors.append("name: plan name is required")
+    elif len(name) > 255:
+        errors.append("name: plan name cannot exceed 255 characters")
+    if 'description' in plan_data and not isinstance(plan_data['description'], str):
+        errors.append("description: must be a string")
+    if plan_data.get('phase_of_season') is not None and not isinstance(plan_data['phase_of_season'], str):
+        errors.append("phase_of_season: must be a string or null")
+    participants = plan_data.get('estimated_number_of_participants')
+    if participants is not None and (not _is_int(participants) or participants < 1):
+        errors.append("estimated_number_of_participants: must be a positive integer or null")
+    goals = plan_data.get('practice_goals')
+    if goals is not None and (not _is_string_list(goals) or not all(goals)):
+        errors.append("practice_goals: must be a list of non-empty strings")
+    if 'visibility' in plan_data and plan_data['visibility'] not in VISIBILITIES:
+        errors.append(f"visibility: must be one of {', '.join(VISIBILITIES)}")
+    if 'is_editable_by_others' in plan_data and not isinstance(plan_data['is_editable_by_others'], bool):
+        errors.append("is_editable_by_others: must be true or false")
+    start_time = plan_data.get('start_time')
+    if start_time is not None and not (isinstance(start_time, str) and START_TIME.match(start_time)):
+        errors.append(f"start_time: must be HH:MM:SS (got {start_time!r})")
+    for key in sorted(set(plan_data) - PLAN_KEYS):
+        warnings.append(f"{key}: not part of the API schema")
+
+    sections = plan_data.get('sections')
+    if not isinstance(sections, list) or not sections:
+        errors.append("sections: a practice plan must have at least one section")
+        return errors, warnings
+    for index, section in enumerate(sections):
+        _check_section(section, f"sections[{index}]", errors, warnings)
+    return errors, warnings
+
+
+def check_references(plan_data, catalog):
+    """Errors for drill_id/formation_id values missing from the catalog cache."""
+    referenced = {}
+    sections = plan_data.get('sections')
+    for s_index, section in enumerate(sections if isinstance(sections, list) else []):
+        items = section.get('items') if isinstance(section, dict) else None
+        for i_index, item in enumerate(items if isinstance(items, list) else []):
+            if not isinstance(item, dict):
+                continue
+            for key, kind in REFERENCES.items():
+                if _is_int(item.get(key)):
+                    referenced.setdefault(kind, []).append((f"sections[{s_index}].items[{i_index}]", item, key))
+
+    errors = []
+    for kind, references in referenced.items():
+        if not catalog.is_complete(kind):
+            errors.append(f"The catalog cache has no complete {kind} list; run catalog_cache.py to refresh it")
+            continue
+        known = catalog.ids(kind)
+        for path, item, key in references:
+            if item[key] not in known:
+                errors.append(f"{path}.{key}: {kind} {item[key]} ({item.get('name')!r}) does not exist")
+    return errors
+
+
+def validate_plan(plan_data, catalog=None, verbose=True):
+    """Runs the schema and reference checks and prints the results.
+
+    `catalog` is an open CatalogCache; without one the default cache file is
+    read offline. Returns {'errors': [...], 'warnings': [...]}; callers should
+    not POST a plan with errors.
+    """
+    errors, warnings = validate_payload(plan_data)
+    if isinstance(plan_data, dict):
+        if catalog is None:
+            with CatalogCache() as cache:
+                errors.extend(check_references(plan_data, cache))
+        else:
+            errors.extend(check_references(plan_data, catalog))
+
+    if verbose:
+        for warning in warnings:
+            print(f"  ! {warning}")
+        for error in errors:
+            print(f"  ✗ {error}")
+        if not errors:
+            print(f"  ✓ Payload is valid ({len(warnings)} warnings)")
+    return {'errors': errors, 'warnings': warnings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate practice plan payloads against the API schema and catalog.')
+    parser.add_argument('paths', nargs='+', help='JSON payload files (e.g. markdown_plan.py output).')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Catalog cache file.')
+    args = parser.parse_args()
+
+    failed = []
+    with CatalogCache(args.cache) as catalog:
+        for path in args.paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                plan_data = json.load(f)
+            print(f"\n{path}")
+            if validate_plan(plan_data, catalog)['errors']:
+                failed.append(path)
+
+    if failed:
+        print(f"\n✗ Invalid plans: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
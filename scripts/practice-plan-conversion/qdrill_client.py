@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the practice-plan-conversion scripts.
+
+All scripts talk to the QDrill API through one persistent requests.Session, so
+consecutive requests reuse pooled keep-alive connections instead of opening a
+new TCP connection each time. Transient failures (connection errors, 429 and
+5xx responses) are retried a bounded number of times with jittered exponential
+backoff, and every request's latency is recorded for a summary at the end of a
+run. Bulk creation can fan out over a small thread pool while a token-bucket
+rate limiter caps the request rate the server sees.
+
+Configuration (environment variables):
+    QDRILL_API_URL   Base API URL (default: http://localhost:3000/api)
+    QDRILL_COOKIE    Optional Cookie header, e.g. a signed-in session for
+                     endpoints behind authGuard
+
+Usage:
+    from qdrill_client import QDrillClient
+
+    client = QDrillClient()
+    drill = client.create_drill(drill_data)
+    client.print_timing_summary()
+
+    # Concurrent creation, at most 5 requests per second, results in input order
+    client = QDrillClient(rps=5)
+    results = client.create_many(drills, client.create_drill, workers=4)
+
+    # Chunked creation through /api/drills/import (needs QDRILL_COOKIE)
+    results = client.bulk_create_drills(drills, chunk_size=50)
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE_URL = os.environ.get('QDRILL_API_URL', 'http://localhost:3000/api').rstrip('/')
+APP_BASE_URL = API_BASE_URL[:-len('/api')] if API_BASE_URL.endswith('/api') else API_BASE_URL
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+AUTH_STATUSES = {401, 403}
+
+
+class RateLimiter:
+    """Thread-safe token bucket: allows `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def to_import_drill(drill):
+    """Converts a POST /api/drills payload into the row shape /api/drills/import expects."""
+    row = {key: value for key, value in drill.items()
+           if key not in ('suggested_length_min', 'suggested_length_max',
+                          'number_of_people_min', 'number_of_people_max')}
+    if 'suggested_length' not in row and ('suggested_length_min' in drill or 'suggested_length_max' in drill):
+        row['suggested_length'] = {'min': drill.get('suggested_length_min'),
+                                   'max': drill.get('suggested_length_max')}
+    if 'number_of_people' not in row and ('number_of_people_min' in drill or 'number_of_people_max' in drill):
+        row['number_of_people'] = {'min': drill.get('number_of_people_min'),
+                                   'max': drill.get('number_of_people_max')}
+    return row
+
+
+class QDrillClient:
+    """Keep-alive API client with bounded, jittered retries and per-request timing."""
+
+    def __init__(self, base_url=API_BASE_URL, max_retries=3, backoff=0.5, max_backoff=8.0,
+                 timeout=30, pool_size=10, rps=None):
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.timings = []
+        # Applied to every attempt, retries included, so backoff never exceeds the budget
+        self.limiter = RateLimiter(rps) if rps else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+        cookie = os.environ.get('QDRILL_COOKIE')
+        if cookie:
+            self.session.headers['Cookie'] = cookie
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # "Full jitter": spread retries out so parallel callers don't retry in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def request(self, method, path, **kwargs):
+        """Send a request, retrying transient failures; raises for non-2xx responses."""
+        url = path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+        kwargs.setdefault('timeout', self.timeout)
+        label = f"{method.upper()} /{path.lstrip('/').split('?')[0]}"
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout):
+                self.timings.append((label, None, time.perf_counter() - start))
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+
+            self.timings.append((label, response.status_code, time.perf_counter() - start))
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            return response
+
+    def get_json(self, path, **kwargs):
+        return self.request('GET', path, **kwargs).json()
+
+    def post_json(self, path, payload, **kwargs):
+        return self.request('POST', path, json=payload, **kwargs).json()
+
+    def _create(self, kind, path, data, verbose=True):
+        """POST a new entity and return the created object, or None on failure."""
+        if verbose:
+            print(f"\nCreating {kind}: {data['name']}")
+            print("="*50)
+
+        try:
+            created = self.post_json(path, data)
+
+            if 'error' in created:
+                print(f"ERROR: {created['error']}")
+                return None
+
+            if verbose:
+                print(f"✓ Successfully created {kind} with ID: {created['id']}")
+            return created
+
+        except requests.exceptions.RequestException as e:
+            print(f"✗ HTTP Request failed for {kind} '{data['name']}': {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                print(f"  Status Code: {e.response.status_code}")
+                print(f"  Response: {e.response.text}")
+            return None
+        except Exception as e:
+            print(f"✗ Unexpected error for {kind} '{data['name']}': {e}")
+            return None
+
+    def create_drill(self, drill_data, verbose=True):
+        return self._create('drill', 'drills', drill_data, verbose)
+
+    def create_formation(self, formation_data, verbose=True):
+        return self._create('formation', 'formations', formation_data, verbose)
+
+    def create_practice_plan(self, plan_data, verbose=True):
+        return self._create('practice plan', 'practice-plans', plan_data, verbose)
+
+    def create_many(self, items, create_fn, workers=4):
+        """Runs `create_fn(item, verbose=False)` for every item on up to `workers` threads.
+
+        Prints one progress line per item as it finishes and returns the results
+        (created objects, or None for failures) in the same order as `items`.
+        """
+        items = list(items)
+        total = len(items)
+        done = [0]
+        print_lock = threading.Lock()
+
+        def run(item):
+            result = create_fn(item, verbose=False)
+            with print_lock:
+                done[0] += 1
+                if result:
+                    print(f"  [{done[0]}/{total}] ✓ {item['name']} (ID {result['id']})")
+                else:
+                    print(f"  [{done[0]}/{total}] ✗ {item['name']}")
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return list(pool.map(run, items))
+
+    def import_drills(self, drills, file_name, visibility='public'):
+        """POSTs one chunk to /api/drills/import; returns {importedCount, uploadSource}."""
+        payload = {'drills': [to_import_drill(drill) for drill in drills],
+                   'fileName': file_name, 'visibility': visibility}
+        return self.post_json('drills/import', payload)
+
+    def bulk_create_drills(self, drills, chunk_size=50, file_name='practice-plan-conversion',
+                           visibility='public', workers=4):
+        """Creates drills in chunks through POST /api/drills/import.
+
+        Each chunk is inserted in one server-side transaction. The endpoint only
+        reports a count, so IDs are mapped back by name with one
+        GET /api/drills/names after all chunks are sent. Drills from chunks that
+        fail are retried one by one via POST /api/drills. If the import endpoint
+        rejects the session (401/403), the remaining drills fall back to
+        individual POSTs.
+
+        Returns the created drills ({id, name, ...}, or None) in input order.
+        """
+        drills = list(drills)
+        chunk_size = max(1, chunk_size)
+        results = [None] * len(drills)
+        imported, failed = [], []
+        import_available = True
+
+        for start in range(0, len(drills), chunk_size):
+            positions = list(range(start, min(start + chunk_size, len(drills))))
+            if not import_available:
+                failed.extend(positions)
+                continue
+            try:
+                response = self.import_drills([drills[p] for p in positions], file_name, visibility)
+                print(f"  ✓ Imported drills {start + 1}-{positions[-1] + 1} "
+                      f"({response.get('importedCount', len(positions))} rows)")
+                imported.extend(positions)
+            except requests.exceptions.RequestException as e:
+                print(f"  ✗ Import of drills {start + 1}-{positions[-1] + 1} failed: {e}")
+                failed.extend(positions)
+                if getattr(e, 'response', None) is not None and e.response.status_code in AUTH_STATUSES:
+                    print("    Bulk import needs a signed-in session (QDRILL_COOKIE); "
+                          "creating the remaining drills individually")
+                    import_available = False
+
+        if imported:
+            ids_by_name = {}
+            for drill in self.get_json('drills/names'):
+                ids_by_name.setdefault(drill['name'], []).append(drill['id'])
+            wanted = {}
+            for p in imported:
+                wanted.setdefault(drills[p]['name'], []).append(p)
+            for name, positions in wanted.items():
+                # The newest IDs for a name are the rows this import just inserted
+                ids = sorted(ids_by_name.get(name, []))[-len(positions):]
+                if len(ids) < len(positions):
+                    print(f"  ✗ Could not find imported drill '{name}' in /api/drills/names")
+                for p, drill_id in zip(positions, ids):
+                    results[p] = {**drills[p], 'id': drill_id}
+
+        if failed:
+            print(f"  Retrying {len(failed)} drills individually...")
+            retried = self.create_many([drills[p] for p in failed], self.create_drill, workers=workers)
+            for p, result in zip(failed, retried):
+                results[p] = result
+        return results
+
+    def timing_summary(self):
+        """Per-endpoint request counts, retries/failures and latency stats (ms)."""
+        summary = {}
+        for label, status, elapsed in self.timings:
+            stats = summary.setdefault(label, {'count': 0, 'failed': 0, 'latencies': []})
+            stats['count'] += 1
+            if status is None or status >= 400:
+                stats['failed'] += 1
+            stats['latencies'].append(elapsed * 1000)
+        for stats in summary.values():
+            latencies = sorted(stats.pop('latencies'))
+            stats['total_ms'] = sum(latencies)
+            stats['mean_ms'] = stats['total_ms'] / len(latencies)
+            stats['max_ms'] = latencies[-1]
+        return summary
+
+    def print_timing_summary(self):
+        summary = self.timing_summary()
+        if not summary:
+            return
+        print("\nAPI timing:")
+        for label, stats in sorted(summary.items()):
+            failed = f", {stats['failed']} failed/retried" if stats['failed'] else ''
+            print(f"  {label}: {stats['count']} requests{failed}, "
+                  f"mean {stats['mean_ms']:.0f} ms, max {stats['max_ms']:.0f} ms, "
+                  f"total {stats['total_ms'] / 1000:.2f} s")
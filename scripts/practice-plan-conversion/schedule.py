@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Wall-clock schedule for /api/practice-plans payloads, computed in one pass.
+
+Each section's items are walked once, in order:
+- an item without a parallel_group_id runs for everyone, after everything
+  before it;
+- consecutive items that share a parallel_group_id form one parallel block.
+  Each parallel_timeline ("BEATERS", "CHASERS/KEEPERS", ...) runs its items
+  one after another from the start of the block. The block lasts as long as
+  its longest timeline, so a 20 minute BEATERS drill next to two 15 minute
+  CHASERS drills takes 30 minutes, not 20;
+- formations take no time, as in practicePlanService.calculateSectionDuration.
+
+Sections follow each other, so the total is the sum of section lengths. With a
+plan start_time ("18:00:00"), every section and item also gets a clock time.
+
+check_plan() also reports payloads that would give a wrong schedule. These
+problems block the POST:
+- a missing, non-integer or negative duration;
+- a parallel item without a parallel_timeline;
+- a parallel group split by other items;
+- a start_time that is not HH:MM[:SS].
+Timelines that finish before the end of their block are reported as idle time.
+This is a warning only.
+
+Usage:
+    from schedule import check_plan
+
+    schedule = check_plan(plan_data)
+    if schedule['problems']:
+        sys.exit(1)
+
+    python schedule.py compiled-plans/plan.json
+"""
+
+import argparse
+import json
+import re
+import sys
+
+ALL_TIMELINE = 'ALL'
+
+_START_TIME = re.compile(r'^(\d{1,2}):(\d{2})(?::(\d{2}))?$')
+
+
+def parse_start_time(start_time):
+    """'18:00:00' -> minutes after midnight; None if the plan has no start time."""
+    if not start_time:
+        return None
+    match = _START_TIME.match(str(start_time).strip())
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"start_time {start_time!r} is not HH:MM[:SS]")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def format_time(start, offset):
+    """Clock time of `offset` minutes into the plan, or '+offset' without a start time."""
+    if start is None:
+        return f"+{offset}"
+    minutes = (start + offset) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def timeline_positions(timeline):
+    """'CHASERS/KEEPERS' -> ['CHASERS', 'KEEPERS']; untagged items run for ALL."""
+    if not timeline:
+        return [ALL_TIMELINE]
+    return [part.strip() for part in timeline.split('/') if part.strip()]
+
+
+def item_minutes(item):
+    """Minutes an item occupies its timeline, or None if its duration is unusable."""
+    if item.get('type') == 'formation':
+        return 0
+    duration = item.get('selected_duration', item.get('duration'))
+    if isinstance(duration, bool) or not isinstance(duration, int) or duration < 0:
+        return None
+    return duration
+
+
+def schedule_section(section, offset=0):
+    """Lays out one section starting `offset` minutes into the plan.
+
+    Returns the section schedule: start, end, duration, items (each with
+    start, end and positions), positions ({position: [start, end]}),
+    problems and idle warnings.
+    """
+    problems, warnings, entries, positions = [], [], [], {}
+    label = section.get('name') or 'Unnamed section'
+    clock = offset
+    group_id, group_start, cursors, closed = None, offset, {}, set()
+
+    def close_group():
+        end = max(cursors.values(), default=group_start)
+        for timeline, finished in cursors.items():
+            if finished < end:
+                warnings.append(f"{label}: {timeline} is idle for {end - finished} min of group {group_id}")
+        closed.add(group_id)
+        return end
+
+    for item in section.get('items', []):
+        name = item.get('name') or 'Unnamed item'
+        current = item.get('parallel_group_id')
+        if current != group_id:
+            if group_id:
+                clock = close_group()
+            if current in closed:
+                problems.append(f"{label}: parallel group {current} is split by other items (at {name!r})")
+            group_id, group_start, cursors = current, clock, {}
+
+        duration = item_minutes(item)
+        if duration is None:
+            problems.append(f"{label}: {name!r} has an invalid duration {item.get('duration')!r}")
+            duration = 0
+
+        if current:
+            timeline = item.get('parallel_timeline')
+            if not timeline:
+                problems.append(f"{label}: {name!r} is in parallel group {current} but has no parallel_timeline")
+                timeline = ALL_TIMELINE
+            start = cursors.get(timeline, group_start)
+            cursors[timeline] = start + duration
+        else:
+            timeline = None
+            start = clock
+            clock += duration
+
+        item_positions = timeline_positions(timeline)
+        entries.append({'name': name, 'start': start, 'end': start + duration, 'positions': item_positions})
+        if duration:
+            for position in item_positions:
+                span = positions.setdefault(position, [start, start + duration])
+                span[1] = start + duration
+
+    if group_id:
+        clock = close_group()
+
+    return {
+        'name': label, 'start': offset, 'end': clock, 'duration': clock - offset,
+        'items': entries, 'positions': positions, 'problems': problems, 'warnings': warnings,
+    }
+
+
+def build_schedule(plan_data):
+    """Schedules every section of a plan payload back to back."""
+    problems = []
+    try:
+        start = parse_start_time(plan_data.get('start_time'))
+    except ValueError as e:
+        problems.append(str(e))
+        start = None
+
+    sections, offset = [], 0
+    for section in plan_data.get('sections', []):
+        scheduled = schedule_section(section, offset)
+        sections.append(scheduled)
+        problems.extend(scheduled['problems'])
+        offset = scheduled['end']
+
+    return {
+        'start': start, 'total': offset, 'sections': sections, 'problems': problems,
+        'warnings': [warning for section in sections for warning in section['warnings']],
+    }
+
+
+def print_schedule(schedule, verbose=False):
+    start = schedule['start']
+    for section in schedule['sections']:
+        print(f"  {format_time(start, section['start'])}-{format_time(start, section['end'])}  "
+              f"{section['name']} ({section['duration']} min)")
+        if verbose:
+            for item in section['items']:
+                print(f"      {format_time(start, item['start'])}-{format_time(start, item['end'])}  "
+                      f"{item['name']} [{'/'.join(item['positions'])}]")
+    total = schedule['total']
+    print(f"Total duration: {total} minutes ({total/60:.1f} hours)")
+
+
+def check_plan(plan_data, verbose=False):
+    """Schedules a plan payload and prints the schedule, warnings and problems.
+
+    Returns the schedule; callers should not POST a plan whose schedule has
+    problems.
+    """
+    schedule = build_schedule(plan_data)
+    print_schedule(schedule, verbose=verbose)
+    for warning in schedule['warnings']:
+        print(f"  ! {warning}")
+    for problem in schedule['problems']:
+        print(f"  ✗ {problem}")
+    return schedule
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the wall-clock schedule of practice plan payloads.')
+    parser.add_argument('paths', nargs='+', help='JSON payload files (e.g. markdown_plan.py output).')
+    parser.add_argument('--verbose', action='store_true', help='Also list every item with its times.')
+    args = parser.parse_args()
+
+    failed = []
+    for path in args.paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            plan_data = json.load(f)
+        print(f"\n{plan_data.get('name', path)}")
+        print("="*60)
+        if check_plan(plan_data, verbose=args.verbose)['problems']:
+            failed.append(path)
+
+    if failed:
+        print(f"\n✗ Plans with schedule problems: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for the QDrill API, for benchmarking the conversion scripts.
+
+Implements the endpoints the scripts in this directory call, with the response
+shapes of the SvelteKit routes under src/routes/api:
+
+    GET  /api/drills?page=&limit=      newest first, {items, pagination}
+    POST /api/drills                   201 with the created drill
+    GET  /api/drills/<id>
+    GET  /api/drills/names             [{id, name}] by name (ETag / 304 with --etag)
+    POST /api/drills/import            {drills, fileName, visibility} -> {importedCount, uploadSource}
+    POST /api/drills/bulk-upload       multipart CSV -> {summary, drills} (parsed only, as upstream)
+    GET  /api/formations?page=&limit=  newest first, {items, pagination}
+    POST /api/formations               201 with the created formation
+    GET  /api/formations/<id>
+    GET  /api/practice-plans?page=&limit=
+    POST /api/practice-plans           checked with plan_validation.validate_payload;
+                                       201 {id, message} or 400 with the errors
+    GET  /api/practice-plans/<id>
+
+Responses are served over keep-alive HTTP/1.1 from a thread per connection,
+like the real server behind QDrillClient's pooled session. Every request can
+be delayed (--latency, --jitter) and a share of them can fail with a
+retryable status (--error-rate, --error-status), to exercise the client's
+retries. --require-auth rejects import and bulk-upload without a Cookie header,
+as authGuard does. The app's names route sends no ETag, so neither does the
+stub unless --etag is given, for trying out conditional refreshes. Request
+counts and mean handling times per endpoint are printed on shutdown.
+
+Nothing is persisted; every run starts from the seeded catalog.
+
+Usage:
+    python stub_server.py --port 3001 --drills 500 --latency 20 --jitter 10 --error-rate 0.05
+    QDRILL_API_URL=http://localhost:3001/api python import_drill_bank.py bank.csv
+
+    from stub_server import start_stub_server
+
+    server = start_stub_server(latency=0.01)   # free port, background thread
+    client = QDrillClient(base_url=server.api_url)
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from plan_validation import validate_payload
+
+KINDS = ('drills', 'formations', 'practice-plans')
+RESOURCE = re.compile(r'^/api/(drills|formations|practice-plans)(?:/(\d+))?/?$')
+
+
+class StubStore:
+    """Thread-safe in-memory drills, formations and practice plans with sequential IDs."""
+
+    def __init__(self, drills=0, formations=0):
+        self.lock = threading.Lock()
+        self.rows = {kind: {} for kind in KINDS}
+        self.next_id = {kind: 1 for kind in KINDS}
+        self.names_version = 0
+        for n in range(1, drills + 1):
+            self.add('drills', {'name': f"Stub drill {n}", 'brief_description': 'Seeded by stub_server.py'})
+        for n in range(1, formations + 1):
+            self.add('formations', {'name': f"Stub formation {n}", 'brief_description': 'Seeded by stub_server.py'})
+
+    def add(self, kind, data):
+        with self.lock:
+            row = {**data, 'id': self.next_id[kind]}
+            self.rows[kind][row['id']] = row
+            self.next_id[kind] += 1
+            if kind == 'drills':
+                self.names_version += 1
+            return row
+
+    def add_many(self, kind, rows):
+        with self.lock:
+            for data in rows:
+                row = {**data, 'id': self.next_id[kind]}
+                self.rows[kind][row['id']] = row
+                self.next_id[kind] += 1
+            if kind == 'drills':
+                self.names_version += 1
+            return len(rows)
+
+    def get(self, kind, entity_id):
+        with self.lock:
+            return self.rows[kind].get(entity_id)
+
+    def page(self, kind, page, limit):
+        with self.lock:
+            ids = sorted(self.rows[kind], reverse=True)
+            total = len(ids)
+            items = [self.rows[kind][i] for i in ids[(page - 1) * limit:page * limit]]
+        return {'items': items,
+                'pagination': {'page': page, 'limit': limit, 'totalItems': total,
+                               'totalPages': math.ceil(total / limit)}}
+
+    def drill_names(self):
+        """(etag, [{id, name}] sorted by name)."""
+        with self.lock:
+            names = [{'id': row['id'], 'name': row['name']} for row in self.rows['drills'].values()]
+            version = self.names_version
+        names.sort(key=lambda row: (row['name'], row['id']))
+        return f'W/"drills-{version}"', names
+
+
+class StubStats:
+    """Request counts and handling time per endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, label, status, elapsed):
+        with self.lock:
+            stats = self.endpoints.setdefault(label, {'count': 0, 'errors': 0, 'total_ms': 0.0})
+            stats['count'] += 1
+            stats['errors'] += status >= 400
+            stats['total_ms'] += elapsed * 1000
+
+    def print_summary(self):
+        if not self.endpoints:
+            return
+        print("\nStub server requests:")
+        for label, stats in sorted(self.endpoints.items()):
+            errors = f", {stats['errors']} errors" if stats['errors'] else ''
+            print(f"  {label}: {stats['count']} requests{errors}, "
+                  f"mean {stats['total_ms'] / stats['count']:.1f} ms")
+
+
+def parse_bulk_upload(body, content_type):
+    """Reads the 'file' (CSV) and 'visibility' fields of a multipart/form-data body."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body
+    )
+    fields = {}
+    if message.is_multipart():
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name:
+                fields[name] = part.get_payload(decode=True) or b''
+    return fields.get('file', b'').decode('utf-8-sig'), fields.get('visibility', b'public').decode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'QDrillStub/1.0'
+
+    # --- plumbing -------------------------------------------------------
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=None, headers=None):
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        return status
+
+    def _error(self, status, code, message, details=None):
+        error = {'code': code, 'message': message}
+        if details:
+            error['details'] = details
+        return self._send(status, {'error': error})
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _read_json(self):
+        try:
+            return json.loads(self._read_body() or b'null')
+        except ValueError:
+            return None
+
+    def _handle(self, method):
+        start = time.perf_counter()
+        path = urlsplit(self.path).path
+        match = RESOURCE.match(path)
+        label = f"{method} /api/{match.group(1)}/:id" if match and match.group(2) else f"{method} {path.rstrip('/')}"
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        try:
+            if server.error_rate and random.random() < server.error_rate:
+                # Drain the body so the keep-alive connection stays usable
+                self._read_body()
+                status = self._error(server.error_status, 'INJECTED_ERROR', 'Injected by stub_server.py')
+            else:
+                status = self._route(method, path)
+        except Exception as e:
+            status = self._error(500, 'INTERNAL_SERVER_ERROR', str(e))
+        server.stats.record(label, status, time.perf_counter() - start)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    # --- routes ---------------------------------------------------------
+
+    def _route(self, method, path):
+        store = self.server.store
+        if path.rstrip('/') == '/api/drills/names' and method == 'GET':
+            etag, names = store.drill_names()
+            if not self.server.etag:
+                return self._send(200, names)
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, headers={'ETag': etag})
+            return self._send(200, names, headers={'ETag': etag})
+        if path.rstrip('/') == '/api/drills/import' and method == 'POST':
+            return self._import_drills()
+        if path.rstrip('/') == '/api/drills/bulk-upload' and method == 'POST':
+            return self._bulk_upload()
+
+        match = RESOURCE.match(path)
+        if not match:
+            self._read_body()
+            return self._error(404, 'NOT_FOUND', f"No stub route for {method} {path}")
+        kind, entity_id = match.group(1), match.group(2)
+
+        if method == 'GET' and entity_id:
+            row = store.get(kind, int(entity_id))
+            if row is None:
+                return self._error(404, 'NOT_FOUND', f"{kind} {entity_id} not found")
+            return self._send(200, row)
+        if method == 'GET':
+            query = parse_qs(urlsplit(self.path).query)
+            try:
+                page = max(1, int(query.get('page', ['1'])[0]))
+                limit = max(1, int(query.get('limit', ['10'])[0]))
+            except ValueError:
+                return self._error(400, 'VALIDATION_ERROR', 'page and limit must be integers')
+            return self._send(200, store.page(kind, page, limit))
+        if method == 'POST' and not entity_id:
+            return self._create(kind)
+        self._read_body()
+        return self._error(405, 'METHOD_NOT_ALLOWED', f"{method} is not supported on {path}")
+
+    def _create(self, kind):
+        data = self._read_json()
+        if not isinstance(data, dict):
+            return self._error(400, 'VALIDATION_ERROR', 'Request body must be a JSON object')
+        if kind == 'practice-plans':
+            errors, _ = validate_payload(data)
+            if errors:
+                return self._error(400, 'VALIDATION_ERROR', 'Validation failed', errors)
+            plan = self.server.store.add(kind, data)
+            return self._send(201, {'id': plan['id'], 'message': 'Practice plan created successfully'})
+        if not isinstance(data.get('name'), str) or not data['name'].strip():
+            return self._error(400, 'VALIDATION_ERROR', 'Validation failed', {'name': 'Name is required'})
+        return self._send(201, self.server.store.add(kind, data))
+
+    def _authorized(self):
+        return not self.server.require_auth or bool(self.headers.get('Cookie'))
+
+    def _import_drills(self):
+        data = self._read_json()
+        if not self._authorized():
+            return self._error(401, 'UNAUTHORIZED', 'Authentication required')
+        drills = data.get('drills') if isinstance(data, dict) else None
+        if not isinstance(drills, list) or not drills:
+            return self._error(400, 'VALIDATION_ERROR', 'No drills provided for import')
+        if not data.get('fileName'):
+            return self._error(400, 'VALIDATION_ERROR', 'File name is required')
+        if any(not isinstance(drill, dict) or not drill.get('name') for drill in drills):
+            return self._error(400, 'VALIDATION_ERROR', 'Every drill needs a name')
+        visibility = data.get('visibility', 'public')
+        count = self.server.store.add_many('drills', [{**drill, 'visibility': visibility} for drill in drills])
+        return self._send(200, {'importedCount': count, 'uploadSource': data['fileName']})
+
+    def _bulk_upload(self):
+        body = self._read_body()
+        if not self._authorized():
+            return self._error(401, 'UNAUTHORIZED', 'Authentication required')
+        content_type = self.headers.get('Content-Type', '')
+        if not content_type.startswith('multipart/form-data'):
+            return self._error(400, 'VALIDATION_ERROR', 'No valid file uploaded')
+        text, visibility = parse_bulk_upload(body, content_type)
+        records = list(csv.DictReader(io.StringIO(text)))
+        if not records:
+            return self._error(400, 'VALIDATION_ERROR', 'CSV file is empty or contains no data rows.')
+        drills, errors = [], 0
+        for index, record in enumerate(records):
+            drill = {'name': record.get('Name'), 'brief_description': record.get('Brief Description'),
+                     'visibility': visibility, 'row': index + 2}
+            missing = [column for column in ('Name', 'Brief Description') if not (record.get(column) or '').strip()]
+            if missing:
+                drill['errors'] = [f"{column}: Required" for column in missing]
+                errors += 1
+            drills.append(drill)
+        return self._send(200, {'summary': {'total': len(records), 'valid': len(records) - errors,
+                                            'errors': errors},
+                                'drills': drills})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 require_auth=False, etag=False, verbose=False):
+        super().__init__(address, StubHandler)
+        self.store = store
+        self.stats = StubStats()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.require_auth = require_auth
+        self.etag = etag
+        self.verbose = verbose
+
+    @property
+    def api_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+
+def start_stub_server(host='127.0.0.1', port=0, drills=0, formations=0, **options):
+    """Starts a stub server on a background thread; port 0 picks a free port.
+
+    `options` are StubServer keyword arguments (latency and jitter in
+    seconds). Call shutdown() on the returned server when done.
+    """
+    server = StubServer((host, port), StubStore(drills, formations), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run an in-memory stand-in for the QDrill API.')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1).')
+    parser.add_argument('--port', type=int, default=3001, help='Port to listen on (default: 3001).')
+    parser.add_argument('--drills', type=int, default=0, help='Number of drills to seed the catalog with.')
+    parser.add_argument('--formations', type=int, default=0, help='Number of formations to seed the catalog with.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Milliseconds added to every response.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many extra milliseconds, at random.')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of requests (0-1) answered with --error-status instead.')
+    parser.add_argument('--error-status', type=int, default=503, help='Status for injected errors (default: 503).')
+    parser.add_argument('--require-auth', action='store_true',
+                        help='Reject /api/drills/import and bulk-upload without a Cookie header.')
+    parser.add_argument('--etag', action='store_true',
+                        help='Send an ETag on /api/drills/names and answer If-None-Match with 304 (the app does not).')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible jitter and errors.')
+    parser.add_argument('--verbose', action='store_true', help='Log every request.')
+    args = parser.parse_args()
+
+    if not 0 <= args.error_rate <= 1:
+        parser.error('--error-rate must be between 0 and 1')
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    store = StubStore(args.drills, args.formations)
+    server = StubServer((args.host, args.port), store, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                        error_rate=args.error_rate, error_status=args.error_status,
+                        require_auth=args.require_auth, etag=args.etag, verbose=args.verbose)
+    print(f"✓ Stub QDrill API on {server.api_url} "
+          f"({args.drills} drills, {args.formations} formations seeded)")
+    print(f"  Use it with: QDRILL_API_URL={server.api_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.stats.print_summary()
+
+
+if __name__ == "__main__":
+    main()
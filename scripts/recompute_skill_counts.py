@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rebuild skills.usage_count and skills.drills_used_in from the source tables.
+
+The counters are maintained incrementally by the app and carried over as sums
+by merge_duplicate_skills.py, so they drift over time. This job recomputes them
+for every skill in one set-based aggregate:
+
+- drills_used_in: number of drills whose skills_focused_on contains the skill
+- usage_count: drills_used_in plus the number of practice_plan_drills rows
+  that reference one of those drills
+
+Only rows whose values actually changed are written, so it is cheap enough to
+run nightly.
+"""
+
+import argparse
+
+from db_session import execute_query, transaction
+
+SKILL_COUNTS_CTE = """
+    WITH drill_skills AS (
+        SELECT DISTINCT d.id AS drill_id, u.skill
+        FROM drills d
+        CROSS JOIN LATERAL unnest(d.skills_focused_on) AS u(skill)
+    ),
+    plan_usage AS (
+        SELECT drill_id, count(*) AS plan_uses
+        FROM practice_plan_drills
+        WHERE drill_id IS NOT NULL
+        GROUP BY drill_id
+    ),
+    counts AS (
+        SELECT ds.skill,
+               count(*) AS drills_used_in,
+               count(*) + coalesce(sum(pu.plan_uses), 0) AS usage_count
+        FROM drill_skills ds
+        LEFT JOIN plan_usage pu ON pu.drill_id = ds.drill_id
+        GROUP BY ds.skill
+    )
+"""
+
+RECOMPUTED_COUNTS_CTE = SKILL_COUNTS_CTE + """,
+    recomputed AS (
+        SELECT s.skill,
+               s.usage_count AS old_usage_count,
+               s.drills_used_in AS old_drills_used_in,
+               coalesce(c.usage_count, 0) AS usage_count,
+               coalesce(c.drills_used_in, 0) AS drills_used_in
+        FROM skills s
+        LEFT JOIN counts c ON c.skill = s.skill
+        WHERE s.usage_count IS DISTINCT FROM coalesce(c.usage_count, 0)
+           OR s.drills_used_in IS DISTINCT FROM coalesce(c.drills_used_in, 0)
+    )
+"""
+
+INSERT_MISSING_SKILLS = SKILL_COUNTS_CTE + """
+    INSERT INTO skills (skill, usage_count, drills_used_in)
+    SELECT c.skill, c.usage_count, c.drills_used_in
+    FROM counts c
+    WHERE NOT EXISTS (SELECT 1 FROM skills s WHERE s.skill = c.skill)
+    RETURNING skill
+"""
+
+
+def preview_changes():
+    """Return (skill, old_usage, new_usage, old_drills, new_drills) for rows that would change."""
+    return execute_query(RECOMPUTED_COUNTS_CTE + """
+        SELECT skill, old_usage_count, usage_count, old_drills_used_in, drills_used_in
+        FROM recomputed
+        ORDER BY skill
+    """) or []
+
+
+def apply_changes(insert_missing=False):
+    """Write back the recomputed counters in one UPDATE and return the changed skills."""
+    with transaction():
+        updated = execute_query(RECOMPUTED_COUNTS_CTE + """
+            UPDATE skills s
+            SET usage_count = r.usage_count,
+                drills_used_in = r.drills_used_in
+            FROM recomputed r
+            WHERE s.skill = r.skill
+            RETURNING s.skill
+        """)
+        inserted = execute_query(INSERT_MISSING_SKILLS) if insert_missing else []
+    return updated, inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute skill usage counters from drills and practice plans.')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only report the rows that would change.')
+    parser.add_argument('--insert-missing', action='store_true',
+                        help='Also create skills rows for skills used by drills but missing from the skills table.')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        changes = preview_changes()
+        print(f"{len(changes)} skill rows would change.")
+        for skill, old_usage, new_usage, old_drills, new_drills in changes:
+            print(f"  {skill}: usage_count {old_usage} -> {new_usage}, "
+                  f"drills_used_in {old_drills} -> {new_drills}")
+        return
+
+    updated, inserted = apply_changes(args.insert_missing)
+    print(f"Updated counters for {len(updated)} skills.")
+    if args.insert_missing:
+        print(f"Inserted {len(inserted)} missing skills.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Sync an existing practice plan with its markdown source, writing only what differs.
+
+update_practice_plan_65_final.py made plan 65 "match the markdown" with blind
+UPDATEs, one existence SELECT and one INSERT per formation. This job:
+
+1. reads the plan, its sections and their practice_plan_drills in one query;
+2. parses the markdown with practice-plan-conversion/markdown_plan.py;
+3. computes an edit script. The longest common subsequence of section names
+   pairs up DB and markdown sections. Within each pair, the LCS of
+   (type, name) pairs up items. Paired rows are updated only if a field
+   differs, and unpaired markdown entries are inserted. A markdown item
+   without a qdrill link keeps the drill_id/formation_id already stored.
+   Unpaired DB rows (e.g. formations added by update_practice_plan_65_final.py)
+   are kept in place and only renumbered, unless --prune deletes them;
+4. applies the edit script in one transaction: at most one DELETE, INSERT
+   or UPDATE ... FROM (VALUES ...) per table.
+
+Resyncing a plan that already matches costs the one read and no writes.
+
+Usage:
+    python sync_markdown_plan.py 65 "../examples/practice-plans/2025 GTA May 31 Practice Plan.md" --dry-run
+    python sync_markdown_plan.py 65 "../examples/practice-plans/2025 GTA May 31 Practice Plan.md"
+    python sync_markdown_plan.py 65 "../examples/practice-plans/2025 GTA May 31 Practice Plan.md" --prune
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from db_session import execute_batch, execute_query, transaction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'practice-plan-conversion'))
+from markdown_plan import parse_markdown_plan  # noqa: E402
+
+FETCH_PLAN = """
+    SELECT p.name, p.description, p.practice_goals, p.start_time::text,
+           s.id, s.name, s."order", s.notes,
+           d.id, d.name, d.type, d.duration, d.drill_id, d.formation_id,
+           d.parallel_timeline, d.parallel_group_id, d.group_timelines::text[], d.order_in_plan
+    FROM practice_plans p
+    LEFT JOIN practice_plan_sections s ON s.practice_plan_id = p.id
+    LEFT JOIN practice_plan_drills d ON d.section_id = s.id AND d.practice_plan_id = p.id
+    WHERE p.id = %s
+    ORDER BY s."order", s.id, d.order_in_plan, d.id
+"""
+
+PLAN_FIELDS = ('name', 'description', 'practice_goals', 'start_time')
+SECTION_FIELDS = ('name', 'order', 'notes')
+ITEM_FIELDS = ('section_id', 'order_in_plan', 'name', 'type', 'duration', 'drill_id', 'formation_id',
+               'parallel_timeline', 'parallel_group_id', 'group_timelines')
+
+UPDATE_SECTIONS = """
+    UPDATE practice_plan_sections s
+    SET name = v.name, "order" = v.position, notes = v.notes
+    FROM (VALUES %s) AS v(id, name, position, notes)
+    WHERE s.id = v.id
+"""
+
+UPDATE_ITEMS = f"""
+    UPDATE practice_plan_drills p
+    SET {', '.join(f'{field} = v.{field}' for field in ITEM_FIELDS)},
+        order_in_section = v.order_in_plan
+    FROM (VALUES %s) AS v(id, {', '.join(ITEM_FIELDS)})
+    WHERE p.id = v.id
+"""
+
+REFERENCE_FIELDS = ('drill_id', 'formation_id')
+
+ITEM_CASTS = {'section_id': 'integer', 'order_in_plan': 'integer', 'duration': 'integer', 'drill_id': 'integer',
+              'formation_id': 'integer', 'group_timelines': 'text[]'}
+ITEM_VALUES = ', '.join(f"%s::{ITEM_CASTS[field]}" if field in ITEM_CASTS else '%s' for field in ITEM_FIELDS)
+
+
+def load_plan(plan_id):
+    """Returns the stored plan as {fields..., 'sections': [{id, name, order, notes, items}]}, or None."""
+    rows = execute_query(FETCH_PLAN, (plan_id,))
+    if not rows:
+        return None
+    first = rows[0]
+    plan = {'name': first[0], 'description': first[1], 'practice_goals': first[2], 'start_time': first[3],
+            'sections': []}
+    sections = {}
+    for row in rows:
+        if row[4] is None:
+            continue
+        if row[4] not in sections:
+            sections[row[4]] = {'id': row[4], 'name': row[5], 'order': row[6], 'notes': row[7], 'items': []}
+            plan['sections'].append(sections[row[4]])
+        if row[8] is not None:
+            sections[row[4]]['items'].append({
+                'id': row[8], 'section_id': row[4], 'name': row[9], 'type': row[10], 'duration': row[11],
+                'drill_id': row[12], 'formation_id': row[13], 'parallel_timeline': row[14],
+                'parallel_group_id': row[15], 'group_timelines': row[16], 'order_in_plan': row[17],
+            })
+    return plan
+
+
+def match_key(name):
+    return re.sub(r'[^0-9a-z]+', ' ', (name or '').casefold()).strip()
+
+
+def lcs_pairs(old_keys, new_keys):
+    """Index pairs (i, j) of a longest common subsequence of two key lists."""
+    n, m = len(old_keys), len(new_keys)
+    lengths = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n - 1, -1, -1):
+        for j in range(m - 1, -1, -1):
+            if old_keys[i] == new_keys[j]:
+                lengths[i][j] = lengths[i + 1][j + 1] + 1
+            else:
+                lengths[i][j] = max(lengths[i + 1][j], lengths[i][j + 1])
+    pairs, i, j = [], 0, 0
+    while i < n and j < m:
+        if old_keys[i] == new_keys[j]:
+            pairs.append((i, j))
+            i += 1
+            j += 1
+        elif lengths[i + 1][j] >= lengths[i][j + 1]:
+            i += 1
+        else:
+            j += 1
+    return pairs
+
+
+def merge_alignment(old_count, new_count, pairs):
+    """Walks both lists in merged order: yields (i, None), (None, j) or (i, j) for paired entries."""
+    i = j = 0
+    for pair_i, pair_j in [*pairs, (old_count, new_count)]:
+        while i < pair_i:
+            yield i, None
+            i += 1
+        while j < pair_j:
+            yield None, j
+            j += 1
+        if pair_i < old_count:
+            yield pair_i, pair_j
+        i, j = pair_i + 1, pair_j + 1
+
+
+def desired_item(item, position):
+    return {
+        'order_in_plan': position,
+        'name': item['name'],
+        'type': item['type'],
+        'duration': item.get('duration'),
+        'drill_id': item.get('drill_id'),
+        'formation_id': item.get('formation_id'),
+        'parallel_timeline': item.get('parallel_timeline'),
+        'parallel_group_id': item.get('parallel_group_id'),
+        'group_timelines': item.get('groupTimelines'),
+    }
+
+
+class EditScript:
+    """The row-level changes that turn the stored plan into the parsed one."""
+
+    def __init__(self):
+        self.plan = {}
+        self.delete_sections = []
+        self.delete_items = []
+        self.insert_sections = []  # (position, section data)
+        self.update_sections = []  # (id, name, position, notes)
+        self.insert_items = []     # (section id or ('new', position), item data)
+        self.update_items = []     # (id, *ITEM_FIELDS)
+        self.kept = 0              # stored rows not in the markdown, left in place
+        self.log = []
+
+    def __bool__(self):
+        return bool(self.plan or self.delete_sections or self.delete_items or self.insert_sections
+                    or self.update_sections or self.insert_items or self.update_items)
+
+
+def diff_items(script, section_id, stored_items, parsed_items, prune=False):
+    keys = lambda items: [(item['type'], match_key(item['name'])) for item in items]
+    pairs = lcs_pairs(keys(stored_items), keys(parsed_items))
+
+    position = 0
+    for i, j in merge_alignment(len(stored_items), len(parsed_items), pairs):
+        if j is None:
+            stored = stored_items[i]
+            if prune:
+                script.delete_items.append(stored['id'])
+                script.log.append(f"  - item {stored['name']}")
+                continue
+            script.kept += 1
+            if stored['order_in_plan'] != position:
+                script.update_items.append((stored['id'], *({**stored, 'order_in_plan': position}[field]
+                                                             for field in ITEM_FIELDS)))
+                script.log.append(f"  ~ item {stored['name']} (not in markdown, kept): order_in_plan")
+            position += 1
+            continue
+
+        parsed = parsed_items[j]
+        desired = desired_item(parsed, position)
+        position += 1
+        if i is None:
+            script.insert_items.append((section_id, desired))
+            script.log.append(f"  + item {parsed['name']} ({parsed.get('duration')} min)")
+            continue
+        stored = stored_items[i]
+        desired['section_id'] = section_id
+        for field in REFERENCE_FIELDS:
+            # An unlinked markdown item says nothing about the drill/formation; keep the stored link
+            if desired[field] is None:
+                desired[field] = stored[field]
+        changed = [field for field in ITEM_FIELDS if stored.get(field) != desired[field]]
+        if changed:
+            script.update_items.append((stored['id'], *(desired[field] for field in ITEM_FIELDS)))
+            script.log.append(f"  ~ item {parsed['name']}: {', '.join(changed)}")
+
+
+def diff_plan(stored, parsed, prune=False):
+    script = EditScript()
+    for field in PLAN_FIELDS:
+        if parsed.get(field) is not None and stored.get(field) != parsed[field]:
+            script.plan[field] = parsed[field]
+            script.log.append(f"~ plan {field}")
+
+    stored_sections, parsed_sections = stored['sections'], parsed['sections']
+    pairs = lcs_pairs([match_key(s['name']) for s in stored_sections],
+                      [match_key(s['name']) for s in parsed_sections])
+
+    position = 0
+    for i, j in merge_alignment(len(stored_sections), len(parsed_sections), pairs):
+        if j is None:
+            current = stored_sections[i]
+            if prune:
+                script.delete_sections.append(current['id'])
+                script.delete_items.extend(item['id'] for item in current['items'])
+                script.log.append(f"- section {current['name']} ({len(current['items'])} items)")
+                continue
+            script.kept += 1
+            if current['order'] != position:
+                script.update_sections.append((current['id'], current['name'], position, current['notes']))
+                script.log.append(f"~ section {current['name']} (not in markdown, kept): order")
+            position += 1
+            continue
+
+        section = parsed_sections[j]
+        if i is None:
+            script.insert_sections.append((position, section))
+            script.log.append(f"+ section {section['name']}")
+            for item_position, item in enumerate(section['items']):
+                script.insert_items.append((('new', position), desired_item(item, item_position)))
+            position += 1
+            continue
+        current = stored_sections[i]
+        if (current['name'], current['order'], current['notes'] or '') != (section['name'], position, section['notes']):
+            script.update_sections.append((current['id'], section['name'], position, section['notes']))
+            script.log.append(f"~ section {section['name']}")
+        diff_items(script, current['id'], current['items'], section['items'], prune)
+        position += 1
+    return script
+
+
+def apply_script(plan_id, script):
+    """Writes an edit script in one transaction."""
+    with transaction():
+        if script.delete_items:
+            execute_query("DELETE FROM practice_plan_drills WHERE id = ANY(%s)", (script.delete_items,))
+        if script.delete_sections:
+            execute_query("DELETE FROM practice_plan_sections WHERE practice_plan_id = %s AND id = ANY(%s)",
+                          (plan_id, script.delete_sections))
+        new_section_ids = {}
+        if script.insert_sections:
+            returned = execute_batch(
+                'INSERT INTO practice_plan_sections (practice_plan_id, name, "order", notes) VALUES %s '
+                'RETURNING id, "order"',
+                [(plan_id, section['name'], position, section['notes']) for position, section in script.insert_sections]
+            )
+            new_section_ids = {position: section_id for section_id, position in returned}
+        if script.update_sections:
+            execute_batch(UPDATE_SECTIONS, script.update_sections)
+        if script.update_items:
+            execute_batch(UPDATE_ITEMS, script.update_items, template=f"(%s, {ITEM_VALUES})")
+        if script.insert_items:
+            rows = []
+            for section_ref, item in script.insert_items:
+                section_id = new_section_ids[section_ref[1]] if isinstance(section_ref, tuple) else section_ref
+                item = {**item, 'section_id': section_id}
+                rows.append((plan_id, *(item[field] for field in ITEM_FIELDS), item['order_in_plan']))
+            execute_batch(
+                f"INSERT INTO practice_plan_drills (practice_plan_id, {', '.join(ITEM_FIELDS)}, order_in_section) "
+                f"VALUES %s",
+                rows, template=f"(%s, {ITEM_VALUES}, %s)"
+            )
+        if script.plan:
+            columns = sorted(script.plan)
+            execute_query(
+                f"UPDATE practice_plans SET {', '.join(f'{column} = %s' for column in columns)} WHERE id = %s",
+                [script.plan[column] for column in columns] + [plan_id]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync a practice plan with its markdown source.')
+    parser.add_argument('plan_id', type=int, help='Practice plan to update.')
+    parser.add_argument('markdown_path', help='Markdown plan (see examples/practice-plans/).')
+    parser.add_argument('--dry-run', action='store_true', help='Only print the edit script.')
+    parser.add_argument('--prune', action='store_true',
+                        help='Delete sections and items that are not in the markdown (kept by default).')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.markdown_path):
+        print(f"Error: Input file not found: {args.markdown_path}")
+        sys.exit(1)
+    with open(args.markdown_path, 'r', encoding='utf-8') as f:
+        parsed = parse_markdown_plan(f.read())
+
+    stored = load_plan(args.plan_id)
+    if stored is None:
+        print(f"Error: Practice plan {args.plan_id} not found.")
+        sys.exit(1)
+
+    script = diff_plan(stored, parsed, prune=args.prune)
+    if not script:
+        print(f"Practice plan {args.plan_id} already matches {os.path.basename(args.markdown_path)}.")
+        return
+
+    print(f"Edit script for practice plan {args.plan_id}:")
+    for line in script.log:
+        print(f"  {line}")
+    if args.dry_run:
+        return
+
+    try:
+        apply_script(args.plan_id, script)
+    except Exception as e:
+        print(f"\n✗ Sync failed, nothing was written: {e}")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print("SUMMARY")
+    print("="*60)
+    print(f"Sections: {len(script.insert_sections)} added, {len(script.update_sections)} updated, "
+          f"{len(script.delete_sections)} removed")
+    print(f"Items: {len(script.insert_items)} added, {len(script.update_items)} updated, "
+          f"{len(script.delete_items)} removed")
+    if script.kept:
+        print(f"Kept {script.kept} sections/items that are not in the markdown (use --prune to remove them)")
+    if script.plan:
+        print(f"Plan fields updated: {', '.join(sorted(script.plan))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,42 +2,16 @@
 """
 Script to update practice plan 65 to match the markdown exactly
 Including adding formations and updating descriptions
-"""
 
-import psycopg2
-import os
+sync_markdown_plan.py does this for any plan from the markdown itself,
+writing only the rows that differ.
+"""
 
-# Database connection
-DB_URL = os.environ.get('NEON_DB_URL')
+import argparse
+from contextlib import nullcontext
 
-def execute_query(query, params=None):
-    """Execute a query and return results"""
-    try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-        if params:
-            cur.execute(query, params)
-        else:
-            cur.execute(query)
-        
-        # If it's a SELECT query, fetch results
-        if query.strip().upper().startswith('SELECT'):
-            results = cur.fetchall()
-            cur.close()
-            conn.close()
-            return results
-        else:
-            # For UPDATE/INSERT/DELETE, commit the transaction
-            conn.commit()
-            cur.close()
-            conn.close()
-            return True
-    except Exception as e:
-        print(f"Database error: {e}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
-        return None
+from db_session import execute_query, transaction
+from plan_ordering import PlanOrder
 
 def update_practice_plan():
     """Update practice plan 65 to match the markdown"""
@@ -81,26 +55,15 @@ def update_practice_plan():
     # Step 2: Add formations to the practice plan
     print("\n2. Adding formations to practice plan...")
     
-    # First, let's check what sections we have
-    sections = execute_query("""
-        SELECT id, name, "order" 
-        FROM practice_plan_sections 
-        WHERE practice_plan_id = 65 
-        ORDER BY "order"
-    """)
-    
-    section_map = {name: id for id, name, _ in sections}
+    # Load the sections and items once and lay the formations out in memory;
+    # the final ordering is written in one batch instead of shifting rows per insert
+    plan = PlanOrder.load(65)
     
     # Add formations to the Half Courts section
-    if 'Half Courts: Offensive & Defensive Principles' in section_map:
-        section_id = section_map['Half Courts: Offensive & Defensive Principles']
-        
-        # Get the current max order_in_plan for this section
-        max_order = execute_query("""
-            SELECT COALESCE(MAX(order_in_plan), -1) 
-            FROM practice_plan_drills 
-            WHERE practice_plan_id = 65 AND section_id = %s
-        """, (section_id,))[0][0]
+    half_courts = plan.section_by_name('Half Courts: Offensive & Defensive Principles')
+    if half_courts:
+        section_id = half_courts['id']
+        existing = {item['formation_id'] for item in plan.items(section_id) if item['type'] == 'formation'}
         
         # Add formations at the beginning of the section
         formations_to_add = [
@@ -112,37 +75,20 @@ def update_practice_plan():
         
         current_order = 0
         for name, formation_id, description, duration in formations_to_add:
-            # Check if formation already exists in this section
-            exists = execute_query("""
-                SELECT id FROM practice_plan_drills 
-                WHERE practice_plan_id = 65 
-                AND section_id = %s 
-                AND formation_id = %s
-            """, (section_id, formation_id))
-            
-            if not exists:
-                execute_query("""
-                    INSERT INTO practice_plan_drills (
-                        practice_plan_id, section_id, name, type, formation_id, 
-                        duration, order_in_plan
-                    ) VALUES (%s, %s, %s, 'formation', %s, %s, %s)
-                """, (65, section_id, name, formation_id, duration, current_order))
-                print(f"  ✓ Added formation: {name}")
-                current_order += 1
-            
-        # Update order of existing items to come after formations
-        if current_order > 0:
-            execute_query("""
-                UPDATE practice_plan_drills 
-                SET order_in_plan = order_in_plan + %s
-                WHERE practice_plan_id = 65 
-                AND section_id = %s 
-                AND type != 'formation'
-            """, (current_order, section_id))
+            # Skip formations that already exist in this section
+            if formation_id in existing:
+                continue
+            plan.insert_item(section_id, current_order, {
+                'name': name, 'type': 'formation', 'formation_id': formation_id, 'duration': duration
+            })
+            print(f"  ✓ Adding formation: {name}")
+            current_order += 1
     
     # Add aggressive defense formations
-    if 'Aggressive Styles of Defence' in section_map:
-        section_id = section_map['Aggressive Styles of Defence']
+    aggressive = plan.section_by_name('Aggressive Styles of Defence')
+    if aggressive:
+        section_id = aggressive['id']
+        existing = {item['formation_id'] for item in plan.items(section_id) if item['type'] == 'formation'}
         
         # Check and add Aggro, Press, and Hero formations
         aggressive_formations = [
@@ -152,31 +98,15 @@ def update_practice_plan():
         ]
         
         for name, formation_id, description, duration, target_order in aggressive_formations:
-            # Check if formation already exists
-            exists = execute_query("""
-                SELECT id FROM practice_plan_drills 
-                WHERE practice_plan_id = 65 
-                AND section_id = %s 
-                AND formation_id = %s
-            """, (section_id, formation_id))
-            
-            if not exists:
+            if formation_id not in existing:
                 # Insert formation before its corresponding drill
-                execute_query("""
-                    UPDATE practice_plan_drills 
-                    SET order_in_plan = order_in_plan + 1
-                    WHERE practice_plan_id = 65 
-                    AND section_id = %s 
-                    AND order_in_plan >= %s
-                """, (section_id, target_order))
-                
-                execute_query("""
-                    INSERT INTO practice_plan_drills (
-                        practice_plan_id, section_id, name, type, formation_id, 
-                        duration, order_in_plan
-                    ) VALUES (%s, %s, %s, 'formation', %s, %s, %s)
-                """, (65, section_id, name, formation_id, duration, target_order))
-                print(f"  ✓ Added formation: {name}")
+                plan.insert_item(section_id, target_order, {
+                    'name': name, 'type': 'formation', 'formation_id': formation_id, 'duration': duration
+                })
+                print(f"  ✓ Adding formation: {name}")
+    
+    counts = plan.apply()
+    print(f"  ✓ Inserted {counts['inserted']} formations, renumbered {counts['moved']} existing items")
     
     # Step 3: Update practice plan metadata
     print("\n3. Updating practice plan metadata...")
@@ -221,5 +151,14 @@ def update_practice_plan():
     print("- Added aggressive defense formations (Aggro, Press, Hero)")
     print("- Updated practice plan metadata")
 
+def main():
+    parser = argparse.ArgumentParser(description='Update practice plan 65 to match the markdown.')
+    parser.add_argument('--atomic', action='store_true',
+                        help='Apply every statement in a single transaction (all or nothing).')
+    args = parser.parse_args()
+
+    with transaction() if args.atomic else nullcontext():
+        update_practice_plan()
+
 if __name__ == "__main__":
-    update_practice_plan()
\ No newline at end of file
+    main()
\ No newline at end of file